@@ -5,6 +5,18 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
+
+Публичные страницы (главная, новости, документы, портфолио) и скачивание
+документов — async-view, поэтому под ASGI один воркер держит много медленных
+клиентов, например:
+
+    uvicorn config.asgi:application --workers 4
+
+Постоянные соединения с БД (CONN_MAX_AGE > 0) под ASGI не работают как
+под WSGI: ORM из async-view ходит через потоки sync_to_async, и соединение,
+открытое в таком потоке, не закрывается по request_finished — они копятся.
+Поэтому здесь для SQLite по умолчанию CONN_MAX_AGE = 0 (открыть файл SQLite
+дёшево); Postgres и так работает через пул, см. config/settings.py.
 """
 
 import os
@@ -12,5 +24,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+os.environ.setdefault('DB_CONN_MAX_AGE', '0')
 
 application = get_asgi_application()
@@ -4,6 +4,7 @@ Django settings for config project.
 Generated by 'django-admin startproject' using Django 6.0.1.
 """
 
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -56,6 +57,7 @@ INSTALLED_APPS = [
     "portfolio",
     "news",
     "core",
+    "search",
 ]
 
 MIDDLEWARE = [
@@ -64,6 +66,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "core.ratelimit.RateLimitMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -75,6 +78,8 @@ TEMPLATES = [
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [BASE_DIR / "templates"],   # корневая папка templates/
         "APP_DIRS": True,                  # templates внутри apps тоже работают
+        # loaders не задаём: Django сам оборачивает их в cached.Loader,
+        # и шаблоны компилируются один раз на процесс
         "OPTIONS": {
             "context_processors": [
                 "django.template.context_processors.debug",
@@ -90,13 +95,74 @@ WSGI_APPLICATION = "config.wsgi.application"
 
 
 # Database
-DATABASES = {
+# Профиль выбирается переменной окружения DB_ENGINE: "sqlite" (по умолчанию) или "postgres".
+DB_ENGINE = os.environ.get("DB_ENGINE", "sqlite")
+
+if DB_ENGINE == "postgres":
+    # нужен psycopg 3 с пулом (есть в requirements.txt)
+    # с пулом соединения держит он сам, поэтому CONN_MAX_AGE = 0
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.postgresql",
+            "NAME": os.environ.get("POSTGRES_DB", "aes"),
+            "USER": os.environ.get("POSTGRES_USER", "aes"),
+            "PASSWORD": os.environ.get("POSTGRES_PASSWORD", ""),
+            "HOST": os.environ.get("POSTGRES_HOST", "localhost"),
+            "PORT": os.environ.get("POSTGRES_PORT", "5432"),
+            "CONN_MAX_AGE": 0,
+            "OPTIONS": {
+                "pool": {
+                    "min_size": int(os.environ.get("DB_POOL_MIN", 2)),
+                    "max_size": int(os.environ.get("DB_POOL_MAX", 10)),
+                    "timeout": 10,
+                },
+            },
+        }
+    }
+else:
+    # WAL: читатели не ждут писателя (контакты, оплаты), synchronous=NORMAL
+    # в WAL безопасен при падении процесса; IMMEDIATE берёт блокировку на запись
+    # сразу, и вместо "database is locked" посреди транзакции срабатывает timeout
+    DATABASES = {
+        "default": {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": os.environ.get("SQLITE_PATH", BASE_DIR / "db.sqlite3"),
+            # под WSGI соединение живёт между запросами; config/asgi.py
+            # ставит 0 — под ASGI постоянные соединения копятся в потоках
+            "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 600)),
+            "CONN_HEALTH_CHECKS": True,
+            "OPTIONS": {
+                "timeout": 20,  # busy timeout, секунды
+                "transaction_mode": "IMMEDIATE",
+                "init_command": (
+                    "PRAGMA journal_mode=WAL;"
+                    "PRAGMA synchronous=NORMAL;"
+                    "PRAGMA mmap_size=268435456;"
+                    "PRAGMA temp_store=MEMORY;"
+                    "PRAGMA cache_size=-20000;"
+                ),
+            },
+        }
+    }
+
+
+# Cache
+# LocMem живёт внутри одного процесса; при нескольких воркерах для
+# согласованной инвалидации нужен общий бэкенд (redis/memcached)
+CACHES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "aes-default",
     }
 }
 
+# сколько секунд хранить страницы для анонимных посетителей (core.pagecache)
+PAGE_CACHE_TIMEOUT = 600
+
+# sitemap и RSS/Atom (core.xmlstream): кэш живёт до изменения моделей, таймаут — страховка
+XML_FEEDS_CACHE_TIMEOUT = 86400
+SITEMAP_PAGE_SIZE = 10_000  # адресов в одном файле раздела (не больше 50 000)
+
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -119,11 +185,58 @@ STATIC_URL = "/static/"
 STATICFILES_DIRS = [BASE_DIR / "static"]
 STATIC_ROOT = BASE_DIR / "staticfiles"  # пригодится для продакшна
 
+# collectstatic: минификация CSS/JS, хэши в именах файлов, .gz/.br рядом (см. core.storage)
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "core.storage.CompressedManifestStaticFilesStorage"},
+}
+STATIC_MINIFY = True
+
 
 # Media uploads
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Отдача файлов документов: "stream" (воркер Django), "x-accel" (nginx), "x-sendfile" (Apache)
+DOCUMENTS_DOWNLOAD_BACKEND = "stream"
+# internal location в nginx, который смотрит на MEDIA_ROOT (для "x-accel")
+DOCUMENTS_X_ACCEL_PREFIX = "/protected-media/"
+# сколько секунд держать в кэше набор оплаченных документов пользователя;
+# при нескольких воркерах нужен общий CACHES (redis/memcached), иначе
+# инвалидация из одного процесса не видна другим до истечения таймаута
+DOCUMENTS_ACCESS_CACHE_TIMEOUT = 600
+
+
+# Заявки из формы контактов (contacts.ingest): копятся в spool-файле и пишутся в БД пачками —
+# командой flush_contact_requests (cron: * * * * * manage.py flush_contact_requests)
+# и при открытии списка заявок в админке
+CONTACTS_SPOOL_DIR = BASE_DIR / "var" / "contacts"
+CONTACTS_DEDUP_WINDOW = 600    # секунд: одинаковые заявки в этом окне отбрасываются
+CONTACTS_FLUSH_BATCH = 200     # строк в одном INSERT
+
+
+# Ограничение частоты запросов к пишущим маршрутам (core.ratelimit)
+RATE_LIMIT_ENABLED = True
+# За nginx REMOTE_ADDR у всех 127.0.0.1. Тогда в nginx proxy_set_header X-Real-IP $remote_addr;
+# и здесь RATE_LIMIT_CLIENT_IP_HEADER = "HTTP_X_REAL_IP", RATE_LIMIT_TRUSTED_PROXIES = ["127.0.0.1"].
+# Заголовок читается только от доверенных прокси: клиенту напрямую подделать его нельзя.
+RATE_LIMIT_CLIENT_IP_HEADER = None
+RATE_LIMIT_TRUSTED_PROXIES = []  # адреса или сети: "127.0.0.1", "10.0.0.0/8"
+RATE_LIMITS = {
+    "contacts:send": {"ip": "10/10m"},
+    "accounts:signup": {"ip": "5/h"},
+    "login": {"ip": "20/10m", "username": "5/10m"},
+    "accounts:login": {"ip": "20/10m", "username": "5/10m"},
+    "documents:pay": {"ip": "30/10m", "user": "10/10m", "methods": ("GET", "POST")},
+}
+
+
+# Списки админки на больших таблицах (core.admin_perf)
+ADMIN_ESTIMATED_COUNT_THRESHOLD = 100_000  # строк: дальше — оценка размера таблицы вместо COUNT(*)
+ADMIN_FILTERED_COUNT_LIMIT = 10_000        # строк: потолок COUNT для отфильтрованного списка
+ADMIN_CHANGELIST_CACHE_TIMEOUT = 300       # секунд: варианты фильтров и date_hierarchy
+ADMIN_BULK_LOG_OBJECTS = 100              # строк: больше — одна сводная запись в журнале (core.admin_actions)
+
 
 # Custom user model
 AUTH_USER_MODEL = "accounts.User"
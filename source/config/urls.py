@@ -15,6 +15,7 @@ urlpatterns = [
     path("documents/", include(("documents.urls", "documents"), namespace="documents")),
     path("portfolio/", include(("portfolio.urls", "portfolio"), namespace="portfolio")),
     path("contacts/", include(("contacts.urls", "contacts"), namespace="contacts")),
+    path("search/", include(("search.urls", "search"), namespace="search")),
 
     # стандартные auth страницы Django (password_reset, password_change, etc.)
     path("accounts/", include("django.contrib.auth.urls")),
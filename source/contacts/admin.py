@@ -1,4 +1,7 @@
 from django.contrib import admin
+
+from core.admin_perf import ScalableChangelistMixin
+from .ingest import flush
 from .models import ContactProfile, ContactItem, ContactRequest
 
 
@@ -16,13 +19,18 @@ class ContactProfileAdmin(admin.ModelAdmin):
 
 
 @admin.register(ContactRequest)
-class ContactRequestAdmin(admin.ModelAdmin):
+class ContactRequestAdmin(ScalableChangelistMixin, admin.ModelAdmin):
     list_display = ("full_name", "email", "phone", "created_at", "is_processed")
     list_filter = ("is_processed", "created_at")
     search_fields = ("full_name", "email", "phone", "message")
     readonly_fields = ("created_at",)
     actions = ["mark_processed"]
 
+    def changelist_view(self, request, extra_context=None):
+        # заявки копятся в spool-файле — перед показом списка дописываем их в БД
+        flush()
+        return super().changelist_view(request, extra_context)
+
     def mark_processed(self, request, queryset):
         queryset.update(is_processed=True)
 
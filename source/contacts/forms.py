@@ -0,0 +1,41 @@
+import re
+
+from django import forms
+
+from .models import ContactRequest
+
+MESSAGE_MAX_LENGTH = 5000
+
+_SPACES_RE = re.compile(r"\s+")
+_PHONE_JUNK_RE = re.compile(r"[\s()\-.]")
+_PHONE_RE = re.compile(r"^\+?\d{6,20}$")
+
+
+class ContactRequestForm(forms.ModelForm):
+    """
+    Проверка и нормализация заявки из модалки контактов.
+    Нормализованные значения нужны и для поиска дублей (contacts.ingest).
+    """
+
+    message = forms.CharField(max_length=MESSAGE_MAX_LENGTH)
+
+    class Meta:
+        model = ContactRequest
+        fields = ("full_name", "email", "phone", "message")
+
+    def clean_full_name(self):
+        return _SPACES_RE.sub(" ", self.cleaned_data["full_name"]).strip()
+
+    def clean_email(self):
+        return self.cleaned_data["email"].strip().lower()
+
+    def clean_phone(self):
+        phone = _PHONE_JUNK_RE.sub("", self.cleaned_data["phone"])
+        if not _PHONE_RE.match(phone):
+            raise forms.ValidationError("Укажите телефон цифрами, например +7 777 123 45 67.")
+        return phone
+
+    def clean_message(self):
+        # переносы строк сохраняем, схлопываем только пробелы внутри строк
+        lines = (_SPACES_RE.sub(" ", line).strip() for line in self.cleaned_data["message"].splitlines())
+        return "\n".join(lines).strip()
@@ -0,0 +1,165 @@
+"""
+Приём заявок из формы контактов без записи в БД на каждый POST.
+
+    submit(cleaned_data)  ->  дубль?  ->  строка JSON в spool-файл
+    flush()  ->  ContactRequest
+
+- Точные дубли (те же нормализованные поля) в течение CONTACTS_DEDUP_WINDOW
+  секунд отбрасываются по ключу в кэше.
+- Заявка дописывается одной строкой в CONTACTS_SPOOL_DIR/pending.jsonl
+  (O_APPEND, один write) — это быстро и не трогает блокировку записи SQLite.
+- flush() забирает файл атомарным rename и пишет всё одним bulk_create
+  пачками по CONTACTS_FLUSH_BATCH. Запросы посетителей его не вызывают:
+  он запускается командой flush_contact_requests (cron раз в минуту)
+  и при открытии списка заявок в админке.
+
+На Windows fcntl нет: там открытый писателем файл нельзя переименовать,
+и flush() просто подождёт следующего запуска.
+"""
+import glob
+import hashlib
+import json
+import logging
+import os
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import ContactRequest
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+FIELDS = ("full_name", "email", "phone", "message")
+
+logger = logging.getLogger(__name__)
+
+_DEDUP_KEY = "contacts:dedup:{digest}"
+_SPOOL_NAME = "pending.jsonl"
+# забранный на запись файл старше этого считаем брошенным (процесс упал)
+STALE_CLAIM_SECONDS = 600
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def spool_dir() -> str:
+    path = str(_setting("CONTACTS_SPOOL_DIR", settings.BASE_DIR / "var" / "contacts"))
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def fingerprint(data) -> str:
+    raw = "\x1f".join(data[f] for f in FIELDS)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def _lock(fd, exclusive: bool):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+
+
+def _append(line: bytes):
+    path = os.path.join(spool_dir(), _SPOOL_NAME)
+    while True:
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o640)
+        try:
+            _lock(fd, exclusive=False)
+            # пока ждали блокировку, flush мог забрать файл — тогда пишем в новый
+            try:
+                same_file = os.fstat(fd).st_ino == os.stat(path).st_ino
+            except FileNotFoundError:
+                same_file = False
+            if same_file:
+                os.write(fd, line)
+                return
+        finally:
+            os.close(fd)
+
+
+def submit(data) -> bool:
+    """
+    Принимает нормализованную заявку (cleaned_data формы).
+    Возвращает False, если это дубль и она отброшена.
+    """
+    data = {f: data[f] for f in FIELDS}
+    key = _DEDUP_KEY.format(digest=fingerprint(data))
+    # add() занимает ключ атомарно — два одновременных клика не пройдут оба;
+    # если запись в spool не удалась, ключ снимаем, и повтор не считается дублем
+    if not cache.add(key, 1, timeout=_setting("CONTACTS_DEDUP_WINDOW", 600)):
+        return False
+
+    data["created_at"] = timezone.now().isoformat()
+    try:
+        _append((json.dumps(data, ensure_ascii=False) + "\n").encode())
+    except OSError:
+        cache.delete(key)
+        raise
+    return True
+
+
+def _claim():
+    path = os.path.join(spool_dir(), _SPOOL_NAME)
+    claimed = f"{path}.{os.getpid()}.{time.time_ns()}.flushing"
+    try:
+        os.replace(path, claimed)
+    except FileNotFoundError:
+        return None
+    except PermissionError:
+        # Windows: файл открыт писателем — заберём в следующий раз
+        return None
+    # mtime = момент захвата, по нему ищем брошенные файлы
+    os.utime(claimed)
+    return claimed
+
+
+def _read_claimed(path: str):
+    with open(path, "rb") as f:
+        # дожидаемся писателей, открывших файл до rename
+        _lock(f.fileno(), exclusive=True)
+        lines = f.read().splitlines()
+
+    rows = []
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        rows.append(ContactRequest(
+            created_at=parse_datetime(record.pop("created_at", "") or "") or timezone.now(),
+            **{f: record.get(f, "") for f in FIELDS},
+        ))
+    return rows
+
+
+def _flush_file(path: str) -> int:
+    rows = _read_claimed(path)
+    with transaction.atomic():
+        ContactRequest.objects.bulk_create(rows, batch_size=_setting("CONTACTS_FLUSH_BATCH", 200))
+    os.remove(path)
+    return len(rows)
+
+
+def flush(include_stale: bool = False) -> int:
+    """
+    Переносит накопленные заявки в ContactRequest. Возвращает число записанных.
+    include_stale — подобрать и файлы, брошенные упавшими процессами.
+    """
+    paths = []
+    if include_stale:
+        pattern = os.path.join(spool_dir(), f"{_SPOOL_NAME}.*.flushing")
+        cutoff = time.time() - STALE_CLAIM_SECONDS
+        paths.extend(p for p in glob.glob(pattern) if os.path.getmtime(p) < cutoff)
+
+    claimed = _claim()
+    if claimed:
+        paths.append(claimed)
+    return sum(_flush_file(p) for p in paths)
+
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from contacts.ingest import flush
+
+
+class Command(BaseCommand):
+    help = (
+        "Переносит накопленные заявки из spool-файла в ContactRequest, включая "
+        "файлы, брошенные упавшими процессами. Удобно запускать из cron раз в минуту."
+    )
+
+    def handle(self, *args, **options):
+        written = flush(include_stale=True)
+        self.stdout.write(self.style.SUCCESS(f"Записано заявок: {written}"))
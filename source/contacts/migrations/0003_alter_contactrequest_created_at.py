@@ -0,0 +1,19 @@
+# Generated by Django 5.1.6 on 2026-10-18 11:15
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0002_contactrequest'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='contactrequest',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Создано'),
+        ),
+    ]
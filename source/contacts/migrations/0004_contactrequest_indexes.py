@@ -0,0 +1,21 @@
+# Generated by Django 5.1.6 on 2026-10-18 11:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contacts', '0003_alter_contactrequest_created_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='contactrequest',
+            index=models.Index(fields=['created_at'], name='contacts_co_created_faaf0a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contactrequest',
+            index=models.Index(fields=['is_processed', 'created_at'], name='contacts_co_is_proc_cf0da7_idx'),
+        ),
+    ]
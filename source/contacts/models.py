@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 
 class ContactProfile(models.Model):
@@ -56,13 +57,19 @@ class ContactRequest(models.Model):
     phone = models.CharField("Телефон", max_length=64)
     message = models.TextField("Сообщение")
 
-    created_at = models.DateTimeField("Создано", auto_now_add=True)
+    # не auto_now_add: заявки пишутся пачками (contacts.ingest) с временем отправки
+    created_at = models.DateTimeField("Создано", default=timezone.now, editable=False)
     is_processed = models.BooleanField("Обработано", default=False)
 
     class Meta:
         verbose_name = "Заявка"
         verbose_name_plural = "Заявки"
         ordering = ["-created_at"]
+        # сортировка списка в админке и фильтр «Обработано» — без полного скана
+        indexes = [
+            models.Index(fields=["created_at"]),
+            models.Index(fields=["is_processed", "created_at"]),
+        ]
 
     def __str__(self) -> str:
         return f"{self.full_name} ({self.email})"
@@ -1,3 +1,128 @@
-from django.test import TestCase
+import io
+import os
+import shutil
+import tempfile
+import time
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import User
+from . import ingest
+from .models import ContactRequest
+
+FORM = {
+    "full_name": "Иван  Петров",
+    "email": "Ivan@Example.com",
+    "phone": "+7 (777) 123-45-67",
+    "message": "Нужен энергоаудит",
+}
+DATA = {
+    "full_name": "Иван Петров",
+    "email": "ivan@example.com",
+    "phone": "+77771234567",
+    "message": "Нужен энергоаудит",
+}
+
+
+class SpoolTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.spool = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.spool, ignore_errors=True)
+        self.enterContext(override_settings(CONTACTS_SPOOL_DIR=self.spool))
+
+    def _spooled(self):
+        path = os.path.join(self.spool, "pending.jsonl")
+        if not os.path.exists(path):
+            return []
+        with open(path, "rb") as f:
+            return f.read().splitlines()
+
+
+class IngestTests(SpoolTestCase):
+    def test_submit_spools_without_touching_db(self):
+        with self.assertNumQueries(0):
+            self.assertTrue(ingest.submit(DATA))
+        self.assertEqual(len(self._spooled()), 1)
+        self.assertFalse(ContactRequest.objects.exists())
+
+    def test_duplicate_is_dropped(self):
+        self.assertTrue(ingest.submit(DATA))
+        self.assertFalse(ingest.submit(dict(DATA)))
+        self.assertTrue(ingest.submit({**DATA, "message": "Другой вопрос"}))
+        self.assertEqual(len(self._spooled()), 2)
+
+    def test_failed_append_does_not_mark_duplicate(self):
+        with mock.patch.object(ingest, "_append", side_effect=OSError("диск полон")):
+            with self.assertRaises(OSError):
+                ingest.submit(DATA)
+        # повтор после сбоя — не дубль
+        self.assertTrue(ingest.submit(DATA))
+        self.assertEqual(len(self._spooled()), 1)
+
+    def test_flush_moves_rows_to_db(self):
+        ingest.submit(DATA)
+        ingest.submit({**DATA, "email": "other@example.com"})
+        self.assertEqual(ingest.flush(), 2)
+        self.assertEqual(self._spooled(), [])
+        self.assertEqual(
+            sorted(ContactRequest.objects.values_list("email", flat=True)),
+            ["ivan@example.com", "other@example.com"],
+        )
+        # повторный flush ничего не дублирует
+        self.assertEqual(ingest.flush(), 0)
+        self.assertEqual(ContactRequest.objects.count(), 2)
+
+    def test_submit_after_claim_goes_to_new_file(self):
+        ingest.submit(DATA)
+        claimed = ingest._claim()
+        ingest.submit({**DATA, "email": "late@example.com"})
+        self.assertEqual(ingest._flush_file(claimed), 1)
+        self.assertEqual(ingest.flush(), 1)
+        self.assertEqual(ContactRequest.objects.count(), 2)
+
+    def test_command_picks_up_stale_claims(self):
+        ingest.submit(DATA)
+        claimed = ingest._claim()
+        old = time.time() - ingest.STALE_CLAIM_SECONDS - 60
+        os.utime(claimed, (old, old))
+        ingest.submit({**DATA, "email": "fresh@example.com"})
+
+        self.assertEqual(ingest.flush(), 1)  # без include_stale брошенный файл не трогаем
+        out = io.StringIO()
+        call_command("flush_contact_requests", stdout=out)
+        self.assertIn("Записано заявок: 1", out.getvalue())
+        self.assertFalse(os.path.exists(claimed))
+        self.assertEqual(ContactRequest.objects.count(), 2)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, RATE_LIMIT_ENABLED=False)
+class SendContactTests(SpoolTestCase):
+    def _send(self, data):
+        return self.client.post(reverse("contacts:send"), data, headers={"x-requested-with": "XMLHttpRequest"})
+
+    def test_valid_request_is_spooled(self):
+        response = self._send(FORM)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["ok"])
+        # дубль отвечает так же
+        self.assertTrue(self._send(FORM).json()["ok"])
+        self.assertEqual(len(self._spooled()), 1)
+        self.assertFalse(ContactRequest.objects.exists())
+
+    def test_invalid_phone(self):
+        response = self._send({**FORM, "phone": "звоните"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("phone", response.json()["errors"])
+        self.assertEqual(self._spooled(), [])
+
+    def test_admin_list_flushes(self):
+        self._send(FORM)
+        self.client.force_login(User.objects.create_superuser("staff", email="staff@example.com", password="pass"))
+        response = self.client.get(reverse("admin:contacts_contactrequest_changelist"))
+        self.assertContains(response, "ivan@example.com")
+        self.assertEqual(self._spooled(), [])
@@ -3,19 +3,26 @@ from django.http import JsonResponse
 from django.views.decorators.http import require_POST
 from django.views.decorators.csrf import csrf_protect
 
-from .models import ContactRequest  # <-- ВОТ ЭТОГО НЕ ХВАТАЕТ
+from .forms import ContactRequestForm
+from .ingest import submit
+
 
 @require_POST
 @csrf_protect
 def send_contact(request):
-    ContactRequest.objects.create(
-        full_name=(request.POST.get("full_name") or "").strip(),
-        email=(request.POST.get("email") or "").strip(),
-        phone=(request.POST.get("phone") or "").strip(),
-        message=(request.POST.get("message") or "").strip(),
-    )
+    form = ContactRequestForm(request.POST)
+    is_ajax = request.headers.get("x-requested-with") == "XMLHttpRequest"
+
+    if not form.is_valid():
+        if is_ajax:
+            error = next(iter(form.errors.values()))[0]
+            return JsonResponse({"ok": False, "error": error, "errors": form.errors}, status=400)
+        return redirect("/")
+
+    # дубль отвечает так же, как новая заявка: боту незачем знать разницу
+    submit(form.cleaned_data)
 
-    if request.headers.get("x-requested-with") == "XMLHttpRequest":
+    if is_ajax:
         return JsonResponse({"ok": True, "message": "Заявка отправлена. Мы свяжемся с вами."})
 
     return redirect("/")
@@ -0,0 +1,77 @@
+"""
+Массовые действия админки за фиксированное число запросов.
+
+    apply_bulk_action(
+        self, request, queryset,
+        only=Q(is_published=False) | Q(published_at__isnull=True),
+        values={"is_published": True, "published_at": Coalesce("published_at", Value(now))},
+        message="Опубликовано",
+        after=lambda _: bump_models(NewsPost),
+    )
+
+Строки в память не поднимаются: один UPDATE прямо по queryset (с фильтром
+only), а не цикл по save() или pk__in на десятки тысяч параметров.
+Журнал админки (LogEntry): если изменено не больше ADMIN_BULK_LOG_OBJECTS
+строк — запись на каждый объект, как при обычном сохранении; если больше —
+одна сводная запись без ссылки на объект ("Документы: 40000").
+after() (сброс кэшей) выполняется через transaction.on_commit.
+Строки, которые уже в нужном состоянии, не трогаются и не логируются —
+у них не меняется updated_at, а значит и ETag страниц.
+"""
+import json
+
+from django.conf import settings
+from django.contrib.admin.models import CHANGE, LogEntry
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+
+
+def _log_limit() -> int:
+    return getattr(settings, "ADMIN_BULK_LOG_OBJECTS", 100)
+
+
+def apply_bulk_action(modeladmin, request, queryset, *, values, message, only=None, collect=None, after=None) -> int:
+    """
+    values  — поля для update(), можно с выражениями (Coalesce, Case/When, F).
+    only    — Q-фильтр строк, которым изменение действительно нужно.
+    collect — вызывается в транзакции до UPDATE с queryset изменяемых строк;
+              его результат получает after() (например, id пользователей).
+    after   — вызывается один раз после коммита, если что-то изменилось.
+    Возвращает число изменённых строк.
+    """
+    model = queryset.model
+    if only is not None:
+        queryset = queryset.filter(only)
+    labels = [str(model._meta.get_field(name).verbose_name) for name in values]
+    change_message = [{"changed": {"fields": labels}}]
+    limit = _log_limit()
+
+    with transaction.atomic():
+        # pk нужны только для подробного журнала: больше limit + 1 не читаем
+        pks = list(queryset.order_by().values_list("pk", flat=True)[:limit + 1])
+        collected = collect(queryset) if collect is not None and pks else None
+        changed = queryset.update(**values) if pks else 0
+
+        if changed and changed <= limit and len(pks) <= limit:
+            LogEntry.objects.log_actions(
+                user_id=request.user.pk,
+                queryset=list(model._base_manager.filter(pk__in=pks)),
+                action_flag=CHANGE,
+                change_message=change_message,
+            )
+        elif changed:
+            LogEntry.objects.create(
+                user_id=request.user.pk,
+                content_type_id=ContentType.objects.get_for_model(model, for_concrete_model=False).pk,
+                object_repr=f"{str(model._meta.verbose_name_plural).capitalize()}: {changed}"[:200],
+                action_flag=CHANGE,
+                change_message=json.dumps(change_message),
+            )
+
+    if changed and after is not None:
+        # после коммита внешней транзакции (ATOMIC_REQUESTS и т.п.): иначе
+        # параллельный запрос закэширует ещё старые данные под новой версией
+        transaction.on_commit(lambda: after(collected))
+
+    modeladmin.message_user(request, f"{message}: {changed}.")
+    return changed
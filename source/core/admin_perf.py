@@ -0,0 +1,181 @@
+"""
+Списки админки, которые не тормозят на больших таблицах.
+
+    @admin.register(DocumentPurchase)
+    class DocumentPurchaseAdmin(ScalableChangelistMixin, admin.ModelAdmin):
+        ...
+
+Что делает миксин:
+- select_related по всем FK из list_display (Django без явного
+  list_select_related делает голый select_related(), который пропускает
+  nullable FK — например, категорию новости — и получается N+1);
+- EstimatedCountPaginator вместо COUNT(*) по всей таблице;
+- без «показать все N» (второй полный COUNT) и без счётчиков в фильтрах;
+- варианты фильтров по FK кэшируются (CachedRelatedFieldListFilter);
+- date_hierarchy, если он задан, кэшируется (шаблон admin/scalable_change_list.html);
+  на больших таблицах его лучше не задавать: DISTINCT по датам — полный проход;
+- счётчик под списком честно показывает «≈ N» для оценки и «10 000+» для потолка.
+
+Кэш фильтров и дат привязан к версиям моделей из core.pagecache, так что
+правки через сигналы и bump_models() видны сразу; для моделей вне
+WATCHED_APPS (заявки, пользователи) — максимум через ADMIN_CHANGELIST_CACHE_TIMEOUT.
+"""
+import hashlib
+
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.templatetags.admin_list import date_hierarchy
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.formats import number_format
+from django.utils.functional import cached_property
+
+from core.pagecache import model_versions
+
+_FILTER_KEY = "adminperf:filter:{field}:{versions}"
+_DATES_KEY = "adminperf:dates:{model}:{versions}:{digest}"
+
+
+def _timeout() -> int:
+    return getattr(settings, "ADMIN_CHANGELIST_CACHE_TIMEOUT", 300)
+
+
+def estimate_row_count(model, using="default"):
+    """
+    Примерное число строк таблицы без её сканирования или None, если оценить нельзя.
+    Postgres — статистика планировщика (после ANALYZE/autovacuum);
+    SQLite — max(rowid) - min(rowid) + 1 по B-дереву, то есть с учётом «дыр» от удалений.
+    """
+    connection = connections[using]
+    table = connection.ops.quote_name(model._meta.db_table)
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [table])
+        elif connection.vendor == "sqlite":
+            cursor.execute(f"SELECT MAX(rowid) - MIN(rowid) + 1 FROM {table}")
+        else:
+            return None
+        row = cursor.fetchone()
+    # reltuples = -1, пока таблицу ни разу не анализировали
+    return int(row[0]) if row and row[0] and row[0] > 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Без фильтров и поиска: если по оценке в таблице не меньше
+    ADMIN_ESTIMATED_COUNT_THRESHOLD строк — берём оценку, иначе точный COUNT.
+    С фильтрами: COUNT не дальше ADMIN_FILTERED_COUNT_LIMIT строк — для
+    навигации по страницам больше не нужно, а сузить выборку проще фильтром.
+
+    count_estimated / count_capped говорят шаблону, что число не точное.
+    """
+    count_estimated = False
+    count_capped = False
+
+    @cached_property
+    def count(self):
+        qs = self.object_list
+        if not isinstance(qs, QuerySet):
+            return super().count
+
+        if not qs.query.where:
+            threshold = getattr(settings, "ADMIN_ESTIMATED_COUNT_THRESHOLD", 100_000)
+            estimate = estimate_row_count(qs.model, qs.db)
+            if estimate is not None and estimate >= threshold:
+                self.count_estimated = True
+                return estimate
+            return qs.count()
+
+        limit = getattr(settings, "ADMIN_FILTERED_COUNT_LIMIT", 10_000)
+        count = qs.order_by()[:limit].count()
+        self.count_capped = count >= limit
+        return count
+
+
+def result_count_label(cl) -> str:
+    """
+    Число записей для подписи под списком: «12 345», «≈ 1 234 567» или «10 000+».
+    """
+    label = number_format(cl.result_count, force_grouping=True)
+    paginator = cl.paginator
+    if getattr(paginator, "count_capped", False):
+        return f"{label}+"
+    if getattr(paginator, "count_estimated", False):
+        return f"≈ {label}"
+    return label
+
+
+class CachedRelatedFieldListFilter(admin.RelatedFieldListFilter):
+    """
+    Список вариантов фильтра по FK (категории и т.п.) из кэша, а не SELECT на каждый показ.
+    """
+
+    def field_choices(self, field, request, model_admin):
+        related = field.related_model._meta.label_lower
+        key = _FILTER_KEY.format(
+            field=f"{field.model._meta.label_lower}.{field.name}",
+            versions=".".join(map(str, model_versions([related]))),
+        )
+        choices = cache.get(key)
+        if choices is None:
+            choices = [(pk, str(label)) for pk, label in super().field_choices(field, request, model_admin)]
+            cache.set(key, choices, _timeout())
+        return choices
+
+
+def cached_date_hierarchy(cl):
+    """
+    То же, что тег {% date_hierarchy %}, но результат (MIN/MAX и список лет/месяцев/дней)
+    кэшируется по модели и текущим параметрам списка.
+    """
+    digest = hashlib.sha256(cl.get_query_string().encode()).hexdigest()[:32]
+    key = _DATES_KEY.format(
+        model=cl.model._meta.label_lower,
+        versions=".".join(map(str, model_versions([cl.model._meta.label_lower]))),
+        digest=digest,
+    )
+    data = cache.get(key)
+    if data is None:
+        data = date_hierarchy(cl)
+        if data is not None:
+            cache.set(key, data, _timeout())
+    return data
+
+
+class ScalableChangelistMixin:
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
+    change_list_template = "admin/scalable_change_list.html"
+
+    def get_list_select_related(self, request):
+        declared = super().get_list_select_related(request)
+        if declared is True:
+            return True
+        names = list(declared or ())
+        for name in self.get_list_display(request):
+            if not isinstance(name, str):
+                continue
+            try:
+                field = self.model._meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if field.many_to_one or field.one_to_one:
+                names.append(name)
+        return tuple(dict.fromkeys(names))
+
+    def get_list_filter(self, request):
+        result = []
+        for item in super().get_list_filter(request):
+            if isinstance(item, str):
+                try:
+                    field = self.model._meta.get_field(item)
+                except FieldDoesNotExist:
+                    field = None
+                if field is not None and field.is_relation and not field.auto_created:
+                    item = (item, CachedRelatedFieldListFilter)
+            result.append(item)
+        return result
@@ -3,3 +3,8 @@ from django.apps import AppConfig
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from .signals import connect_page_cache_signals, connect_rendition_signals
+        connect_rendition_signals()
+        connect_page_cache_signals()
@@ -0,0 +1,29 @@
+"""
+Мелочи для async-view поверх async ORM Django.
+
+    docs, categories = await gather_lists(docs_qs, categories_qs)
+
+Независимые запросы запускаются через asyncio.gather. Django всё равно
+выполняет запросы одного соединения в своём потоке по очереди, так что
+выигрыш не в параллельности SQL, а в том, что event loop не блокируется:
+пока ждём БД или медленного клиента, воркер обслуживает другие запросы.
+"""
+import asyncio
+
+
+async def alist(queryset):
+    return [obj async for obj in queryset]
+
+
+async def gather_lists(*querysets):
+    return await asyncio.gather(*(alist(qs) for qs in querysets))
+
+
+async def arequest_user(request):
+    """
+    request.auser() и ленивый request.user кэшируются по отдельности: без
+    подстановки шаблон (контекст-процессор auth, шапка) загрузит пользователя второй раз.
+    """
+    user = await request.auser()
+    request.user = user
+    return user
@@ -0,0 +1,266 @@
+"""
+Бенчмарк публичных страниц: задержка (p50/p95), число запросов к БД и размер ответа.
+
+Запуск (заполнение базы занимает пару минут):
+
+    BENCHMARK=1 python manage.py test core.tests.PublicViewsBenchmark
+    BENCHMARK=1 BENCHMARK_UPDATE=1 python manage.py test core.tests.PublicViewsBenchmark  # новый baseline
+
+Каждый маршрут из ROUTES запрашивается от трёх ролей: аноним, покупатель
+(есть оплаченные документы) и сотрудник, в двух проходах:
+- cold — кэш очищается перед каждым запросом: меряем рендер;
+- warm — кэш прогрет одним запросом и не чистится: меряем то, что видит
+  посетитель на живом сайте (кэш страниц, фрагментов, версий).
+
+Сравнение с core/benchmark_baseline.json:
+- число запросов — не больше, чем в baseline (оно не зависит от железа);
+- размер ответа — не больше чем на SIZE_TOLERANCE и не больше MAX_BYTES
+  (абсолютный потолок: страница в десятки мегабайт — ошибка, а не baseline);
+- задержки в baseline записаны для справки и по умолчанию не проверяются:
+  это замер одной машины. BENCHMARK_LATENCY=1 включает проверку
+  p95 <= baseline × LATENCY_TOLERANCE + LATENCY_SLACK_MS — только если
+  baseline снят на той же машине. Допуск взят из разброса между прогонами:
+  p95 одного маршрута гуляет на 20–40 %, а у быстрых страниц (1–5 мс)
+  шум планировщика сопоставим с самим замером — отсюда запас в мс.
+"""
+import json
+import os
+import statistics
+import time
+import warnings
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver, reverse
+from django.utils import timezone
+
+from core import seeding
+from documents.models import Document, DocumentCategory, DocumentPurchase
+from news.models import NewsCategory, NewsPost
+from portfolio.models import Case, PortfolioPage
+
+BASELINE_PATH = Path(__file__).with_name("benchmark_baseline.json")
+
+VOLUMES = {
+    "news": 10_000,
+    "documents": 50_000,
+    "purchases": 200_000,
+    "users": 2_000,
+    "cases": 200,
+    "contact_requests": 20_000,
+}
+
+ROLES = ("anon", "buyer", "staff")
+REPEAT = 15
+SIZE_TOLERANCE = 0.10
+LATENCY_TOLERANCE = 1.5
+LATENCY_SLACK_MS = 5.0
+# потолок размера ответа; файлы документов сюда не относятся
+MAX_BYTES = 2 * 1024 * 1024
+UNBOUNDED_ROUTES = {"documents:download"}
+PHASES = ("cold", "warm")
+
+
+def scaled_volumes() -> dict:
+    scale = float(os.environ.get("BENCHMARK_SCALE", 1))
+    return {name: max(1, int(count * scale)) for name, count in VOLUMES.items()}
+
+
+def _first_slug(qs):
+    return qs.order_by("pk").values_list("slug", flat=True).first()
+
+
+def seed(media_root: str, volumes=None) -> dict:
+    """
+    Заполняет базу генератором core.seeding и возвращает то, что нужно маршрутам: slug-и и пользователей.
+    """
+    volumes = volumes or scaled_volumes()
+    seeding.seed(volumes, media_root=media_root)
+    User = get_user_model()
+
+    buyer = User.objects.create_user("buyer", email="buyer@example.com", password="pass")
+    staff = User.objects.create_superuser("staff", email="staff@example.com", password="pass")
+
+    available = Document.objects.filter(is_published=True, is_open=True)
+    paid = available.filter(access_type=Document.AccessType.PAID).order_by("pk")
+    # первый платный документ и ещё полсотни покупатель оплатил
+    DocumentPurchase.objects.bulk_create(
+        DocumentPurchase(user=buyer, document_id=pk, status=DocumentPurchase.Status.PAID, paid_at=timezone.now())
+        for pk in paid.values_list("pk", flat=True)[:50]
+    )
+
+    return {
+        "buyer": buyer,
+        "staff": staff,
+        "news": _first_slug(NewsPost.objects.filter(is_published=True)),
+        "news_category": _first_slug(NewsCategory.objects.all()),
+        "document": _first_slug(available.filter(access_type=Document.AccessType.FREE)),
+        "paid_document": _first_slug(paid),
+        "document_category": _first_slug(DocumentCategory.objects.all()),
+        "page": _first_slug(PortfolioPage.objects.all()),
+        "case": _first_slug(Case.objects.filter(is_published=True)),
+    }
+
+
+# (имя маршрута, args из данных seed(), query string)
+ROUTES = (
+    ("core:home", (), ""),
+    ("core:recommendations_list", (), ""),
+    ("core:sitemap", (), ""),
+    ("core:sitemap_section", (lambda d: "news",), ""),
+    ("core:sitemap_section", (lambda d: "documents",), "p=2"),
+    ("news:list", (), ""),
+    ("news:category", (lambda d: d["news_category"],), ""),
+    ("news:detail", (lambda d: d["news"],), ""),
+    ("news:rss", (), ""),
+    ("news:atom", (), ""),
+    ("documents:list", (), ""),
+    ("documents:category", (lambda d: d["document_category"],), ""),
+    ("documents:detail", (lambda d: d["paid_document"],), ""),
+    ("documents:download", (lambda d: d["document"],), ""),
+    ("documents:pay", (lambda d: d["paid_document"],), ""),
+    ("portfolio:index", (), ""),
+    ("portfolio:page", (lambda d: d["page"],), ""),
+    ("portfolio:case_detail", (lambda d: d["case"],), ""),
+    ("search:search", (), "q=энергоаудит+котельная"),
+    ("accounts:signup", (), ""),
+    ("login", (), ""),
+    ("admin:index", (), ""),
+    ("admin:news_newspost_changelist", (), ""),
+    ("admin:documents_document_changelist", (), ""),
+    ("admin:documents_documentpurchase_changelist", (), ""),
+    ("admin:documents_documentpurchase_changelist", (), "status__exact=paid"),
+    ("admin:contacts_contactrequest_changelist", (), ""),
+)
+
+# маршруты, которые не меряем, и почему
+SKIPPED = {
+    "contacts:send": "только POST, пишет заявку",
+    "logout": "только POST",
+    "accounts:logout": "только POST",
+    "accounts:login": "тот же LoginView, что и login",
+    "password_change": "стандартная форма Django",
+    "password_change_done": "стандартная страница Django",
+    "password_reset": "стандартная форма Django",
+    "password_reset_done": "стандартная страница Django",
+    "password_reset_confirm": "нужен одноразовый токен",
+    "password_reset_complete": "стандартная страница Django",
+}
+
+
+def named_routes(resolver=None, prefix=""):
+    """
+    Все именованные маршруты проекта в виде "namespace:name" (кроме админки).
+    """
+    resolver = resolver or get_resolver()
+    for pattern in resolver.url_patterns:
+        if isinstance(pattern, URLResolver):
+            if pattern.namespace == "admin":
+                continue
+            namespace = f"{prefix}{pattern.namespace}:" if pattern.namespace else prefix
+            yield from named_routes(pattern, namespace)
+        elif pattern.name:
+            yield prefix + pattern.name
+
+
+def route_url(name, args, query, data) -> str:
+    url = reverse(name, args=[arg(data) for arg in args])
+    return f"{url}?{query}" if query else url
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _fetch(client, url):
+    response = client.get(url)
+    if response.streaming:
+        with warnings.catch_warnings():
+            # async-итераторы под синхронным клиентом собираются в список — это ожидаемо
+            warnings.simplefilter("ignore")
+            return response, b"".join(response)
+    return response, response.content
+
+
+def measure(client, url, repeat=REPEAT, warm=False) -> dict:
+    """
+    warm=False — кэш чистится перед каждым запросом; warm=True — один запрос
+    для прогрева, дальше кэш не трогаем.
+    """
+    timings = []
+    queries = size = status = None
+    cache.clear()
+    if warm:
+        _fetch(client, url)
+    for _ in range(repeat):
+        if not warm:
+            cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            response, body = _fetch(client, url)
+            timings.append((time.perf_counter() - started) * 1000)
+        queries, size, status = len(ctx.captured_queries), len(body), response.status_code
+    return {
+        "status": status,
+        "queries": queries,
+        "bytes": size,
+        "p50_ms": round(statistics.median(timings), 2),
+        "p95_ms": round(_percentile(timings, 0.95), 2),
+    }
+
+
+def result_key(role, name, query, phase="cold") -> str:
+    return f"{role} {name}{'?' + query if query else ''} [{phase}]"
+
+
+def load_baseline() -> dict:
+    """
+    {"volumes": ..., "repeat": ..., "results": {ключ: замер}} или {}, если baseline ещё не снят.
+    """
+    if not BASELINE_PATH.exists():
+        return {}
+    return json.loads(BASELINE_PATH.read_text(encoding="utf-8"))
+
+
+def save_baseline(results: dict, volumes: dict):
+    data = {"volumes": volumes, "repeat": REPEAT, "results": results}
+    BASELINE_PATH.write_text(json.dumps(data, ensure_ascii=False, indent=1, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def _route_name(key: str) -> str:
+    return key.split(" ", 2)[1].split("?", 1)[0]
+
+
+def compare(results: dict, baseline: dict, check_latency=False) -> list:
+    """
+    Список описаний регрессий (пустой — всё в пределах baseline).
+    """
+    problems = []
+    for key, current in results.items():
+        if current["bytes"] > MAX_BYTES and _route_name(key) not in UNBOUNDED_ROUTES:
+            problems.append(f"{key}: {current['bytes']} байт — больше потолка {MAX_BYTES}")
+        before = baseline.get(key)
+        if before is None:
+            continue
+        if current["status"] != before["status"]:
+            problems.append(f"{key}: статус {before['status']} -> {current['status']}")
+        if current["queries"] > before["queries"]:
+            problems.append(f"{key}: запросов {before['queries']} -> {current['queries']}")
+        if current["bytes"] > before["bytes"] * (1 + SIZE_TOLERANCE):
+            problems.append(f"{key}: размер {before['bytes']} -> {current['bytes']} байт")
+        limit = before["p95_ms"] * LATENCY_TOLERANCE + LATENCY_SLACK_MS
+        if check_latency and current["p95_ms"] > limit:
+            problems.append(f"{key}: p95 {before['p95_ms']} -> {current['p95_ms']} мс (предел {limit:.1f})")
+    return problems
+
+
+def format_report(results: dict) -> str:
+    lines = [f"{'маршрут':<80} {'код':>4} {'SQL':>4} {'байт':>9} {'p50 мс':>8} {'p95 мс':>8}"]
+    for key, r in sorted(results.items()):
+        lines.append(f"{key:<80} {r['status']:>4} {r['queries']:>4} {r['bytes']:>9} {r['p50_ms']:>8} {r['p95_ms']:>8}")
+    return "\n".join(lines)
@@ -0,0 +1,98 @@
+"""
+Вспомогательное для условных GET (ETag / Last-Modified) на страницах деталей.
+
+ETag строится из временных меток записи и того, что видит конкретный
+посетитель: шапка сайта зависит от входа, кнопки документов — от доступа,
+а формы (выход, модалка контактов) несут CSRF-токен. Поэтому в ETag входят
+пользователь и CSRF-cookie: после входа/выхода токен меняется, и старая
+копия из кэша браузера не должна вернуться через 304 — иначе POST формы
+получит 403. Last-Modified отдаём только анонимам: для них страница
+определяется одними временными метками.
+"""
+import hashlib
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators import http
+
+
+def viewer_state(request) -> str:
+    user = getattr(request, "user", None)
+    if not (user and user.is_authenticated):
+        return "anon"
+    if user.is_staff or user.is_superuser:
+        return "staff"
+    return "user"
+
+
+def viewer_key(request) -> tuple:
+    """
+    Части ETag, которые зависят от посетителя: роль, pk пользователя и CSRF-cookie.
+    """
+    user = getattr(request, "user", None)
+    user_pk = user.pk if user and user.is_authenticated else None
+    return viewer_state(request), user_pk, request.COOKIES.get(settings.CSRF_COOKIE_NAME)
+
+
+def make_etag(*parts) -> str:
+    raw = "|".join("" if p is None else str(p) for p in parts)
+    return hashlib.md5(raw.encode(), usedforsecurity=False).hexdigest()
+
+
+def anonymous_last_modified(request, *timestamps):
+    if viewer_state(request) != "anon":
+        return None
+    timestamps = [t for t in timestamps if t is not None]
+    return max(timestamps) if timestamps else None
+
+
+def request_memo(request, key, compute):
+    """
+    etag_func и last_modified_func вызываются по отдельности — чтобы не
+    делать запрос дважды, результат запоминается на объекте запроса.
+    """
+    memo = request.__dict__.setdefault("_conditional_memo", {})
+    if key not in memo:
+        memo[key] = compute()
+    return memo[key]
+
+
+def _condition_passed(request, *args, **kwargs):
+    response = HttpResponse()
+    response.condition_passed = True
+    return response
+
+
+def condition(etag_func=None, last_modified_func=None):
+    """
+    django.views.decorators.http.condition, который годится и для async-view.
+
+    Django для async-view вызывает etag_func/last_modified_func прямо в event
+    loop, а они ходят в ORM. Здесь проверка целиком выполняется в потоке:
+    на "пустом" view condition либо отвечает 304/412, либо проставляет
+    ETag/Last-Modified, которые потом переносим на настоящий ответ.
+    """
+    django_condition = http.condition(etag_func=etag_func, last_modified_func=last_modified_func)
+
+    def decorator(view):
+        if not iscoroutinefunction(view):
+            return django_condition(view)
+
+        check = django_condition(_condition_passed)
+
+        @wraps(view)
+        async def inner(request, *args, **kwargs):
+            probe = await sync_to_async(check)(request, *args, **kwargs)
+            if not getattr(probe, "condition_passed", False):
+                return probe
+            response = await view(request, *args, **kwargs)
+            for header in ("ETag", "Last-Modified"):
+                if probe.has_header(header) and not response.has_header(header):
+                    response[header] = probe[header]
+            return response
+
+        return inner
+
+    return decorator
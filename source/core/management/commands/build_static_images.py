@@ -0,0 +1,80 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from core.static_images import build_variants, find_sources, write_manifest
+
+
+def _init_worker():
+    # при spawn (macOS/Windows) дочерний процесс стартует без настроенного Django
+    if not apps.ready:
+        django.setup()
+
+
+def _process(job):
+    """
+    Выполняется в дочернем процессе. Возвращает (root, name, entry, created, error).
+    """
+    root, name, force = job
+    try:
+        entry, created = build_variants(root, name, force=force)
+        return root, name, entry, created, None
+    except (OSError, ValueError) as exc:
+        return root, name, None, 0, f"{type(exc).__name__}: {exc}"
+
+
+class Command(BaseCommand):
+    help = (
+        "Создаёт WebP/JPEG варианты картинок из static/img и манифест img/variants.json "
+        "для тега {% static_img %}. Запускать перед collectstatic."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Число процессов (по умолчанию — число ядер).",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Пересоздать все варианты, например после смены STATIC_IMAGE_WIDTHS или качества.",
+        )
+
+    def handle(self, *args, **options):
+        sources = find_sources()
+        workers = max(1, options["workers"])
+        self.stdout.write(f"Картинок: {len(sources)}, процессов: {workers}")
+
+        started = time.monotonic()
+        manifests = {}
+        files = errors = 0
+        bytes_in = bytes_out = 0
+
+        jobs = [(root, name, options["force"]) for root, name in sources]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            for root, name, entry, created, error in pool.map(_process, jobs):
+                if error:
+                    errors += 1
+                    self.stderr.write(f"{name}: {error}")
+                    continue
+                manifests.setdefault(root, {})[name] = entry
+                files += created
+                bytes_in += os.path.getsize(os.path.join(root, name))
+                # самый широкий webp — то, что скачает широкий экран
+                bytes_out += os.path.getsize(os.path.join(root, entry["webp"][-1][0]))
+
+        for root, entries in manifests.items():
+            path = write_manifest(root, entries)
+            self.stdout.write(f"Манифест: {path}")
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Готово за {elapsed:.1f} с: создано файлов {files}, ошибок {errors}. "
+            f"Оригиналы {bytes_in / 1024 / 1024:.1f} МБ -> самые широкие WebP {bytes_out / 1024 / 1024:.1f} МБ."
+        ))
@@ -0,0 +1,163 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.pagecache import bump_models
+from core.renditions import (
+    RENDITION_FIELDS,
+    generate_renditions,
+    image_meta,
+    meta_fields,
+    missing_renditions,
+    source_size,
+    target_widths,
+)
+
+
+def _init_worker():
+    # при spawn (macOS/Windows) дочерний процесс стартует без настроенного Django
+    if not apps.ready:
+        django.setup()
+
+
+def _process(job):
+    """
+    Выполняется в дочернем процессе. Возвращает (name, created, bytes_in, meta, widths, error).
+    meta — размеры и заглушка, если их у записи ещё нет; widths — ширины вариантов файла.
+    """
+    name, force, need_meta = job
+    try:
+        path = default_storage.path(name)
+        meta = image_meta(path) if need_meta else None
+        widths = meta["widths"] if meta else target_widths(source_size(path)[0])
+        src_size = os.path.getsize(path)
+        if not force and not missing_renditions(name):
+            return name, 0, 0, meta, widths, None
+        created = generate_renditions(name, force=force)
+        return name, len(created), src_size, meta, widths, None
+    except (OSError, ValueError) as exc:
+        return name, 0, 0, None, None, f"{type(exc).__name__}: {exc}"
+
+
+class Command(BaseCommand):
+    help = (
+        "Создаёт недостающие уменьшенные копии (WebP/JPEG) для всех картинок "
+        "новостей, документов и портфолио. Актуальные варианты (по mtime) пропускаются. "
+        "Заодно заполняет размеры, заглушки и ширины вариантов у записей, загруженных до их появления "
+        "(без ширин тег responsive_image не строит srcset)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Число процессов (по умолчанию — число ядер).",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Пересоздать все варианты, например после смены IMAGE_RENDITION_WIDTHS или качества.",
+        )
+
+    def _collect_names(self):
+        """
+        {name: {(model, field_name), ...}}, множество имён без сохранённой заглушки
+        и {name: {сохранённые ширины вариантов}}.
+        """
+        owners = {}
+        need_meta = set()
+        stored_widths = {}
+        for model_label, field_name in RENDITION_FIELDS:
+            model = apps.get_model(model_label)
+            _, _, placeholder_attr, renditions_attr = meta_fields(field_name)
+            qs = (
+                model._default_manager
+                .exclude(**{f"{field_name}__isnull": True})
+                .exclude(**{field_name: ""})
+                .values_list(field_name, placeholder_attr, renditions_attr)
+                .distinct()
+            )
+            for name, placeholder, widths in qs.iterator():
+                owners.setdefault(name, set()).add((model, field_name))
+                stored_widths.setdefault(name, set()).add(tuple(widths or ()))
+                if not placeholder:
+                    need_meta.add(name)
+        return owners, need_meta, stored_widths
+
+    def _save_meta(self, owners, metas, widths_by_name, stored_widths):
+        touched = set()
+        # у кого заглушка уже есть, но ширины другие (старые записи, --force
+        # после смены IMAGE_RENDITION_WIDTHS) — один UPDATE на модель и набор ширин
+        renditions_updates = {}
+        for name, widths in widths_by_name.items():
+            if name in metas or stored_widths.get(name) == {tuple(widths)}:
+                continue
+            for model, field_name in owners[name]:
+                renditions_updates.setdefault((model, field_name, tuple(widths)), []).append(name)
+
+        with transaction.atomic():
+            for name, meta in metas.items():
+                for model, field_name in owners[name]:
+                    width_attr, height_attr, placeholder_attr, renditions_attr = meta_fields(field_name)
+                    model._base_manager.filter(**{field_name: name}).update(**{
+                        width_attr: meta["width"],
+                        height_attr: meta["height"],
+                        placeholder_attr: meta["placeholder"],
+                        renditions_attr: meta["widths"],
+                    })
+                    touched.add(model)
+            for (model, field_name, widths), names in renditions_updates.items():
+                model._base_manager.filter(**{f"{field_name}__in": names}).update(
+                    **{meta_fields(field_name)[3]: list(widths)}
+                )
+                touched.add(model)
+        if touched:
+            # update() мимо сигналов — кэш страниц сбрасываем сами
+            bump_models(*touched)
+
+    def handle(self, *args, **options):
+        owners, need_meta, stored_widths = self._collect_names()
+        names = sorted(owners)
+        workers = max(1, options["workers"])
+        force = options["force"]
+        self.stdout.write(f"Картинок: {len(names)}, без заглушки: {len(need_meta)}, процессов: {workers}")
+
+        started = time.monotonic()
+        generated = skipped = files = errors = 0
+        bytes_in = 0
+        metas = {}
+        widths_by_name = {}
+
+        jobs = [(name, force, name in need_meta) for name in names]
+        chunksize = max(1, len(jobs) // (workers * 8))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            for name, created, size, meta, widths, error in pool.map(_process, jobs, chunksize=chunksize):
+                if error:
+                    errors += 1
+                    self.stderr.write(f"{name}: {error}")
+                    continue
+                if meta:
+                    metas[name] = meta
+                widths_by_name[name] = widths
+                if created:
+                    generated += 1
+                    files += created
+                    bytes_in += size
+                else:
+                    skipped += 1
+
+        self._save_meta(owners, metas, widths_by_name, stored_widths)
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(self.style.SUCCESS(
+            f"Готово за {elapsed:.1f} с: обработано {generated}, пропущено {skipped}, "
+            f"ошибок {errors}, создано файлов {files}, заглушек {len(metas)}. "
+            f"{generated / elapsed:.1f} карт./с, {bytes_in / elapsed / 1024 / 1024:.1f} МБ/с исходников."
+        ))
@@ -0,0 +1,134 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core import seeding
+
+# ключ в seeding.DEFAULT_VOLUMES -> флаг команды
+VOLUME_OPTIONS = {
+    "news": "news",
+    "documents": "documents",
+    "users": "users",
+    "purchases": "purchases",
+    "cases": "cases",
+    "contact_requests": "contact-requests",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Заполняет базу синтетическими данными в объёме продакшна: рубрики, новости, "
+        "документы с файлами, кейсы с фото и вложениями, пользователи, покупки, заявки. "
+        "Записи помечены префиксом seed- и удаляются через --clear; настоящие данные не трогаются."
+    )
+
+    def add_arguments(self, parser):
+        for key, flag in VOLUME_OPTIONS.items():
+            parser.add_argument(
+                f"--{flag}",
+                dest=key,
+                type=int,
+                default=None,
+                help=f"Сколько создать (по умолчанию {seeding.DEFAULT_VOLUMES[key]} × --scale).",
+            )
+        parser.add_argument(
+            "--scale",
+            type=float,
+            default=1.0,
+            help="Множитель объёмов по умолчанию: --scale 5 — около миллиона покупок.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Число процессов (по умолчанию — число ядер). Куски по "
+                 f"{seeding.CHUNK} строк вставляются параллельно.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=seeding.BATCH,
+            help="Строк в одном INSERT.",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=42,
+            help="Зерно генератора: с тем же значением данные получаются те же.",
+        )
+        parser.add_argument(
+            "--skip-search-index",
+            action="store_true",
+            help="Не перестраивать индекс поиска (потом — rebuild_search_index).",
+        )
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help="Сначала удалить ранее сгенерированные данные.",
+        )
+        parser.add_argument(
+            "--clear-only",
+            action="store_true",
+            help="Только удалить ранее сгенерированные данные.",
+        )
+
+    def _volumes(self, options):
+        scale = options["scale"]
+        if scale < 0:
+            raise CommandError("--scale не может быть отрицательным.")
+        volumes = {}
+        for key in VOLUME_OPTIONS:
+            value = options[key]
+            if value is None:
+                value = round(seeding.DEFAULT_VOLUMES[key] * scale)
+            if value < 0:
+                raise CommandError(f"--{VOLUME_OPTIONS[key]} не может быть отрицательным.")
+            volumes[key] = value
+        return volumes
+
+    def handle(self, *args, **options):
+        volumes = self._volumes(options)
+
+        if options["clear"] or options["clear_only"]:
+            started = time.monotonic()
+            # если дальше seed(), индекс перестроится один раз — в конце
+            deleted = seeding.clear(search_index=options["clear_only"] and not options["skip_search_index"])
+            self.stdout.write(f"Удалено строк: {deleted} за {time.monotonic() - started:.1f} с")
+            if options["clear_only"]:
+                return
+        elif seeding.seeded_exists():
+            raise CommandError("В базе уже есть сгенерированные данные: запустите с --clear.")
+
+        workers = max(1, options["workers"])
+        self.stdout.write(
+            ", ".join(f"{key}: {count}" for key, count in volumes.items()) + f"; процессов: {workers}"
+        )
+
+        started = time.monotonic()
+        verbose = options["verbosity"] >= 2
+        so_far = {}
+
+        def progress(kind, rows):
+            so_far[kind] = so_far.get(kind, 0) + rows
+            if verbose:
+                self.stdout.write(f"  {kind}: {so_far[kind]} ({time.monotonic() - started:.1f} с)")
+
+        counts = seeding.seed(
+            volumes,
+            workers=workers,
+            seed=options["seed"],
+            batch_size=max(1, options["batch_size"]),
+            progress=progress,
+            search_index=not options["skip_search_index"],
+        )
+
+        elapsed = max(time.monotonic() - started, 1e-6)
+        total = sum(counts.values())
+        for kind, count in counts.items():
+            self.stdout.write(f"  {kind}: {count}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Готово за {elapsed:.1f} с: {total} строк, {total / elapsed:.0f} строк/с. Кэш страниц сброшен."
+        ))
+        if options["skip_search_index"]:
+            self.stdout.write("Индекс поиска не перестроен: запустите rebuild_search_index.")
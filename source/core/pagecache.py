@@ -0,0 +1,178 @@
+"""
+Кэш целых страниц для анонимных посетителей.
+
+    @anonymous_page_cache("news.NewsPost", "news.NewsCategory")
+    def news_list(request): ...
+
+Ключ страницы включает версии моделей, от которых она зависит. Любое
+сохранение/удаление объекта такой модели (см. core.signals) поднимает
+её версию — и все зависящие страницы перестают читаться из кэша, а
+остальные остаются. Для queryset.update() и прочих обходов сигналов
+версию поднимают явно через bump_models().
+
+Не кэшируем и не отдаём из кэша:
+- не GET/HEAD;
+- запросы с сессией или cookie сообщений (залогинен / есть состояние);
+- запросы с параметрами вне QUERY_PARAMS (?utm=..., ?x=<random>) — иначе
+  каждый вариант адреса занимал бы место в кэше и вытеснял полезные
+  страницы; разрешённые параметры входят в ключ в отсортированном виде;
+- ответы не 200, стриминговые, с cookies или Cache-Control: private/no-store.
+
+CSRF-токен в формах (модалка контактов есть на каждой странице)
+в кэш не попадает: перед сохранением он заменяется плейсхолдером,
+а при отдаче подставляется свежий токен текущего посетителя.
+"""
+import hashlib
+import re
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+
+_VERSION_KEY = "pagecache:version:{label}"
+_PAGE_KEY = "pagecache:page:{digest}"
+
+_CSRF_INPUT_RE = re.compile(rb'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+_CSRF_PLACEHOLDER = b"__PAGECACHE_CSRF__"
+
+# параметры, которые читают кэшируемые view (пагинация, фильтры, поиск)
+QUERY_PARAMS = frozenset({"page", "after", "before", "per_page", "category", "q"})
+
+# приложения, чьи модели отслеживаются сигналами (core.signals)
+WATCHED_APPS = {"core", "news", "documents", "portfolio"}
+
+
+def _timeout() -> int:
+    return getattr(settings, "PAGE_CACHE_TIMEOUT", 600)
+
+
+def _model_label(model) -> str:
+    return model if isinstance(model, str) else model._meta.label_lower
+
+
+def model_versions(labels):
+    keys = {_VERSION_KEY.format(label=label): label for label in labels}
+    found = cache.get_many(keys)
+    for key in keys.keys() - found.keys():
+        # стартуем не с 1: после вытеснения ключа версии нельзя
+        # случайно попасть на старые записи страниц
+        cache.add(key, time.time_ns(), timeout=None)
+        found[key] = cache.get(key)
+    return [found[key] for key in sorted(keys)]
+
+
+def bump_models(*models):
+    """
+    Сбрасывает кэш всех страниц, зависящих от этих моделей.
+    """
+    for label in {_model_label(m).lower() for m in models}:
+        key = _VERSION_KEY.format(label=label)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+
+
+def _is_cacheable_request(request) -> bool:
+    if request.method not in ("GET", "HEAD"):
+        return False
+    if settings.SESSION_COOKIE_NAME in request.COOKIES or "messages" in request.COOKIES:
+        return False
+    if not QUERY_PARAMS.issuperset(request.GET):
+        return False
+    user = getattr(request, "user", None)
+    return not (user and user.is_authenticated)
+
+
+def _is_cacheable_response(response) -> bool:
+    if response.status_code != 200 or response.streaming or response.cookies:
+        return False
+    cache_control = response.get("Cache-Control", "")
+    return "private" not in cache_control and "no-store" not in cache_control
+
+
+def _page_key(request, labels) -> str:
+    query = sorted((name, value) for name in request.GET for value in request.GET.getlist(name))
+    raw = "|".join([
+        request.get_host(),
+        request.path,
+        repr(query),
+        ",".join(str(v) for v in model_versions(labels)),
+    ])
+    return _PAGE_KEY.format(digest=hashlib.sha256(raw.encode()).hexdigest())
+
+
+def _restore(request, entry) -> HttpResponse:
+    content, headers = entry
+    if _CSRF_PLACEHOLDER in content:
+        token = get_token(request).encode()
+        content = content.replace(_CSRF_PLACEHOLDER, token)
+    response = HttpResponse(content)
+    for name, value in headers:
+        response[name] = value
+    response["X-Page-Cache"] = "hit"
+    return response
+
+
+def _lookup(request, labels):
+    """
+    (ключ, ответ из кэша). Ключ None — запрос не кэшируется.
+    """
+    if not _is_cacheable_request(request):
+        return None, None
+    key = _page_key(request, labels)
+    entry = cache.get(key)
+    return key, (_restore(request, entry) if entry is not None else None)
+
+
+def _store(key, response):
+    if hasattr(response, "render") and callable(response.render):
+        response = response.render()
+
+    if _is_cacheable_response(response):
+        content = _CSRF_INPUT_RE.sub(rb"\1" + _CSRF_PLACEHOLDER + rb"\2", response.content)
+        headers = [(name, value) for name, value in response.items() if name.lower() != "content-length"]
+        cache.set(key, (content, headers), timeout=_timeout())
+        response["X-Page-Cache"] = "miss"
+    return response
+
+
+def anonymous_page_cache(*depends_on):
+    """
+    depends_on — модели ("app.Model" или классы), от которых зависит страница.
+    Подходит и для обычных, и для async-view.
+    """
+    labels = sorted({_model_label(m).lower() for m in depends_on})
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                # кэш и request.user могут ходить в сеть/БД — не в event loop
+                key, cached = await sync_to_async(_lookup)(request, labels)
+                if cached is not None:
+                    return cached
+                response = await view(request, *args, **kwargs)
+                if key is None:
+                    return response
+                return await sync_to_async(_store)(key, response)
+
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            key, cached = _lookup(request, labels)
+            if cached is not None:
+                return cached
+            response = view(request, *args, **kwargs)
+            if key is None:
+                return response
+            return _store(key, response)
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,213 @@
+"""
+Курсорная (keyset) пагинация для лент новостей и документов.
+
+Вместо OFFSET запоминаем значения полей сортировки последней строки
+и следующую страницу выбираем условием "строго после этих значений".
+Глубокие страницы стоят столько же, сколько первая.
+
+Последним полем сортировки должен идти уникальный ключ (обычно "-id"),
+иначе курсор неоднозначен. Nullable-поля сортируются с NULL в конце.
+"""
+import base64
+import binascii
+import json
+from datetime import date, datetime
+
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+
+DEFAULT_PER_PAGE = 20
+MAX_PER_PAGE = 100
+
+
+class KeysetPage:
+    def __init__(self, items, *, has_next, has_prev, next_cursor, prev_cursor, per_page, request):
+        self.items = items
+        self.has_next = has_next
+        self.has_prev = has_prev
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.per_page = per_page
+        self._request = request
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    @property
+    def has_other_pages(self) -> bool:
+        return self.has_next or self.has_prev
+
+    def _url(self, param: str, cursor: str) -> str:
+        query = self._request.GET.copy()
+        query.pop("after", None)
+        query.pop("before", None)
+        query[param] = cursor
+        return f"{self._request.path}?{query.urlencode()}"
+
+    @property
+    def next_url(self):
+        return self._url("after", self.next_cursor) if self.has_next else None
+
+    @property
+    def prev_url(self):
+        return self._url("before", self.prev_cursor) if self.has_prev else None
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        # без обрезки микросекунд: курсор должен точно совпадать со значением в БД
+        return value.isoformat()
+    return value
+
+
+def encode_cursor(values) -> str:
+    raw = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, fields):
+    """
+    Возвращает список значений в типах полей модели или None, если курсор битый.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, binascii.Error):
+        return None
+
+    if not isinstance(values, list) or len(values) != len(fields):
+        return None
+
+    try:
+        return [None if v is None else f.to_python(v) for f, v in zip(fields, values)]
+    except (ValidationError, TypeError):
+        return None
+
+
+def _parse_ordering(model, ordering):
+    spec = []
+    for name in ordering:
+        desc = name.startswith("-")
+        name = name.lstrip("-")
+        field = model._meta.pk if name == "pk" else model._meta.get_field(name)
+        spec.append((field.attname, field, desc))
+    return spec
+
+
+def _keyset_q(spec, values, forward: bool):
+    """
+    Условие "строка идёт после курсора" (forward) или "до курсора" (backward)
+    в порядке spec, где NULL считаются последними.
+    """
+    if not spec:
+        return None
+
+    (name, field, desc), value = spec[0], values[0]
+    rest = _keyset_q(spec[1:], values[1:], forward)
+    # сравнение "дальше по порядку" для прямого обхода
+    later = "lt" if desc else "gt"
+    earlier = "gt" if desc else "lt"
+
+    if value is None:
+        if forward:
+            strict = None
+        else:
+            strict = Q(**{f"{name}__isnull": False})
+        tie = Q(**{f"{name}__isnull": True})
+    else:
+        strict = Q(**{f"{name}__{later if forward else earlier}": value})
+        if forward and field.null:
+            strict |= Q(**{f"{name}__isnull": True})
+        tie = Q(**{name: value})
+
+    q = strict
+    if rest is not None:
+        q = (q | (tie & rest)) if q is not None else (tie & rest)
+    return q
+
+
+def _order_by(spec, forward: bool):
+    exprs = []
+    for name, field, desc in spec:
+        expr_desc = desc if forward else not desc
+        kwargs = {}
+        if field.null:
+            kwargs = {"nulls_last": True} if forward else {"nulls_first": True}
+        exprs.append(F(name).desc(**kwargs) if expr_desc else F(name).asc(**kwargs))
+    return exprs
+
+
+def _per_page(request, default: int, maximum: int) -> int:
+    try:
+        per_page = int(request.GET.get("per_page", default))
+    except (TypeError, ValueError):
+        per_page = default
+    return max(1, min(per_page, maximum))
+
+
+def _page_query(request, queryset, ordering, per_page, max_per_page):
+    spec = _parse_ordering(queryset.model, ordering)
+    fields = [field for _, field, _ in spec]
+    per_page = _per_page(request, per_page, max_per_page)
+
+    after = request.GET.get("after")
+    before = request.GET.get("before")
+    cursor_values = None
+    forward = True
+    if after:
+        cursor_values = decode_cursor(after, fields)
+    elif before:
+        cursor_values = decode_cursor(before, fields)
+        forward = cursor_values is None
+
+    qs = queryset
+    if cursor_values is not None:
+        qs = qs.filter(_keyset_q(spec, cursor_values, forward))
+    qs = qs.order_by(*_order_by(spec, forward))[: per_page + 1]
+    return qs, (spec, per_page, forward, cursor_values is not None)
+
+
+def _make_page(request, rows, state):
+    spec, per_page, forward, has_cursor = state
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    if not forward:
+        rows.reverse()
+
+    if forward:
+        has_next, has_prev = has_more, has_cursor
+    else:
+        has_next, has_prev = True, has_more
+
+    def cursor_for(obj):
+        return encode_cursor([getattr(obj, name) for name, _, _ in spec])
+
+    return KeysetPage(
+        rows,
+        has_next=has_next and bool(rows),
+        has_prev=has_prev and bool(rows),
+        next_cursor=cursor_for(rows[-1]) if rows else None,
+        prev_cursor=cursor_for(rows[0]) if rows else None,
+        per_page=per_page,
+        request=request,
+    )
+
+
+def paginate_keyset(request, queryset, ordering, *, per_page=DEFAULT_PER_PAGE, max_per_page=MAX_PER_PAGE):
+    """
+    Режет queryset на страницу по курсору из ?after= / ?before=.
+    ordering — поля как в order_by(), последним — уникальный ключ.
+    """
+    qs, state = _page_query(request, queryset, ordering, per_page, max_per_page)
+    return _make_page(request, list(qs), state)
+
+
+async def apaginate_keyset(request, queryset, ordering, *, per_page=DEFAULT_PER_PAGE, max_per_page=MAX_PER_PAGE):
+    """
+    То же для async-view: строки читаются через async ORM.
+    """
+    qs, state = _page_query(request, queryset, ordering, per_page, max_per_page)
+    return _make_page(request, [obj async for obj in qs], state)
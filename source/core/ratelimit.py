@@ -0,0 +1,193 @@
+"""
+Ограничение частоты запросов к пишущим эндпоинтам (token bucket в кэше).
+
+Бюджеты задаются в settings.RATE_LIMITS по имени маршрута:
+
+    RATE_LIMITS = {
+        "login": {"ip": "20/10m", "username": "5/10m"},
+        "documents:pay": {"user": "10/10m", "methods": ("GET", "POST")},
+    }
+
+"N/период" — ведро на N запросов, которое целиком наполняется за период
+(s, m, h, d, можно с множителем: "10m"). Ключи ведра:
+- ip       — адрес клиента (IPv6 — по сети /64);
+- user     — id вошедшего пользователя (для анонимов не проверяется);
+- username — поле username из POST (подбор пароля к одному логину).
+
+По умолчанию считаются только POST. При исчерпании любого ведра —
+429 с Retry-After, до view, а значит до ORM и хэширования паролей.
+
+Состояние ведра читается и пишется без блокировок, поэтому при гонке
+пара лишних запросов может пройти — для защиты от потока это не важно.
+При нескольких воркерах нужен общий CACHES, иначе у каждого свои вёдра.
+
+За reverse proxy адрес клиента берётся из RATE_LIMIT_CLIENT_IP_HEADER,
+но только для запросов с адресов из RATE_LIMIT_TRUSTED_PROXIES (см. client_ip).
+"""
+import ipaddress
+import math
+import re
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, JsonResponse
+from django.utils.deprecation import MiddlewareMixin
+
+_KEY = "ratelimit:{route}:{kind}:{ident}"
+_RATE_RE = re.compile(r"^(\d+)/(\d*)([smhd])$")
+_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate: str):
+    """
+    "5/10m" -> (5, 600.0): ёмкость ведра и период полного наполнения.
+    """
+    m = _RATE_RE.match(rate.replace(" ", ""))
+    if not m:
+        raise ValueError(f"Некорректный лимит: {rate!r}")
+    count, multiplier, unit = m.groups()
+    return int(count), float(int(multiplier or 1) * _UNITS[unit])
+
+
+def _parse_ip(raw: str):
+    try:
+        return ipaddress.ip_address(raw.strip())
+    except ValueError:
+        return None
+
+
+def _trusted_proxy(ip) -> bool:
+    if ip is None:
+        return False
+    for entry in getattr(settings, "RATE_LIMIT_TRUSTED_PROXIES", ()):
+        try:
+            if ip in ipaddress.ip_network(entry, strict=False):
+                return True
+        except ValueError:
+            continue
+    return False
+
+
+def client_ip(request) -> str:
+    """
+    Адрес клиента для ведра "ip". Заголовок RATE_LIMIT_CLIENT_IP_HEADER
+    читается только если запрос пришёл от одного из RATE_LIMIT_TRUSTED_PROXIES:
+    иначе клиент сам подставлял бы туда что угодно и обходил лимит.
+    В цепочке (X-Forwarded-For) берётся правый адрес, не являющийся нашим прокси.
+    """
+    raw = request.META.get("REMOTE_ADDR", "")
+    ip = _parse_ip(raw)
+    header = getattr(settings, "RATE_LIMIT_CLIENT_IP_HEADER", None)
+    if header and _trusted_proxy(ip) and request.META.get(header):
+        for candidate in reversed(request.META[header].split(",")):
+            candidate_ip = _parse_ip(candidate)
+            if candidate_ip is None:
+                break
+            ip = candidate_ip
+            if not _trusted_proxy(candidate_ip):
+                break
+    if ip is None:
+        return raw
+    if ip.version == 6:
+        # у одного клиента обычно целая /64
+        return str(ipaddress.ip_network(f"{ip}/64", strict=False))
+    return str(ip)
+
+
+def _identity(request, kind: str):
+    if kind == "ip":
+        return client_ip(request)
+    if kind == "user":
+        user = getattr(request, "user", None)
+        return str(user.pk) if user and user.is_authenticated else None
+    if kind == "username":
+        username = (request.POST.get("username") or "").strip().lower()
+        return username[:150] or None
+    raise ValueError(f"Неизвестный ключ лимита: {kind!r}")
+
+
+class TokenBucket:
+    def __init__(self, key: str, capacity: int, period: float, cache):
+        self.key = key
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.period = period
+        self.cache = cache
+
+    def _tokens(self, now: float) -> float:
+        state = self.cache.get(self.key)
+        if state is None:
+            return float(self.capacity)
+        tokens, updated = state
+        return min(float(self.capacity), tokens + (now - updated) * self.rate)
+
+    def retry_after(self, now: float) -> float:
+        """
+        0 — токен есть; иначе через сколько секунд он появится.
+        """
+        tokens = self._tokens(now)
+        return 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+
+    def take(self, now: float):
+        tokens = self._tokens(now)
+        # полное ведро == отсутствие записи, так что хранить дольше периода незачем
+        self.cache.set(self.key, (tokens - 1, now), timeout=math.ceil(self.period))
+
+
+def buckets_for(request, route: str, budget: dict):
+    cache = caches[getattr(settings, "RATE_LIMIT_CACHE", "default")]
+    for kind, rate in budget.items():
+        if kind == "methods" or not rate:
+            continue
+        ident = _identity(request, kind)
+        if ident is None:
+            continue
+        capacity, period = parse_rate(rate)
+        yield TokenBucket(_KEY.format(route=route, kind=kind, ident=ident), capacity, period, cache)
+
+
+def check(request, route: str, budget: dict) -> float:
+    """
+    Списывает по токену из всех вёдер маршрута. Возвращает 0, если запрос
+    пропущен, иначе Retry-After в секундах (тогда ничего не списывается).
+    """
+    now = time.time()
+    buckets = list(buckets_for(request, route, budget))
+    wait = max((b.retry_after(now) for b in buckets), default=0.0)
+    if wait:
+        return wait
+    for bucket in buckets:
+        bucket.take(now)
+    return 0.0
+
+
+def too_many_requests(request, retry_after: float) -> HttpResponse:
+    seconds = max(1, math.ceil(retry_after))
+    text = f"Слишком много запросов. Попробуйте через {seconds} с."
+    if request.headers.get("x-requested-with") == "XMLHttpRequest":
+        # модалка контактов показывает data.error
+        response = JsonResponse({"ok": False, "error": text}, status=429)
+    else:
+        response = HttpResponse(text, status=429, content_type="text/plain; charset=utf-8")
+    response["Retry-After"] = str(seconds)
+    return response
+
+
+class RateLimitMiddleware(MiddlewareMixin):
+    """
+    Ставится после AuthenticationMiddleware (нужен request.user для ключа "user").
+    """
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not getattr(settings, "RATE_LIMIT_ENABLED", True):
+            return None
+        match = request.resolver_match
+        budget = getattr(settings, "RATE_LIMITS", {}).get(match.view_name) if match else None
+        if not budget or request.method not in budget.get("methods", ("POST",)):
+            return None
+
+        retry_after = check(request, match.view_name, budget)
+        if retry_after:
+            return too_many_requests(request, retry_after)
+        return None
@@ -0,0 +1,237 @@
+"""
+Уменьшенные копии (renditions) загруженных картинок.
+
+Для каждого оригинала рядом с ним кладутся варианты фиксированной ширины
+в WebP и JPEG:
+
+    news/covers/photo.jpeg -> news/covers/photo__320w.webp
+                              news/covers/photo__320w.jpg
+                              news/covers/photo__640w.webp ...
+
+Оригинал не увеличиваем: ширины больше исходной пропускаются.
+Генерация — при сохранении модели (см. core.signals), шаблонный тег
+{% responsive_image %} из core.templatetags.media_tags собирает srcset.
+
+Кроме вариантов, при загрузке считаются размеры, заглушка и список ширин
+вариантов (image_meta): они хранятся в полях модели <поле>_width,
+<поле>_height, <поле>_placeholder, <поле>_renditions. Тег выводит
+width/height и размытое превью до загрузки картинки, а srcset собирает
+по сохранённым ширинам — без обращений к storage. Ширины записываются
+только после того, как варианты созданы на диске. Варианты заменённой
+или удалённой картинки удаляются (core.signals).
+"""
+import base64
+import io
+import os
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+DEFAULT_WIDTHS = (320, 640, 1280)
+PLACEHOLDER_SIZE = 16  # px по большей стороне: WebP такого размера — пара сотен байт
+_EXIF_ORIENTATION = 0x0112
+
+# (модель, поле) — какие ImageField обслуживаем
+RENDITION_FIELDS = (
+    ("news.NewsPost", "cover_image"),
+    ("documents.Document", "preview_image"),
+    ("portfolio.Case", "cover_image"),
+    ("portfolio.CaseImage", "image"),
+)
+
+FORMATS = {
+    # формат -> (расширение, MIME, параметры сохранения Pillow)
+    "webp": ("webp", "image/webp", {"quality": 80, "method": 4}),
+    "jpeg": ("jpg", "image/jpeg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+
+def rendition_widths():
+    return tuple(sorted(getattr(settings, "IMAGE_RENDITION_WIDTHS", DEFAULT_WIDTHS)))
+
+
+def rendition_name(name: str, width: int, fmt: str) -> str:
+    root, _ = os.path.splitext(name)
+    return f"{root}__{width}w.{FORMATS[fmt][0]}"
+
+
+def _is_fresh(src_path: str, dst_path: str) -> bool:
+    try:
+        return os.path.getmtime(dst_path) >= os.path.getmtime(src_path)
+    except OSError:
+        return False
+
+
+def target_widths(src_width: int, widths=None):
+    # какие варианты создаются для картинки такой ширины
+    return [w for w in (widths or rendition_widths()) if w <= src_width]
+
+
+def _prepare(img: Image.Image) -> Image.Image:
+    img = ImageOps.exif_transpose(img)
+    if img.mode not in ("RGB", "L"):
+        # прозрачность в JPEG не нужна — кладём на белый фон
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        rgba = img.convert("RGBA")
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        img = background
+    return img
+
+
+def source_size(path: str):
+    """
+    (width, height) картинки с учётом EXIF-поворота, читает только заголовок файла.
+    """
+    with Image.open(path) as img:
+        # EXIF Orientation 5..8 — картинка повёрнута на 90°
+        rotated = img.getexif().get(_EXIF_ORIENTATION, 1) in (5, 6, 7, 8)
+        return (img.height, img.width) if rotated else (img.width, img.height)
+
+
+def meta_fields(field_name: str):
+    return (
+        f"{field_name}_width",
+        f"{field_name}_height",
+        f"{field_name}_placeholder",
+        f"{field_name}_renditions",
+    )
+
+
+def image_meta(source) -> dict:
+    """
+    {"width", "height", "placeholder", "widths"} для картинки: размеры с учётом
+    EXIF-поворота, data URI крошечного WebP и ширины вариантов, которые для неё
+    создаст generate_renditions(). source — путь или открытый файл (загрузка из формы).
+    """
+    with Image.open(source) as original:
+        rotated = original.getexif().get(_EXIF_ORIENTATION, 1) in (5, 6, 7, 8)
+        width, height = (original.height, original.width) if rotated else original.size
+
+        # для JPEG декодирование сразу в малом масштабе
+        original.draft("RGB", (PLACEHOLDER_SIZE * 4, PLACEHOLDER_SIZE * 4))
+        img = _prepare(original)
+        img.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE), Image.LANCZOS)
+
+        buf = io.BytesIO()
+        img.save(buf, format="WEBP", quality=40)
+    encoded = base64.b64encode(buf.getvalue()).decode("ascii")
+    return {
+        "width": width,
+        "height": height,
+        "placeholder": f"data:image/webp;base64,{encoded}",
+        "widths": target_widths(width),
+    }
+
+
+def set_image_meta(instance, field_name: str, meta):
+    """
+    Раскладывает результат image_meta по полям модели; meta=None — очистить.
+    """
+    width_attr, height_attr, placeholder_attr, renditions_attr = meta_fields(field_name)
+    setattr(instance, width_attr, meta["width"] if meta else None)
+    setattr(instance, height_attr, meta["height"] if meta else None)
+    setattr(instance, placeholder_attr, meta["placeholder"] if meta else "")
+    setattr(instance, renditions_attr, meta["widths"] if meta else [])
+
+
+def missing_renditions(name: str, storage=default_storage, src_width=None, widths=None):
+    """
+    Список (width, fmt, path) вариантов, которых нет или которые старее оригинала.
+    Если src_width не передан, размер оригинала читается из заголовка файла.
+    widths — свой набор ширин вместо IMAGE_RENDITION_WIDTHS.
+    """
+    src_path = storage.path(name)
+    if src_width is None:
+        src_width = source_size(src_path)[0]
+
+    missing = []
+    for width in target_widths(src_width, widths):
+        for fmt in FORMATS:
+            dst_path = storage.path(rendition_name(name, width, fmt))
+            if not _is_fresh(src_path, dst_path):
+                missing.append((width, fmt, dst_path))
+    return missing
+
+
+def generate_renditions(name: str, storage=default_storage, force: bool = False, widths=None, src_width=None):
+    """
+    Создаёт недостающие варианты для одного файла (name — как в FileField).
+    src_width — ширина оригинала, если уже известна (поле <поле>_width):
+    свежесть вариантов проверяется до декодирования, и если всё на месте,
+    картинка не открывается вовсе. Возвращает список путей созданных файлов.
+    """
+    if not name:
+        return []
+
+    src_path = storage.path(name)
+    if not os.path.exists(src_path):
+        return []
+
+    widths = tuple(sorted(widths or rendition_widths()))
+    todo = None
+    if not force:
+        todo = missing_renditions(name, storage, src_width=src_width, widths=widths)
+        if not todo:
+            return []
+
+    with Image.open(src_path) as original:
+        # JPEG умеет декодироваться сразу в уменьшенном масштабе — сильно быстрее
+        if widths:
+            original.draft("RGB", (widths[-1] * 2, widths[-1] * 2))
+        img = _prepare(original)
+
+        if todo is None:
+            todo = [
+                (w, fmt, storage.path(rendition_name(name, w, fmt)))
+                for w in target_widths(img.width, widths)
+                for fmt in FORMATS
+            ]
+
+        created = []
+        resized = {}
+        # от большей ширины к меньшей: каждую следующую уменьшаем из предыдущей
+        for width, fmt, dst_path in sorted(todo, key=lambda t: -t[0]):
+            if width not in resized:
+                source = min(
+                    (im for w, im in resized.items() if w > width),
+                    key=lambda im: im.width,
+                    default=img,
+                )
+                height = max(1, round(img.height * width / img.width))
+                resized[width] = source.resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+
+            options = FORMATS[fmt][2]
+            os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+            tmp_path = f"{dst_path}.tmp"
+            resized[width].save(tmp_path, format=fmt.upper(), **options)
+            os.replace(tmp_path, dst_path)
+            created.append(dst_path)
+
+    return created
+
+
+def srcset_candidates(field_file, widths):
+    """
+    {fmt: [(url, width), ...]} по сохранённым ширинам вариантов, по возрастанию.
+    """
+    storage = field_file.storage
+    return {
+        fmt: [(storage.url(rendition_name(field_file.name, width, fmt)), width) for width in sorted(widths)]
+        for fmt in FORMATS
+    }
+
+
+def delete_renditions(name: str, storage=default_storage, widths=()):
+    """
+    Удаляет варианты файла: сохранённых ширин и текущих IMAGE_RENDITION_WIDTHS.
+    Возвращает число удалённых файлов.
+    """
+    deleted = 0
+    for width in set(widths or ()) | set(rendition_widths()):
+        for fmt in FORMATS:
+            rendition = rendition_name(name, width, fmt)
+            if storage.exists(rendition):
+                storage.delete(rendition)
+                deleted += 1
+    return deleted
@@ -0,0 +1,768 @@
+"""
+Синтетические данные в объёме продакшна: рубрики, новости, документы,
+кейсы с фото и файлами, пользователи, покупки, заявки.
+
+    python manage.py seed_data --scale 5 --workers 4
+
+Всё сгенерированное помечено: slug и username начинаются с SEED_PREFIX,
+почта — на SEED_EMAIL_DOMAIN, файлы лежат в MEDIA_ROOT/seed/. Поэтому
+clear() удаляет только свои записи и не трогает настоящие.
+
+Строки пишутся bulk_create-ами кусками по CHUNK. Куски независимы: у
+каждого свой генератор случайных чисел (seed + вид + номер куска), так
+что при workers > 1 они раскладываются по процессам, а результат от
+числа процессов не зависит. На SQLite писатель один, поэтому процессы
+только готовят значения колонок, а вставляет их основной (executemany).
+
+Файлы настоящие (JPEG, PDF, ZIP, CSV), но их небольшой набор — на одну
+картинку ссылаются тысячи записей.
+
+Распределения похожи на живые: свежих записей больше, чем старых,
+рубрики и документы популярны по закону Ципфа, у большинства
+пользователей покупок нет или одна-две, а у немногих — десятки.
+
+bulk_create идёт мимо сигналов, поэтому в конце перестраивается индекс
+поиска и сбрасываются версии кэша страниц.
+
+Модели берутся через apps.get_model(): модуль импортируется в дочернем
+процессе (spawn) ещё до django.setup().
+"""
+import io
+import os
+import random
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+import django
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageDraw
+
+from core.pagecache import bump_models
+from core.renditions import meta_fields
+
+SEED_PREFIX = "seed-"
+SEED_EMAIL_DOMAIN = "seed.example"
+MEDIA_DIR = "seed"
+
+CHUNK = 10_000  # строк на задание (процесс) — одна транзакция
+BATCH = 2000  # строк в одном INSERT
+
+DEFAULT_VOLUMES = {
+    "news": 10_000,
+    "documents": 50_000,
+    "users": 20_000,
+    "purchases": 200_000,
+    "cases": 300,
+    "contact_requests": 50_000,
+}
+
+RECOMMENDATIONS = 12
+YEARS = 4  # на сколько лет назад растянуты даты
+
+NEWS_CATEGORIES = (
+    "Новости компании", "Энергосбережение", "Законодательство", "Проекты",
+    "Мероприятия", "Обучение", "Технологии", "Интервью",
+)
+DOCUMENT_CATEGORIES = (
+    "Отчёты по энергоаудиту", "Энергетические паспорта", "Методики", "Типовые проекты",
+    "Нормативные документы", "Экспертные заключения", "Программы энергосбережения",
+    "Презентации", "Шаблоны договоров", "Справочники",
+)
+PORTFOLIO_PAGES = ("Энергоаудит", "Экспертизы", "Проектирование", "Обследования", "Паспортизация")
+
+_WORDS = (
+    "энергоаудит", "экспертиза", "проект", "здание", "отопление", "вентиляция",
+    "освещение", "тепловизор", "паспорт", "обследование", "котельная", "учёт",
+    "модернизация", "стандарт", "отчёт", "нормы", "потери", "изоляция", "сеть", "насос",
+    "расход", "тариф", "мощность", "замеры", "рекомендации", "окупаемость", "объект",
+    "теплопотери", "счётчик", "трубопровод", "фасад", "кровля", "автоматика", "экономия",
+)
+_WORKS = (
+    "Энергоаудит", "Экспертиза", "Обследование", "Модернизация", "Проектирование",
+    "Тепловизионная съёмка", "Паспортизация", "Наладка",
+)
+_OBJECTS = (
+    "школы", "котельной", "жилого дома", "больницы", "детского сада", "завода",
+    "тепловых сетей", "бизнес-центра", "склада", "насосной станции", "торгового центра",
+)
+_CITIES = ("Алматы", "Астана", "Шымкент", "Караганда", "Актобе", "Павлодар", "Усть-Каменогорск", "Костанай")
+_NEWS_TAILS = (
+    "итоги работ", "что показали замеры", "ответы на частые вопросы", "новые требования",
+    "опыт заказчика", "разбор ошибок", "сроки и стоимость",
+)
+_DOCUMENT_KINDS = (
+    "Отчёт по энергоаудиту", "Энергетический паспорт", "Методика расчёта", "Типовой проект",
+    "Заключение экспертизы", "Стандарт организации", "Программа энергосбережения",
+)
+_FIRST_NAMES = ("Алексей", "Айгерим", "Дмитрий", "Динара", "Ерлан", "Мария", "Нурлан", "Ольга", "Сергей", "Жанна")
+_LAST_NAMES = ("Ахметов", "Иванова", "Касымов", "Ким", "Петров", "Сейткали", "Смирнова", "Тулеуов", "Жумабаев")
+
+_IMAGE_SIZES = ((1600, 900), (1280, 720), (1200, 800), (1024, 768), (900, 1200), (1080, 1080), (2000, 1125), (800, 600))
+_PDF_SIZES = (30_000, 80_000, 200_000, 500_000)
+
+# списки pk, которые нужны кускам (покупки, документы кейсов); в каждом процессе свои
+_ids_cache = {}
+
+
+def _model(label):
+    return apps.get_model(label)
+
+
+def _init_worker():
+    # при spawn (macOS/Windows) дочерний процесс стартует без настроенного Django
+    if not apps.ready:
+        django.setup()
+
+
+# --- тексты и даты ---
+
+def _sentence(rnd) -> str:
+    return " ".join(rnd.choices(_WORDS, k=rnd.randint(6, 14))).capitalize() + "."
+
+
+def _paragraph(rnd, sentences) -> str:
+    return " ".join(_sentence(rnd) for _ in range(sentences))
+
+
+def _text(rnd, paragraphs) -> str:
+    return "\n\n".join(_paragraph(rnd, rnd.randint(3, 7)) for _ in range(paragraphs))
+
+
+def _paragraphs(rnd) -> int:
+    # длина статей — логнормальная: в основном 3-8 абзацев, изредка 20+
+    return max(2, min(30, round(rnd.lognormvariate(1.6, 0.5))))
+
+
+def _moment(rnd, now, days=YEARS * 365):
+    # степень > 1 сдвигает даты к настоящему: свежих записей больше
+    return now - timedelta(seconds=days * 86400 * rnd.random() ** 1.7)
+
+
+def _zipf_weights(n, s=1.1):
+    return [1 / (k + 1) ** s for k in range(n)]
+
+
+def _popular_index(rnd, n) -> int:
+    # «длинный хвост»: первый процент документов собирает десятую часть покупок
+    return min(n - 1, int(n * rnd.random() ** 2))
+
+
+def _person(rnd):
+    return rnd.choice(_FIRST_NAMES), rnd.choice(_LAST_NAMES)
+
+
+# --- файлы ---
+
+def _jpeg(rnd, width, height) -> bytes:
+    img = Image.new("RGB", (width, height), tuple(rnd.randrange(60, 200) for _ in range(3)))
+    draw = ImageDraw.Draw(img)
+    for _ in range(12):
+        x, y = rnd.randrange(width), rnd.randrange(height)
+        box = (x, y, x + rnd.randrange(width // 8, width // 2), y + rnd.randrange(height // 8, height // 2))
+        shape = draw.rectangle if rnd.random() < 0.5 else draw.ellipse
+        shape(box, fill=tuple(rnd.randrange(256) for _ in range(3)))
+    buf = io.BytesIO()
+    img.save(buf, "JPEG", quality=82)
+    return buf.getvalue()
+
+
+def _pdf(rnd, title: str, size: int) -> bytes:
+    """
+    Настоящий одностраничный PDF; до нужного размера добит объектом-потоком, на который никто не ссылается.
+    """
+    def stream(data):
+        return b"<< /Length %d >>\nstream\n" % len(data) + data + b"\nendstream"
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Contents 4 0 R"
+        b" /Resources << /Font << /F1 5 0 R >> >> >>",
+        stream(b"BT /F1 24 Tf 72 760 Td (" + title.encode("ascii") + b") Tj ET"),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    objects.append(stream(rnd.randbytes(max(0, size - 1024))))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def _csv(rnd, rows) -> bytes:
+    lines = ["дата;объект;расход_гкал;температура"]
+    for day in range(rows):
+        lines.append(f"2025-01-{day % 28 + 1:02d};{rnd.choice(_OBJECTS)};{rnd.uniform(5, 80):.2f};{rnd.uniform(-30, 5):.1f}")
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _zip(rnd) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("zamery.csv", _csv(rnd, 2000))
+        archive.writestr("readme.txt", _text(rnd, 3))
+    return buf.getvalue()
+
+
+def prepare_media(media_root=None) -> dict:
+    """
+    Пишет набор файлов в MEDIA_ROOT/seed/ и возвращает
+    {"images": [(name, meta)], "files": [name], "attachments": [(name, title)]}.
+    meta — размеры, заглушка и ширины вариантов, как у загруженных через форму
+    (core.renditions.image_meta); сами варианты картинок тоже создаются.
+    """
+    from django.core.files.storage import FileSystemStorage
+
+    from core.renditions import generate_renditions, image_meta
+
+    media_root = media_root or settings.MEDIA_ROOT
+    storage = FileSystemStorage(location=media_root)
+    os.makedirs(os.path.join(media_root, MEDIA_DIR), exist_ok=True)
+    rnd = random.Random(0)
+
+    def write(name, data):
+        name = f"{MEDIA_DIR}/{name}"
+        with open(os.path.join(media_root, name), "wb") as f:
+            f.write(data)
+        return name
+
+    images = []
+    for k, (width, height) in enumerate(_IMAGE_SIZES):
+        name = write(f"photo-{k}.jpg", _jpeg(rnd, width, height))
+        generate_renditions(name, storage)
+        images.append((name, image_meta(os.path.join(media_root, name))))
+    files = [write(f"document-{k}.pdf", _pdf(rnd, f"Seed document {k}", size)) for k, size in enumerate(_PDF_SIZES)]
+    attachments = [
+        (files[0], "Отчёт (PDF)"),
+        (files[2], "Технический паспорт (PDF)"),
+        (write("zamery.zip", _zip(rnd)), "Архив замеров"),
+        (write("zamery.csv", _csv(rnd, 500)), "Показания приборов учёта (CSV)"),
+    ]
+    return {"images": images, "files": files, "attachments": attachments}
+
+
+def _with_image(obj, field_name, image):
+    name, meta = image
+    setattr(obj, field_name, name)
+    width_attr, height_attr, placeholder_attr, renditions_attr = meta_fields(field_name)
+    setattr(obj, width_attr, meta["width"])
+    setattr(obj, height_attr, meta["height"])
+    setattr(obj, placeholder_attr, meta["placeholder"])
+    setattr(obj, renditions_attr, meta["widths"])
+    return obj
+
+
+@contextmanager
+def _explicit_timestamps(model):
+    """
+    Отключает auto_now/auto_now_add на время вставки: иначе у всех строк была бы одна дата «сейчас».
+    """
+    saved = [
+        (field, field.auto_now, field.auto_now_add)
+        for field in model._meta.concrete_fields
+        if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False)
+    ]
+    for field, _, _ in saved:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+def _seeded_ids(name):
+    if name not in _ids_cache:
+        if name == "users":
+            from django.contrib.auth import get_user_model
+
+            qs = get_user_model()._default_manager.filter(username__startswith=SEED_PREFIX)
+        elif name == "paid_documents":
+            qs = _model("documents.Document")._default_manager.filter(slug__startswith=SEED_PREFIX, access_type="paid")
+        else:
+            qs = _model("documents.Document")._default_manager.filter(slug__startswith=SEED_PREFIX)
+        _ids_cache[name] = list(qs.order_by("pk").values_list("pk", flat=True))
+    return _ids_cache[name]
+
+
+# --- строки по видам: (rnd, start, stop, ctx) -> список несохранённых объектов ---
+
+def _news_rows(rnd, start, stop, ctx):
+    NewsPost = _model("news.NewsPost")
+    now = ctx["now"]
+    categories = ctx["news_categories"]
+    weights = _zipf_weights(len(categories))
+    rows = []
+    for i in range(start, stop):
+        created = _moment(rnd, now)
+        published = rnd.random() < 0.92
+        post = NewsPost(
+            title=f"{rnd.choice(_WORKS)} {rnd.choice(_OBJECTS)}: {rnd.choice(_NEWS_TAILS)}",
+            slug=f"{SEED_PREFIX}news-{i}",
+            # у каждой десятой новости рубрики нет
+            category_id=rnd.choices(categories, weights)[0] if rnd.random() < 0.9 else None,
+            preview_text=_paragraph(rnd, rnd.randint(1, 2)),
+            body=_text(rnd, _paragraphs(rnd)),
+            is_published=published,
+            published_at=min(now, created + timedelta(hours=rnd.uniform(0, 48))) if published else None,
+            created_at=created,
+            updated_at=min(now, created + timedelta(days=rnd.expovariate(1 / 3))),
+        )
+        if rnd.random() < 0.7:
+            _with_image(post, "cover_image", rnd.choice(ctx["images"]))
+        rows.append(post)
+    return rows
+
+
+def _document_rows(rnd, start, stop, ctx):
+    Document = _model("documents.Document")
+    now = ctx["now"]
+    categories = ctx["document_categories"]
+    weights = _zipf_weights(len(categories))
+    prices = [Decimal(p) for p in ("2000", "5000", "7500", "15000", "30000")]
+    rows = []
+    for i in range(start, stop):
+        created = _moment(rnd, now)
+        paid = rnd.random() < 0.4
+        document = Document(
+            title=f"{rnd.choice(_DOCUMENT_KINDS)} {rnd.choice(_OBJECTS)}, {rnd.choice(_CITIES)}",
+            slug=f"{SEED_PREFIX}doc-{i}",
+            description=_paragraph(rnd, rnd.randint(1, 4)),
+            category_id=rnd.choices(categories, weights)[0] if rnd.random() < 0.95 else None,
+            file=rnd.choice(ctx["files"]),
+            is_published=rnd.random() < 0.93,
+            is_open=rnd.random() < 0.97,
+            access_type="paid" if paid else "free",
+            price=rnd.choices(prices, (30, 35, 15, 15, 5))[0] if paid else None,
+            created_at=created,
+            updated_at=min(now, created + timedelta(days=rnd.expovariate(1 / 10))),
+        )
+        if rnd.random() < 0.5:
+            _with_image(document, "preview_image", rnd.choice(ctx["images"]))
+        rows.append(document)
+    return rows
+
+
+def _user_rows(rnd, start, stop, ctx):
+    from django.contrib.auth import get_user_model
+
+    User = get_user_model()
+    now = ctx["now"]
+    # пароль у всех неиспользуемый — войти под сгенерированными пользователями нельзя
+    password = make_password(None)
+    rows = []
+    for i in range(start, stop):
+        first, last = _person(rnd)
+        joined = _moment(rnd, now)
+        rows.append(User(
+            username=f"{SEED_PREFIX}user-{i}",
+            email=f"user{i}@{SEED_EMAIL_DOMAIN}",
+            first_name=first,
+            last_name=last,
+            password=password,
+            is_active=rnd.random() < 0.98,
+            date_joined=joined,
+            last_login=joined + (now - joined) * rnd.random() if rnd.random() < 0.6 else None,
+        ))
+    return rows
+
+
+def _contact_request_rows(rnd, start, stop, ctx):
+    ContactRequest = _model("contacts.ContactRequest")
+    now = ctx["now"]
+    rows = []
+    for i in range(start, stop):
+        first, last = _person(rnd)
+        created = _moment(rnd, now)
+        # старые заявки почти все разобраны, свежие — меньше половины
+        processed = rnd.random() < (0.97 if now - created > timedelta(days=14) else 0.4)
+        rows.append(ContactRequest(
+            full_name=f"{last} {first}",
+            email=f"client{i}@{SEED_EMAIL_DOMAIN}",
+            phone=f"+770{rnd.randrange(10**8):08d}",
+            message=_paragraph(rnd, rnd.randint(1, 4)),
+            created_at=created,
+            is_processed=processed,
+        ))
+    return rows
+
+
+def _purchase_rows(rnd, start, stop, ctx):
+    """
+    start/stop — срез сгенерированных пользователей: их покупки целиком в одном куске,
+    так что пара (user, document) уникальна без проверок в базе.
+    """
+    DocumentPurchase = _model("documents.DocumentPurchase")
+    now = ctx["now"]
+    documents = _seeded_ids("paid_documents")
+    if not documents:
+        return []
+    limit = max(1, len(documents) // 2)
+    rows = []
+    for user_id in _seeded_ids("users")[start:stop]:
+        count = min(limit, round(rnd.expovariate(1 / ctx["purchases_per_user"])))
+        chosen = set()
+        for _ in range(count * 4):
+            if len(chosen) >= count:
+                break
+            chosen.add(documents[_popular_index(rnd, len(documents))])
+        # sorted: порядок множества зависит от pk, а он между запусками разный
+        for document_id in sorted(chosen):
+            created = _moment(rnd, now)
+            status = rnd.choices(("paid", "pending", "canceled"), (80, 15, 5))[0]
+            rows.append(DocumentPurchase(
+                user_id=user_id,
+                document_id=document_id,
+                status=status,
+                created_at=created,
+                paid_at=created + timedelta(minutes=rnd.uniform(1, 90)) if status == "paid" else None,
+            ))
+    return rows
+
+
+_KINDS = {
+    "news": ("news.NewsPost", _news_rows),
+    "documents": ("documents.Document", _document_rows),
+    "users": (settings.AUTH_USER_MODEL, _user_rows),
+    "contact_requests": ("contacts.ContactRequest", _contact_request_rows),
+    "purchases": ("documents.DocumentPurchase", _purchase_rows),
+}
+
+
+def _build_chunk(job):
+    """
+    Строки одного куска без записи в базу. Возвращает (вид, строки).
+    """
+    kind, start, stop, ctx = job
+    build = _KINDS[kind][1]
+    return kind, build(random.Random(f"{ctx['seed']}:{kind}:{start}"), start, stop, ctx)
+
+
+def _write(kind, rows, batch_size) -> int:
+    model = _model(_KINDS[kind][0])
+    with _explicit_timestamps(model), transaction.atomic():
+        model._default_manager.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+def _prepare_chunk(job):
+    """
+    Для записи одним процессом: строки куска сразу в виде значений колонок.
+    Подготовка значений (pre_save + get_db_prep_save) — основная часть
+    работы bulk_create, её делают дочерние процессы, а пишущему остаётся executemany.
+    """
+    kind, rows = _build_chunk(job)
+    model = _model(_KINDS[kind][0])
+    connection = connections["default"]
+    fields = [field for field in model._meta.concrete_fields if not field.primary_key]
+    with _explicit_timestamps(model):
+        values = [tuple(f.get_db_prep_save(f.pre_save(obj, True), connection) for f in fields) for obj in rows]
+    return kind, [field.column for field in fields], values
+
+
+def _write_values(kind, columns, values) -> int:
+    connection = connections["default"]
+    qn = connection.ops.quote_name
+    sql = "INSERT INTO {} ({}) VALUES ({})".format(
+        qn(_model(_KINDS[kind][0])._meta.db_table),
+        ", ".join(qn(column) for column in columns),
+        ", ".join(["%s"] * len(columns)),
+    )
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.executemany(sql, values)
+    return len(values)
+
+
+def _insert_chunk(job):
+    """
+    Строит и вставляет кусок — в дочернем процессе или в текущем. Возвращает (вид, число строк).
+    """
+    kind, rows = _build_chunk(job)
+    return kind, _write(kind, rows, job[3]["batch_size"])
+
+
+def _close_connections():
+    # дочерние процессы открывают свои соединения: унаследованный сокет
+    # (и тем более пул psycopg) был бы общим с родителем
+    for conn in connections.all(initialized_only=True):
+        conn.close()
+        if hasattr(conn, "close_pool"):
+            conn.close_pool()
+
+
+def _bounded_map(pool, fn, jobs, window):
+    """
+    Как pool.map, но в работе не больше window заданий: готовые куски не копятся в памяти,
+    если запись отстаёт от генерации.
+    """
+    pending = deque()
+    for job in jobs:
+        pending.append(pool.submit(fn, job))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _run(jobs, workers, progress):
+    if workers <= 1 or len(jobs) <= 1:
+        for job in jobs:
+            progress(*_insert_chunk(job))
+        return
+    # у SQLite один писатель: параллельные вставки только ждали бы друг друга
+    # (и падали с "database is locked"), поэтому процессы готовят строки, а пишет текущий
+    serial_writes = connections["default"].vendor == "sqlite"
+    _close_connections()
+    workers = min(workers, len(jobs))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        if serial_writes:
+            for kind, columns, values in _bounded_map(pool, _prepare_chunk, jobs, workers * 2):
+                progress(kind, _write_values(kind, columns, values))
+        else:
+            for kind, count in _bounded_map(pool, _insert_chunk, jobs, workers * 2):
+                progress(kind, count)
+
+
+def _jobs(kind, total, ctx, step=CHUNK):
+    return [(kind, start, min(total, start + step), ctx) for start in range(0, total, step)]
+
+
+# --- мелкие таблицы: в текущем процессе ---
+
+def _seed_categories():
+    NewsCategory = _model("news.NewsCategory")
+    DocumentCategory = _model("documents.DocumentCategory")
+    news = NewsCategory._default_manager.bulk_create(
+        NewsCategory(title=title, slug=f"{SEED_PREFIX}news-category-{k}", order=k)
+        for k, title in enumerate(NEWS_CATEGORIES)
+    )
+    documents = DocumentCategory._default_manager.bulk_create(
+        DocumentCategory(title=title, slug=f"{SEED_PREFIX}document-category-{k}", order=k)
+        for k, title in enumerate(DOCUMENT_CATEGORIES)
+    )
+    return [c.pk for c in news], [c.pk for c in documents]
+
+
+def _seed_portfolio(rnd, total, ctx) -> dict:
+    PortfolioPage = _model("portfolio.PortfolioPage")
+    Case = _model("portfolio.Case")
+    CaseImage = _model("portfolio.CaseImage")
+    CaseAttachment = _model("portfolio.CaseAttachment")
+    CaseDocument = _model("portfolio.CaseDocument")
+    now = ctx["now"]
+
+    # страницы — по самым наполненным категориям документов
+    pages = PortfolioPage._default_manager.bulk_create(
+        PortfolioPage(
+            title=title,
+            slug=f"{SEED_PREFIX}page-{k}",
+            description=_paragraph(rnd, 2),
+            document_category_id=ctx["document_categories"][k % len(ctx["document_categories"])],
+            order=k,
+        )
+        for k, title in enumerate(PORTFOLIO_PAGES)
+    )
+
+    cases = []
+    for i in range(total):
+        created = _moment(rnd, now)
+        case = Case(
+            title=f"{rnd.choice(_WORKS)} {rnd.choice(_OBJECTS)}, {rnd.choice(_CITIES)}",
+            slug=f"{SEED_PREFIX}case-{i}",
+            short_text=_paragraph(rnd, 2),
+            body=_text(rnd, _paragraphs(rnd)),
+            is_published=rnd.random() < 0.9,
+            created_at=created,
+            updated_at=min(now, created + timedelta(days=rnd.expovariate(1 / 5))),
+        )
+        cases.append(_with_image(case, "cover_image", rnd.choice(ctx["images"])))
+    with _explicit_timestamps(Case):
+        cases = Case._default_manager.bulk_create(cases, batch_size=ctx["batch_size"])
+
+    page_links, images, attachments, case_documents = [], [], [], []
+    documents = _seeded_ids("documents")
+    page_weights = _zipf_weights(len(pages), s=0.7)
+    for case in cases:
+        for page in set(rnd.choices(pages, page_weights, k=1 if rnd.random() < 0.8 else 2)):
+            page_links.append(Case.pages.through(case_id=case.pk, portfoliopage_id=page.pk))
+        for k in range(round(rnd.triangular(1, 12, 4))):
+            image = CaseImage(case_id=case.pk, caption=_sentence(rnd)[:200], order=k)
+            images.append(_with_image(image, "image", rnd.choice(ctx["images"])))
+        for k, (name, title) in enumerate(rnd.sample(ctx["attachments"], rnd.choice((0, 0, 1, 1, 2, 3, 4)))):
+            attachments.append(CaseAttachment(case_id=case.pk, title=title, file=name, order=k))
+        for k, document_id in enumerate(rnd.sample(documents, min(len(documents), rnd.randint(0, 8)))):
+            case_documents.append(CaseDocument(case_id=case.pk, document_id=document_id, order=k))
+
+    batch = ctx["batch_size"]
+    Case.pages.through._default_manager.bulk_create(page_links, batch_size=batch)
+    CaseImage._default_manager.bulk_create(images, batch_size=batch)
+    CaseAttachment._default_manager.bulk_create(attachments, batch_size=batch)
+    CaseDocument._default_manager.bulk_create(case_documents, batch_size=batch)
+    return {
+        "pages": len(pages),
+        "cases": len(cases),
+        "case_images": len(images),
+        "case_attachments": len(attachments),
+        "case_documents": len(case_documents),
+    }
+
+
+def _seed_recommendations(rnd, ctx) -> int:
+    Recommendation = _model("core.Recommendation")
+    rows = [
+        Recommendation(title=f"{rnd.choice(_DOCUMENT_KINDS)} {rnd.choice(_OBJECTS)}", document=rnd.choice(ctx["files"]), order=k)
+        for k in range(RECOMMENDATIONS)
+    ]
+    Recommendation._default_manager.bulk_create(rows)
+    return len(rows)
+
+
+def seeded_exists() -> bool:
+    from django.contrib.auth import get_user_model
+
+    return (
+        _model("news.NewsCategory")._default_manager.filter(slug__startswith=SEED_PREFIX).exists()
+        or _model("documents.DocumentCategory")._default_manager.filter(slug__startswith=SEED_PREFIX).exists()
+        or get_user_model()._default_manager.filter(username__startswith=SEED_PREFIX).exists()
+    )
+
+
+def _touched_models():
+    from django.contrib.auth import get_user_model
+
+    labels = (
+        "news.NewsCategory", "news.NewsPost", "documents.DocumentCategory", "documents.Document",
+        "documents.DocumentPurchase", "portfolio.PortfolioPage", "portfolio.Case", "portfolio.CaseImage",
+        "portfolio.CaseAttachment", "portfolio.CaseDocument", "core.Recommendation", "contacts.ContactRequest",
+    )
+    return [_model(label) for label in labels] + [get_user_model()]
+
+
+def _finish(search_index=True):
+    from search.index import fts_available, rebuild
+
+    if search_index and fts_available():
+        rebuild()
+    bump_models(*_touched_models())
+
+
+def seed(volumes=None, *, media_root=None, workers=1, seed=42, batch_size=BATCH, progress=None,
+         search_index=True) -> dict:
+    """
+    Заполняет базу и возвращает {вид: число созданных строк}.
+    volumes — как DEFAULT_VOLUMES (недостающие берутся оттуда);
+    progress(kind, rows) вызывается после каждого куска;
+    search_index=False — не перестраивать индекс поиска (на миллионе строк это
+    минуты; потом можно запустить rebuild_search_index).
+    """
+    volumes = {**DEFAULT_VOLUMES, **(volumes or {})}
+    progress = progress or (lambda kind, rows: None)
+    _ids_cache.clear()
+    rnd = random.Random(seed)
+    media = prepare_media(media_root)
+
+    counts = {}
+
+    def done(kind, rows):
+        counts[kind] = counts.get(kind, 0) + rows
+        progress(kind, rows)
+
+    news_categories, document_categories = _seed_categories()
+    done("categories", len(news_categories) + len(document_categories))
+    ctx = {
+        **media,
+        "seed": seed,
+        "now": timezone.now(),
+        "batch_size": batch_size,
+        "news_categories": news_categories,
+        "document_categories": document_categories,
+        "purchases_per_user": volumes["purchases"] / max(1, volumes["users"]),
+    }
+
+    jobs = []
+    for kind in ("documents", "users", "news", "contact_requests"):
+        jobs += _jobs(kind, volumes[kind], ctx)
+    _run(jobs, workers, done)
+
+    # покупки и кейсы ссылаются на уже вставленных пользователей и документы
+    for kind, rows in _seed_portfolio(rnd, volumes["cases"], ctx).items():
+        done(kind, rows)
+    done("recommendations", _seed_recommendations(rnd, ctx))
+    if volumes["purchases"]:
+        # куски покупок нарезаются по пользователям — примерно по CHUNK покупок
+        step = max(1, round(CHUNK / max(ctx["purchases_per_user"], 1)))
+        _run(_jobs("purchases", volumes["users"], ctx, step), workers, done)
+
+    _finish(search_index)
+    return counts
+
+
+def clear(search_index=True) -> int:
+    """
+    Удаляет всё, что создал seed(), и возвращает число удалённых строк.
+    Все таблицы чистятся _raw_delete, детские раньше родительских: обычный
+    delete() загрузил бы каждую строку, а сигнал поиска на каждую удалённую
+    запись просматривает весь индекс. Индекс перестраивается один раз в конце.
+    """
+    from django.contrib.auth import get_user_model
+
+    def manager(label):
+        return _model(label)._default_manager
+
+    def seeded(label):
+        return manager(label).filter(slug__startswith=SEED_PREFIX)
+
+    documents = seeded("documents.Document")
+    users = get_user_model()._default_manager.filter(username__startswith=SEED_PREFIX)
+    cases = seeded("portfolio.Case")
+    pages = seeded("portfolio.PortfolioPage")
+    Case = _model("portfolio.Case")
+
+    querysets = [
+        manager("documents.DocumentPurchase").filter(user__in=users),
+        manager("documents.DocumentPurchase").filter(document__in=documents),
+        manager("portfolio.CaseDocument").filter(case__in=cases),
+        manager("portfolio.CaseDocument").filter(document__in=documents),
+        manager("portfolio.CaseImage").filter(case__in=cases),
+        manager("portfolio.CaseAttachment").filter(case__in=cases),
+        Case.pages.through._default_manager.filter(case__in=cases),
+        Case.pages.through._default_manager.filter(portfoliopage__in=pages),
+        cases,
+        pages,
+        documents,
+        users,
+        seeded("news.NewsPost"),
+        manager("contacts.ContactRequest").filter(email__endswith=f"@{SEED_EMAIL_DOMAIN}"),
+        manager("core.Recommendation").filter(document__startswith=f"{MEDIA_DIR}/"),
+    ]
+    deleted = 0
+    for qs in querysets:
+        deleted += qs._raw_delete(qs.db)
+
+    # настоящие записи, которые вручную перенесли в сгенерированные рубрики, остаются без рубрики
+    news_categories = seeded("news.NewsCategory")
+    document_categories = seeded("documents.DocumentCategory")
+    manager("news.NewsPost").filter(category__in=news_categories).update(category=None)
+    manager("documents.Document").filter(category__in=document_categories).update(category=None)
+    manager("portfolio.PortfolioPage").filter(document_category__in=document_categories).update(document_category=None)
+    for qs in (news_categories, document_categories):
+        deleted += qs._raw_delete(qs.db)
+
+    _ids_cache.clear()
+    _finish(search_index)
+    return deleted
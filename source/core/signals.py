@@ -0,0 +1,175 @@
+import logging
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
+
+from .pagecache import WATCHED_APPS, bump_models
+from .renditions import (
+    RENDITION_FIELDS,
+    delete_renditions,
+    generate_renditions,
+    image_meta,
+    meta_fields,
+    set_image_meta,
+    target_widths,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _generate_safely(model, pk, field_name, name, storage, src_width, stored_widths):
+    try:
+        generate_renditions(name, storage, src_width=src_width)
+    except (OSError, ValueError):
+        # битая/неподдерживаемая картинка не должна ронять сохранение в админке;
+        # ширины не записываем — srcset не сошлётся на несуществующие файлы
+        logger.exception("Не удалось создать renditions для %s", name)
+        return
+    if src_width is None:
+        return
+    widths = target_widths(src_width)
+    if widths != list(stored_widths or []):
+        # варианты на диске — теперь их можно отдавать в srcset
+        renditions_attr = meta_fields(field_name)[3]
+        model._base_manager.filter(pk=pk, **{field_name: name}).update(**{renditions_attr: widths})
+        bump_models(model)
+
+
+def _make_handler(field_name):
+    def on_save(sender, instance, raw=False, **kwargs):
+        field_file = getattr(instance, field_name)
+        if raw or not field_file:
+            return
+        width_attr, _, _, renditions_attr = meta_fields(field_name)
+        args = (
+            sender, instance.pk, field_name, field_file.name, field_file.storage,
+            getattr(instance, width_attr), getattr(instance, renditions_attr),
+        )
+        # после коммита: не держим транзакцию, пока Pillow жмёт картинки;
+        # если варианты свежие (по mtime и сохранённой ширине), картинка не декодируется
+        transaction.on_commit(lambda: _generate_safely(*args))
+
+    return on_save
+
+
+def _read_meta(field_file):
+    upload = field_file.file
+    try:
+        upload.seek(0)
+        return image_meta(upload)
+    except (OSError, ValueError):
+        logger.exception("Не удалось прочитать картинку %s", field_file.name)
+        return None
+    finally:
+        upload.seek(0)
+
+
+def _delete_unused_renditions(model, field_name, name, widths, storage):
+    # один файл может стоять у нескольких записей (копии, сгенерированные данные)
+    if model._base_manager.filter(**{field_name: name}).exists():
+        return
+    try:
+        delete_renditions(name, storage, widths)
+    except OSError:
+        logger.exception("Не удалось удалить renditions для %s", name)
+
+
+def _forget_old_file(sender, instance, field_name):
+    """
+    Картинку заменили или убрали: после коммита удаляем варианты прежней.
+    Один запрос за прежним именем — только при смене файла.
+    """
+    if instance._state.adding or instance.pk is None:
+        return
+    row = (
+        sender._base_manager
+        .filter(pk=instance.pk)
+        .values_list(field_name, meta_fields(field_name)[3])
+        .first()
+    )
+    if not row or not row[0]:
+        return
+    old_name, old_widths = row
+    storage = getattr(instance, field_name).storage
+    transaction.on_commit(
+        lambda: _delete_unused_renditions(sender, field_name, old_name, old_widths, storage)
+    )
+
+
+def _make_meta_handler(field_name):
+    def on_pre_save(sender, instance, raw=False, **kwargs):
+        if raw:
+            return
+        field_file = getattr(instance, field_name)
+        if not field_file:
+            # размеры есть — значит, картинка была и её только что убрали
+            if getattr(instance, meta_fields(field_name)[0]):
+                _forget_old_file(sender, instance, field_name)
+            set_image_meta(instance, field_name, None)
+        elif not field_file._committed:
+            _forget_old_file(sender, instance, field_name)
+            # новый файл из формы ещё в памяти/во временном файле — читаем его
+            # до записи в storage, и размеры с заглушкой уходят тем же UPDATE;
+            # ширины вариантов — только после того, как файлы созданы (_generate_safely)
+            meta = _read_meta(field_file)
+            set_image_meta(instance, field_name, meta and {**meta, "widths": []})
+
+    return on_pre_save
+
+
+def _make_delete_handler(field_name):
+    def on_delete(sender, instance, **kwargs):
+        field_file = getattr(instance, field_name)
+        if not field_file:
+            return
+        name, widths = field_file.name, getattr(instance, meta_fields(field_name)[3])
+        storage = field_file.storage
+        transaction.on_commit(
+            lambda: _delete_unused_renditions(sender, field_name, name, widths, storage)
+        )
+
+    return on_delete
+
+
+def connect_rendition_signals():
+    for model_label, field_name in RENDITION_FIELDS:
+        model = apps.get_model(model_label)
+        pre_save.connect(
+            _make_meta_handler(field_name),
+            sender=model,
+            weak=False,
+            dispatch_uid=f"image-meta:{model_label}.{field_name}",
+        )
+        post_save.connect(
+            _make_handler(field_name),
+            sender=model,
+            weak=False,
+            dispatch_uid=f"renditions:{model_label}.{field_name}",
+        )
+        post_delete.connect(
+            _make_delete_handler(field_name),
+            sender=model,
+            weak=False,
+            dispatch_uid=f"renditions-delete:{model_label}.{field_name}",
+        )
+
+
+def _bump_on_change(sender, **kwargs):
+    # после коммита: иначе параллельный запрос успеет закэшировать старые
+    # данные уже под новой версией, и они проживут до следующей правки
+    if sender._meta.app_label in WATCHED_APPS:
+        transaction.on_commit(lambda: bump_models(sender))
+
+
+def _bump_on_m2m_change(sender, instance, action, model, **kwargs):
+    # sender — промежуточная модель; меняются обе стороны связи
+    if action.startswith("post_"):
+        related = (sender, type(instance), model)
+        transaction.on_commit(lambda: bump_models(*related))
+
+
+def connect_page_cache_signals():
+    post_save.connect(_bump_on_change, dispatch_uid="pagecache:save")
+    post_delete.connect(_bump_on_change, dispatch_uid="pagecache:delete")
+    m2m_changed.connect(_bump_on_m2m_change, dispatch_uid="pagecache:m2m")
@@ -0,0 +1,144 @@
+"""
+sitemap.xml: индекс и разделы по моделям.
+
+    /sitemap.xml                 — индекс: по ссылке на каждую страницу раздела
+    /sitemap-news.xml?p=2        — раздел, до SITEMAP_PAGE_SIZE адресов на страницу
+
+Разделы отдаются потоком (core.xmlstream): из БД берутся только slug и
+updated_at, строки читаются через aiterator(). lastmod — updated_at записи;
+у страниц портфолио своей метки нет, берётся самый свежий из их кейсов.
+"""
+import math
+
+from django.conf import settings
+from django.db.models import Count, Max, Q
+from django.urls import reverse
+
+from documents.models import Document
+from news.models import NewsPost
+from portfolio.models import Case, PortfolioPage
+
+from .xmlstream import w3c_datetime, xml_text
+
+_SLUG = "__slug__"
+
+_URLSET_OPEN = b'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+_URLSET_CLOSE = b"</urlset>\n"
+
+
+def _pages_queryset():
+    return (
+        PortfolioPage.objects
+        .filter(is_published=True)
+        .annotate(updated_at=Max("cases__updated_at", filter=Q(cases__is_published=True)))
+    )
+
+
+# раздел -> (модели для кэша, queryset, имя маршрута детальной страницы)
+SECTIONS = {
+    "news": (
+        ("news.NewsPost",),
+        lambda: NewsPost.objects.filter(is_published=True),
+        "news:detail",
+    ),
+    "documents": (
+        ("documents.Document",),
+        lambda: Document.objects.filter(is_published=True),
+        "documents:detail",
+    ),
+    "cases": (
+        ("portfolio.Case",),
+        lambda: Case.objects.filter(is_published=True),
+        "portfolio:case_detail",
+    ),
+    "pages": (
+        ("portfolio.PortfolioPage", "portfolio.Case"),
+        _pages_queryset,
+        "portfolio:page",
+    ),
+}
+
+# разводящие страницы без своей даты изменения — в начале раздела "pages"
+STATIC_ROUTES = ("core:home", "news:list", "documents:list", "portfolio:index")
+
+SITEMAP_MODELS = sorted({label for labels, _, _ in SECTIONS.values() for label in labels})
+
+
+def page_size() -> int:
+    # протокол допускает до 50 000 адресов в файле
+    return min(getattr(settings, "SITEMAP_PAGE_SIZE", 10_000), 50_000)
+
+
+def _url_entry(loc: str, lastmod=None) -> bytes:
+    lastmod_tag = f"<lastmod>{w3c_datetime(lastmod)}</lastmod>" if lastmod else ""
+    return f"<url><loc>{xml_text(loc)}</loc>{lastmod_tag}</url>\n".encode()
+
+
+async def section_stats():
+    """
+    {раздел: (число страниц, lastmod раздела)} — по одному агрегату на раздел.
+    """
+    stats = {}
+    for section, (_, queryset, _) in SECTIONS.items():
+        row = await queryset().order_by().aaggregate(count=Count("pk"), lastmod=Max("updated_at"))
+        count = row["count"] + (len(STATIC_ROUTES) if section == "pages" else 0)
+        stats[section] = (max(1, math.ceil(count / page_size())), row["lastmod"])
+    return stats
+
+
+async def page_exists(section: str, page: int) -> bool:
+    """
+    Есть ли в разделе страница с таким номером. Первая есть всегда (пусть и пустая).
+    """
+    if page == 1:
+        return True
+    _, queryset, _ = SECTIONS[section]
+    start = (page - 1) * page_size()
+    if section == "pages":
+        start -= len(STATIC_ROUTES)
+    return await queryset().order_by("pk").values("pk")[start:start + 1].aexists()
+
+
+async def sitemap_index(request, stats):
+    yield b'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    for section, (pages, lastmod) in stats.items():
+        base = request.build_absolute_uri(reverse("core:sitemap_section", args=[section]))
+        for page in range(1, pages + 1):
+            loc = base if page == 1 else f"{base}?p={page}"
+            lastmod_tag = f"<lastmod>{w3c_datetime(lastmod)}</lastmod>" if lastmod else ""
+            yield f"<sitemap><loc>{xml_text(loc)}</loc>{lastmod_tag}</sitemap>\n".encode()
+    yield b"</sitemapindex>\n"
+
+
+async def sitemap_section(request, section: str, page: int):
+    _, queryset, route = SECTIONS[section]
+    size = page_size()
+    start = (page - 1) * size
+
+    yield _URLSET_OPEN
+    if section == "pages":
+        # статические адреса занимают первые места общей нумерации
+        static_urls = [request.build_absolute_uri(reverse(name)) for name in STATIC_ROUTES][start:start + size]
+        for loc in static_urls:
+            yield _url_entry(loc)
+        start = max(0, start - len(STATIC_ROUTES))
+        size -= len(static_urls)
+
+    # reverse() один раз на раздел: дальше только подстановка slug
+    template = request.build_absolute_uri(reverse(route, args=[_SLUG]))
+    # values(), а не values_list(): у ValuesListIterable в Django 5.1 запрос
+    # выполняется уже при создании итератора, и aiterator() падает в event loop
+    rows = (
+        queryset()
+        .order_by("pk")
+        .values("slug", "updated_at")[start:start + size]
+    )
+    buffer = []
+    async for row in rows.aiterator(chunk_size=2000):
+        buffer.append(_url_entry(template.replace(_SLUG, row["slug"]), row["updated_at"]))
+        if len(buffer) >= 500:
+            yield b"".join(buffer)
+            buffer = []
+    if buffer:
+        yield b"".join(buffer)
+    yield _URLSET_CLOSE
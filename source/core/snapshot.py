@@ -0,0 +1,90 @@
+"""
+Снимок данных главной страницы.
+
+Главная — самый посещаемый URL, поэтому всё, что нужно шаблону
+core/home.html, собирается в один сериализуемый словарь и лежит в кэше.
+Ключ содержит версии моделей (core.pagecache.model_versions), так что
+любое изменение документов, их категорий или рекомендаций приводит к
+пересборке при следующем запросе, а в остальное время view не ходит в БД.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from documents.models import Document
+from .async_orm import gather_lists
+from .models import Recommendation
+from .pagecache import model_versions
+
+HOME_SNAPSHOT_MODELS = (
+    "documents.document",
+    "documents.documentcategory",
+    "core.recommendation",
+)
+_KEY = "core:home-snapshot:{versions}"
+
+
+def _home_querysets():
+    documents = (
+        Document.objects
+        .filter(is_published=True, is_open=True)
+        .order_by("-created_at")
+        .values("slug", "title", "description", "access_type", "category__title")[:3]
+    )
+    recommendations = Recommendation.objects.all().order_by("order", "-created_at")[:4]
+    return documents, recommendations
+
+
+def _serialize(documents, recommendations) -> dict:
+    # те же имена полей, что у моделей: шаблону всё равно, объект это или dict
+    return {
+        "documents": [
+            {
+                "slug": d["slug"],
+                "title": d["title"],
+                "description": d["description"],
+                "is_paid": d["access_type"] == Document.AccessType.PAID,
+                "category": {"title": d["category__title"]} if d["category__title"] else None,
+            }
+            for d in documents
+        ],
+        "recommendations": [
+            {"title": r.title, "document": {"url": r.document.url}}
+            for r in recommendations
+        ],
+    }
+
+
+def build_home_snapshot() -> dict:
+    documents, recommendations = _home_querysets()
+    return _serialize(list(documents), list(recommendations))
+
+
+async def abuild_home_snapshot() -> dict:
+    return _serialize(*await gather_lists(*_home_querysets()))
+
+
+def _timeout() -> int:
+    return getattr(settings, "HOME_SNAPSHOT_TIMEOUT", 24 * 60 * 60)
+
+
+def _key() -> str:
+    return _KEY.format(versions=",".join(str(v) for v in model_versions(HOME_SNAPSHOT_MODELS)))
+
+
+def get_home_snapshot() -> dict:
+    key = _key()
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = build_home_snapshot()
+        cache.set(key, snapshot, timeout=_timeout())
+    return snapshot
+
+
+async def aget_home_snapshot() -> dict:
+    key = await sync_to_async(_key)()
+    snapshot = await cache.aget(key)
+    if snapshot is None:
+        snapshot = await abuild_home_snapshot()
+        await cache.aset(key, snapshot, timeout=_timeout())
+    return snapshot
@@ -0,0 +1,103 @@
+"""
+Варианты картинок темы из static/img (hero, кейсы, партнёры, команда).
+
+Команда build_static_images кладёт рядом с оригиналами WebP/JPEG нужных
+ширин (именование как у core.renditions) и пишет манифест img/variants.json:
+
+    {"img/hero.jpg": {"width": 1536, "height": 1024,
+                      "webp": [["img/hero__320w.webp", 320], ...],
+                      "jpeg": [["img/hero__320w.jpg", 320], ...]}}
+
+Самая широкая ширина — ширина оригинала: перекодированная копия весит
+в разы меньше исходника. Запускать до collectstatic, тогда варианты
+тоже получат хэши в именах. Тег {% static_img %} (core.templatetags.media_tags)
+читает манифест; для картинок без записи отдаёт обычный <img>.
+"""
+import json
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.core.files.storage import FileSystemStorage
+
+from core.renditions import FORMATS, generate_renditions, rendition_name, source_size
+
+MANIFEST_NAME = "img/variants.json"
+DEFAULT_WIDTHS = (320, 640, 960, 1280)
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+_RENDITION_RE = re.compile(r"__\d+w\.[a-z]+$")
+
+_manifest_cache = {"path": None, "mtime": None, "data": {}}
+
+
+def static_image_widths():
+    return tuple(sorted(getattr(settings, "STATIC_IMAGE_WIDTHS", DEFAULT_WIDTHS)))
+
+
+def _source_dirs():
+    for entry in settings.STATICFILES_DIRS:
+        # STATICFILES_DIRS допускает пары (prefix, path) — префиксы тут не используем
+        if not isinstance(entry, (list, tuple)):
+            yield str(entry)
+
+
+def find_sources():
+    """
+    [(root, name)] — оригиналы из img/ всех STATICFILES_DIRS, без уже созданных вариантов.
+    """
+    found = []
+    for root in _source_dirs():
+        img_dir = os.path.join(root, "img")
+        for dirpath, _, filenames in os.walk(img_dir):
+            for filename in filenames:
+                if not filename.lower().endswith(IMAGE_EXTENSIONS) or _RENDITION_RE.search(filename):
+                    continue
+                name = os.path.relpath(os.path.join(dirpath, filename), root).replace(os.sep, "/")
+                found.append((root, name))
+    return sorted(found)
+
+
+def build_variants(root: str, name: str, force: bool = False):
+    """
+    Создаёт варианты одной картинки. Возвращает (запись манифеста, число созданных файлов).
+    """
+    storage = FileSystemStorage(location=root)
+    width, height = source_size(storage.path(name))
+    widths = tuple(w for w in static_image_widths() if w < width) + (width,)
+
+    created = generate_renditions(name, storage, force=force, widths=widths)
+    entry = {"width": width, "height": height}
+    for fmt in FORMATS:
+        entry[fmt] = [[rendition_name(name, w, fmt), w] for w in widths]
+    return entry, len(created)
+
+
+def write_manifest(root: str, entries: dict):
+    path = os.path.join(root, MANIFEST_NAME)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(entries, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_manifest() -> dict:
+    """
+    Манифест из static-директорий; перечитывается, только если файл изменился.
+    """
+    path = _manifest_cache["path"] or finders.find(MANIFEST_NAME)
+    if not path:
+        return {}
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        _manifest_cache.update(path=None, mtime=None, data={})
+        return {}
+
+    if _manifest_cache["path"] != path or _manifest_cache["mtime"] != mtime:
+        with open(path, encoding="utf-8") as f:
+            _manifest_cache.update(path=path, mtime=mtime, data=json.load(f))
+    return _manifest_cache["data"]
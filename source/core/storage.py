@@ -0,0 +1,180 @@
+"""
+Хранилище статики для продакшна (STORAGES["staticfiles"]).
+
+collectstatic кладёт в STATIC_ROOT:
+- минифицированные CSS/JS (до хэширования, чтобы хэш считался от итогового файла);
+- копии с хэшем содержимого в имени (home.css -> home.3f2a9c1e07b4.css)
+  и staticfiles.json с соответствием имён — {% static %} отдаёт хэшированный URL;
+- рядом с текстовыми файлами готовые .gz и .br (brotli — если установлен пакет Brotli).
+
+Хэшированные имена никогда не меняют содержимое, поэтому их можно отдавать
+с вечным кэшем. Пример для nginx (brotli_static — модуль ngx_brotli):
+
+    location /static/ {
+        alias /path/to/source/staticfiles/;
+        gzip_static on;
+        brotli_static on;
+        expires max;
+        add_header Cache-Control "public, max-age=31536000, immutable";
+    }
+
+Пока collectstatic не запускали (локальная разработка, тесты) манифеста нет,
+и URL строятся по исходным именам, как у обычного StaticFilesStorage.
+"""
+import gzip
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:  # без пакета Brotli собираем только .gz
+    brotli = None
+
+# что имеет смысл сжимать: картинки jpg/png/webp уже сжаты
+COMPRESS_EXTENSIONS = (".css", ".js", ".svg", ".json", ".txt", ".xml", ".map", ".html", ".ico")
+# сжатая копия нужна, только если она заметно меньше оригинала
+_MIN_SAVING = 0.95
+
+_CSS_TOKEN_RE = re.compile(r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')|(/\*.*?\*/)""", re.S)
+_CSS_PUNCT_RE = re.compile(r"\s*([{};,>])\s*")
+
+
+def minify_css(text: str) -> str:
+    """
+    Убирает комментарии (кроме /*! ... */) и лишние пробелы.
+    Строки в кавычках не трогаем.
+    """
+    chunks = []  # (is_string, text)
+    pos = 0
+    for m in _CSS_TOKEN_RE.finditer(text):
+        chunks.append((False, text[pos:m.start()]))
+        string, comment = m.groups()
+        if string:
+            chunks.append((True, string))
+        elif comment.startswith("/*!"):
+            chunks.append((True, comment))
+        else:
+            chunks.append((False, " "))
+        pos = m.end()
+    chunks.append((False, text[pos:]))
+
+    out = []
+    code = []
+    for is_string, chunk in chunks:
+        if is_string:
+            out.append(_squeeze_css("".join(code)))
+            out.append(chunk)
+            code = []
+        else:
+            code.append(chunk)
+    out.append(_squeeze_css("".join(code)))
+    return "".join(out).strip()
+
+
+def _squeeze_css(code: str) -> str:
+    code = re.sub(r"\s+", " ", code)
+    code = _CSS_PUNCT_RE.sub(r"\1", code)
+    # пробел после ":" не нужен, а перед ним значим в селекторах (a :hover)
+    code = re.sub(r":\s+", ":", code)
+    return code.replace(";}", "}")
+
+
+def minify_js(text: str) -> str:
+    """
+    Осторожная минификация без парсера: убирает отступы, пустые строки
+    и строки-комментарии. Переводы строк сохраняются (ASI), поэтому
+    смысл кода не меняется. Файлы с шаблонными строками (`...`) не трогаем.
+    """
+    if "`" in text:
+        return text
+
+    lines = []
+    in_comment = False
+    for line in text.splitlines():
+        line = line.strip()
+        if in_comment:
+            if "*/" not in line:
+                continue
+            in_comment = False
+            line = line.split("*/", 1)[1].strip()
+        if not line or line.startswith("//"):
+            continue
+        if line.startswith("/*") and not line.startswith("/*!"):
+            if "*/" not in line:
+                in_comment = True
+                continue
+            if line.endswith("*/") and line.count("*/") == 1:
+                continue
+        lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+MINIFIERS = {
+    ".css": minify_css,
+    ".js": minify_js,
+}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def stored_name(self, name):
+        if not self.hashed_files:
+            # манифеста ещё нет — отдаём исходное имя
+            return name
+        return super().stored_name(name)
+
+    def _replace(self, name, data: bytes):
+        if self.exists(name):
+            self.delete(name)
+        self._save(name, ContentFile(data))
+
+    def _minify(self, paths):
+        if not getattr(settings, "STATIC_MINIFY", True):
+            return
+        for path in list(paths):
+            minifier = MINIFIERS.get(path[path.rfind("."):].lower())
+            if minifier is None or path.endswith((".min.css", ".min.js")):
+                continue
+            with self.open(path) as f:
+                source = f.read().decode("utf-8")
+            minified = minifier(source)
+            if len(minified) < len(source):
+                self._replace(path, minified.encode("utf-8"))
+            # дальше хэширование читает уже минифицированную копию из STATIC_ROOT
+            paths[path] = (self, path)
+
+    def _compress(self, name):
+        if not name.lower().endswith(COMPRESS_EXTENSIONS) or not self.exists(name):
+            return
+        with self.open(name) as f:
+            data = f.read()
+
+        variants = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants[".br"] = brotli.compress(data, quality=11)
+
+        for suffix, compressed in variants.items():
+            if len(compressed) < len(data) * _MIN_SAVING:
+                self._replace(name + suffix, compressed)
+            elif self.exists(name + suffix):
+                self.delete(name + suffix)
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            yield from super().post_process(paths, dry_run=dry_run, **options)
+            return
+
+        self._minify(paths)
+
+        compress = []
+        for name, hashed_name, processed in super().post_process(paths, dry_run=dry_run, **options):
+            if not isinstance(processed, Exception):
+                compress.append(name)
+                if hashed_name:
+                    compress.append(hashed_name)
+            yield name, hashed_name, processed
+
+        for name in dict.fromkeys(compress):
+            self._compress(name)
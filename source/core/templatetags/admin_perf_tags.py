@@ -0,0 +1,48 @@
+from django import template
+from django.contrib.admin.templatetags.admin_list import pagination, search_form
+from django.contrib.admin.templatetags.base import InclusionAdminNode
+
+from core.admin_perf import cached_date_hierarchy, result_count_label
+
+register = template.Library()
+
+
+@register.tag(name="cached_date_hierarchy")
+def cached_date_hierarchy_tag(parser, token):
+    # тот же шаблон date_hierarchy.html, что у стандартного тега
+    return InclusionAdminNode(
+        parser,
+        token,
+        func=cached_date_hierarchy,
+        template_name="date_hierarchy.html",
+        takes_context=False,
+    )
+
+
+def _with_count_label(func):
+    def inner(cl):
+        return {**func(cl), "result_count_label": result_count_label(cl)}
+    return inner
+
+
+@register.tag(name="scalable_pagination")
+def scalable_pagination_tag(parser, token):
+    # pagination.html, но с «≈ N» / «10 000+» вместо голого числа
+    return InclusionAdminNode(
+        parser,
+        token,
+        func=_with_count_label(pagination),
+        template_name="scalable_pagination.html",
+        takes_context=False,
+    )
+
+
+@register.tag(name="scalable_search_form")
+def scalable_search_form_tag(parser, token):
+    return InclusionAdminNode(
+        parser,
+        token,
+        func=_with_count_label(search_form),
+        template_name="scalable_search_form.html",
+        takes_context=False,
+    )
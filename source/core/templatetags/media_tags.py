@@ -0,0 +1,147 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from core.renditions import FORMATS, meta_fields, rendition_widths, srcset_candidates
+from core.static_images import load_manifest
+
+register = template.Library()
+
+
+def _srcset(candidates):
+    return ", ".join(f"{url} {width}w" for url, width in candidates)
+
+
+def _stored_meta(field_file):
+    """
+    (width, height, placeholder, widths) из полей модели рядом с ImageField, если они есть.
+    """
+    instance = getattr(field_file, "instance", None)
+    if instance is None:
+        return None, None, "", []
+    width_attr, height_attr, placeholder_attr, renditions_attr = meta_fields(field_file.field.name)
+    return (
+        getattr(instance, width_attr, None),
+        getattr(instance, height_attr, None),
+        getattr(instance, placeholder_attr, ""),
+        getattr(instance, renditions_attr, None) or [],
+    )
+
+
+@register.simple_tag
+def responsive_image(field_file, alt="", sizes="100vw", css_class="", loading="lazy", fetchpriority=""):
+    """
+    <picture> с WebP/JPEG srcset из renditions, ширины которых записаны в модели
+    при загрузке (storage не трогаем). Без них — обычный <img> на оригинал.
+
+        {% responsive_image post.cover_image alt=post.title sizes="(max-width: 640px) 100vw, 33vw" %}
+
+    width/height из модели резервируют место (без сдвига вёрстки), заглушка
+    показывается фоном до загрузки. Для первого экрана — loading="eager" fetchpriority="high".
+    """
+    if not field_file:
+        return ""
+
+    width, height, placeholder, widths = _stored_meta(field_file)
+    attrs = format_html(' loading="{}" decoding="async"', loading)
+    if width and height:
+        attrs = format_html('{} width="{}" height="{}"', attrs, width, height)
+    if placeholder:
+        attrs = format_html('{} style="background:center/cover no-repeat url({})"', attrs, placeholder)
+    if fetchpriority:
+        attrs = format_html('{} fetchpriority="{}"', attrs, fetchpriority)
+    if css_class:
+        attrs = format_html('{} class="{}"', attrs, css_class)
+
+    if not widths:
+        return format_html('<picture class="rimg"><img src="{}" alt="{}"{}></picture>', field_file.url, alt, attrs)
+
+    candidates = srcset_candidates(field_file, widths)
+    jpeg = candidates["jpeg"]
+    if width and max(widths) < rendition_widths()[-1]:
+        # оригинал уже следующей ширины — он сам самый широкий кандидат
+        jpeg = jpeg + [(field_file.url, width)]
+    sources = format_html_join(
+        "",
+        '<source type="{}" srcset="{}" sizes="{}">',
+        (
+            (FORMATS[fmt][1], _srcset(candidates[fmt]), sizes)
+            for fmt in FORMATS
+            if fmt != "jpeg"
+        ),
+    )
+    return format_html(
+        '<picture class="rimg">{}<img src="{}" srcset="{}" sizes="{}" alt="{}"{}></picture>',
+        sources,
+        jpeg[-1][0],
+        _srcset(jpeg),
+        sizes,
+        alt,
+        attrs,
+    )
+
+
+def _static_srcset(variants):
+    return _srcset((static(name), width) for name, width in variants)
+
+
+@register.simple_tag
+def static_img(path, alt="", sizes="100vw", css_class="", loading="lazy", fetchpriority=""):
+    """
+    <picture> для картинки темы из static/ по манифесту build_static_images.
+    Без записи в манифесте — обычный <img> на оригинал.
+
+        {% static_img "img/case1.jpg" alt="..." sizes="(max-width: 640px) 100vw, 25vw" %}
+
+    Для первого экрана (hero) — loading="eager" fetchpriority="high".
+    """
+    class_attr = format_html(' class="{}"', css_class) if css_class else ""
+    priority_attr = format_html(' fetchpriority="{}"', fetchpriority) if fetchpriority else ""
+    entry = load_manifest().get(path)
+
+    if not entry:
+        return format_html(
+            '<img src="{}" alt="{}" loading="{}"{}{}>',
+            static(path), alt, loading, class_attr, priority_attr,
+        )
+
+    sources = format_html_join(
+        "",
+        '<source type="{}" srcset="{}" sizes="{}">',
+        (
+            (FORMATS[fmt][1], _static_srcset(entry[fmt]), sizes)
+            for fmt in FORMATS
+            if fmt != "jpeg" and entry.get(fmt)
+        ),
+    )
+    jpeg = entry["jpeg"]
+    return format_html(
+        '<picture class="rimg">{}<img src="{}" srcset="{}" sizes="{}" width="{}" height="{}" '
+        'alt="{}" loading="{}" decoding="async"{}{}></picture>',
+        sources,
+        static(jpeg[-1][0]),
+        _static_srcset(jpeg),
+        sizes,
+        entry["width"],
+        entry["height"],
+        alt,
+        loading,
+        class_attr,
+        priority_attr,
+    )
+
+
+@register.simple_tag
+def static_img_preload(path, sizes="100vw"):
+    """
+    <link rel="preload"> для картинки первого экрана: браузер начинает
+    качать её вместе с CSS, не дожидаясь разбора разметки.
+    """
+    entry = load_manifest().get(path)
+    if not entry or not entry.get("webp"):
+        return format_html('<link rel="preload" as="image" href="{}">', static(path))
+    return format_html(
+        '<link rel="preload" as="image" type="image/webp" imagesrcset="{}" imagesizes="{}" fetchpriority="high">',
+        _static_srcset(entry["webp"]),
+        sizes,
+    )
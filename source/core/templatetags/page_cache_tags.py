@@ -0,0 +1,17 @@
+from django import template
+
+from core.pagecache import model_versions
+
+register = template.Library()
+
+
+@register.simple_tag
+def model_version(label):
+    """
+    Текущая версия модели для ключа {% cache %}: фрагмент устаревает
+    вместе со страницами, зависящими от этой модели.
+
+        {% model_version "news.NewsCategory" as v %}
+        {% cache 3600 news_filters v current_category.pk %}...{% endcache %}
+    """
+    return model_versions([label.lower()])[0]
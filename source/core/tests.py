@@ -1,3 +1,496 @@
-from django.test import TestCase
+import io
+import os
+import shutil
+import tempfile
+import unittest
+import warnings
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from PIL import Image
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db.models import F
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from documents.models import Document, DocumentPurchase
+from news.models import NewsCategory, NewsPost
+from portfolio.models import Case
+
+from . import benchmark, pagecache, ratelimit, renditions, seeding
+from .pagination import encode_cursor, paginate_keyset
+from .templatetags.media_tags import responsive_image
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+class BenchmarkRoutesTests(TestCase):
+    def test_every_route_is_measured_or_skipped(self):
+        measured = {name for name, _, _ in benchmark.ROUTES}
+        missing = set(benchmark.named_routes()) - measured - set(benchmark.SKIPPED)
+        self.assertFalse(missing, f"Добавьте маршруты в core.benchmark.ROUTES или SKIPPED: {sorted(missing)}")
+
+    def test_compare(self):
+        before = {"status": 200, "queries": 3, "bytes": 1000, "p50_ms": 10, "p95_ms": 12}
+        slow = dict(before, p50_ms=100, p95_ms=120)
+        key = benchmark.result_key("anon", "news:list", "", "warm")
+        # задержки — только по явному запросу
+        self.assertEqual(benchmark.compare({key: slow}, {key: before}), [])
+        self.assertEqual(len(benchmark.compare({key: slow}, {key: before}, check_latency=True)), 1)
+        self.assertEqual(len(benchmark.compare({key: dict(before, queries=4)}, {key: before})), 1)
+
+        huge = dict(before, bytes=benchmark.MAX_BYTES + 1)
+        self.assertEqual(len(benchmark.compare({key: huge}, {})), 1)
+        download = benchmark.result_key("anon", "documents:download", "")
+        self.assertEqual(benchmark.compare({download: huge}, {}), [])
+
+
+class SeedDataTests(TestCase):
+    VOLUMES = ("--news", "40", "--documents", "60", "--users", "20", "--purchases", "100",
+               "--cases", "5", "--contact-requests", "10", "--workers", "1")
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.enterClassContext(override_settings(MEDIA_ROOT=cls.media_root))
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+
+    def _seed(self, *extra):
+        call_command("seed_data", *self.VOLUMES, *extra, stdout=io.StringIO())
+
+    def test_seed_and_clear_leave_real_data(self):
+        real = NewsPost.objects.create(title="Настоящая", slug="real", body="текст", is_published=True)
+
+        self._seed()
+        self.assertEqual(NewsPost.objects.filter(slug__startswith=seeding.SEED_PREFIX).count(), 40)
+        self.assertEqual(Document.objects.count(), 60)
+        self.assertEqual(get_user_model().objects.count(), 20)
+        self.assertTrue(DocumentPurchase.objects.filter(document__access_type="paid").exists())
+        self.assertFalse(DocumentPurchase.objects.exclude(document__access_type="paid").exists())
+        case = Case.objects.first()
+        self.assertTrue(case.cover_image_width and case.cover_image_placeholder and case.cover_image_renditions)
+        self.assertTrue(os.path.exists(os.path.join(self.media_root, case.cover_image.name)))
+
+        # повторно без --clear — отказ, а не дубли slug-ов
+        with self.assertRaises(CommandError):
+            self._seed()
+
+        call_command("seed_data", "--clear-only", stdout=io.StringIO())
+        self.assertEqual(list(NewsPost.objects.values_list("pk", flat=True)), [real.pk])
+        self.assertFalse(Document.objects.exists() or Case.objects.exists() or DocumentPurchase.objects.exists())
+        self.assertFalse(seeding.seeded_exists())
+
+    def test_same_seed_gives_same_data(self):
+        self._seed("--seed", "7")
+        first = list(DocumentPurchase.objects.order_by("user__username", "document__slug")
+                     .values_list("user__username", "document__slug", "status"))
+        self._seed("--seed", "7", "--clear")
+        second = list(DocumentPurchase.objects.order_by("user__username", "document__slug")
+                      .values_list("user__username", "document__slug", "status"))
+        self.assertEqual(first, second)
+
+
+@override_settings(
+    SECURE_SSL_REDIRECT=False,
+    RATE_LIMIT_ENABLED=True,
+    RATE_LIMITS={"contacts:send": {"ip": "3/10m"}},
+    RATE_LIMIT_CLIENT_IP_HEADER="HTTP_X_REAL_IP",
+    RATE_LIMIT_TRUSTED_PROXIES=[],
+)
+class RateLimitTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        spool = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, spool, ignore_errors=True)
+        self.enterContext(override_settings(CONTACTS_SPOOL_DIR=spool))
+        self.sent = 0
+
+    def _send(self, **headers):
+        self.sent += 1
+        data = {"full_name": "Иван", "email": "ivan@example.com", "phone": "+77771234567", "message": f"№{self.sent}"}
+        return self.client.post(reverse("contacts:send"), data, headers={"x-requested-with": "XMLHttpRequest", **headers})
+
+    def test_limit_per_ip(self):
+        for _ in range(3):
+            self.assertEqual(self._send().status_code, 200)
+        response = self._send()
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response["Retry-After"]), 1)
+
+    def test_spoofed_header_is_ignored(self):
+        # заголовок от клиента напрямую (REMOTE_ADDR не доверенный прокси) — ведро по REMOTE_ADDR
+        codes = [self._send(x_real_ip=f"203.0.113.{n}").status_code for n in range(4)]
+        self.assertEqual(codes, [200, 200, 200, 429])
+
+    @override_settings(RATE_LIMIT_TRUSTED_PROXIES=["127.0.0.1"])
+    def test_header_from_trusted_proxy(self):
+        for n in range(4):
+            self.assertEqual(self._send(x_real_ip=f"203.0.113.{n}").status_code, 200)
+        codes = [self._send(x_real_ip="198.51.100.7").status_code for _ in range(4)]
+        self.assertEqual(codes, [200, 200, 200, 429])
+
+    @override_settings(RATE_LIMIT_CLIENT_IP_HEADER="HTTP_X_FORWARDED_FOR", RATE_LIMIT_TRUSTED_PROXIES=["10.0.0.0/8"])
+    def test_forwarded_chain_takes_rightmost_untrusted(self):
+        request = RequestFactory().get(
+            "/", REMOTE_ADDR="10.0.0.2", HTTP_X_FORWARDED_FOR="1.1.1.1, 198.51.100.7, 10.0.0.5",
+        )
+        self.assertEqual(ratelimit.client_ip(request), "198.51.100.7")
+        request = RequestFactory().get("/", REMOTE_ADDR="192.0.2.9", HTTP_X_FORWARDED_FOR="1.1.1.1")
+        self.assertEqual(ratelimit.client_ip(request), "192.0.2.9")
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class PageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.post = NewsPost.objects.create(title="Было", slug="post", body="текст", is_published=True)
+        self.url = reverse("news:detail", args=[self.post.slug])
+
+    def _versions(self):
+        return pagecache.model_versions(["news.newspost", "news.newscategory"])
+
+    def test_page_is_served_from_cache(self):
+        self.client.get(self.url)
+        response = self.client.get(self.url)
+        self.assertEqual(response["X-Page-Cache"], "hit")
+
+    def test_version_is_bumped_after_commit(self):
+        before = self._versions()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.post.title = "Стало"
+            self.post.save()
+            # до коммита версия прежняя: страница, закэшированная сейчас,
+            # легла бы под старый ключ и после коммита не читалась бы
+            self.assertEqual(self._versions(), before)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(self._versions(), before)
+        self.assertContains(self.client.get(self.url), "Стало")
+
+    def test_m2m_and_delete_bump_after_commit(self):
+        before = self._versions()
+        with self.captureOnCommitCallbacks(execute=True):
+            NewsCategory.objects.create(title="Энергетика", slug="energy")
+        after_create = self._versions()
+        self.assertNotEqual(after_create, before)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.post.delete()
+        self.assertNotEqual(self._versions(), after_create)
+
+    def test_unknown_query_params_bypass_cache(self):
+        list_url = reverse("news:list")
+        for i in range(3):
+            response = self.client.get(list_url, {"x": i})
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("X-Page-Cache", response)
+        self.assertIsNone(pagecache._lookup(RequestFactory().get(list_url, {"utm_source": "mail"}), [])[0])
+
+    def test_known_params_share_key_in_any_order(self):
+        list_url = reverse("news:list")
+        self.client.get(f"{list_url}?per_page=5&q=1")
+        response = self.client.get(f"{list_url}?q=1&per_page=5")
+        self.assertEqual(response["X-Page-Cache"], "hit")
+
+
+class KeysetPaginationTests(TestCase):
+    ordering = ("-published_at", "-created_at", "-id")
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        # совпадающие даты и NULL — самые неудобные для курсора случаи
+        dates = [now, now, now, now - timedelta(days=1), None, None, now - timedelta(days=2)]
+        for i, published_at in enumerate(dates):
+            post = NewsPost.objects.create(title=f"Новость {i}", slug=f"post-{i}", body="…", published_at=published_at)
+            NewsPost.objects.filter(pk=post.pk).update(created_at=now - timedelta(minutes=i % 3))
+        cls.expected = list(
+            NewsPost.objects.order_by(F("published_at").desc(nulls_last=True), "-created_at", "-id")
+            .values_list("pk", flat=True)
+        )
+
+    def _page(self, url="/news/", **params):
+        request = RequestFactory().get(url, params)
+        return paginate_keyset(request, NewsPost.objects.all(), self.ordering, per_page=3)
+
+    def _params(self, url):
+        return dict(RequestFactory().get(url).GET.items())
+
+    def test_walks_forward_and_back(self):
+        pages = [self._page()]
+        while pages[-1].has_next:
+            pages.append(self._page(**self._params(pages[-1].next_url)))
+        self.assertEqual([obj.pk for page in pages for obj in page], self.expected)
+        self.assertFalse(pages[0].has_prev)
+
+        back = [pages[-1]]
+        while back[-1].has_prev:
+            back.append(self._page(**self._params(back[-1].prev_url)))
+        self.assertEqual([[o.pk for o in p] for p in reversed(back)], [[o.pk for o in p] for p in pages])
+
+    def test_bad_cursor_falls_back_to_first_page(self):
+        first = [obj.pk for obj in self._page()]
+        for cursor in ("!!!", encode_cursor(["not a date", None, 1]), encode_cursor([1])):
+            self.assertEqual([obj.pk for obj in self._page(after=cursor)], first)
+            self.assertEqual([obj.pk for obj in self._page(before=cursor)], first)
+
+    def test_per_page_is_clamped(self):
+        self.assertEqual(len(self._page(per_page="2")), 2)
+        self.assertEqual(len(self._page(per_page="0")), 1)
+        self.assertEqual(len(self._page(per_page="abc")), 3)
+
+    def test_urls_keep_other_params(self):
+        first = self._page(q="x")
+        self.assertIn("q=x", first.next_url)
+        second = self._page(**self._params(first.next_url))
+        params = self._params(second.prev_url)
+        self.assertEqual(params["q"], "x")
+        self.assertIn("before", params)
+        self.assertNotIn("after", params)
+
+def _jpeg(name, size=(800, 600)) -> SimpleUploadedFile:
+    buf = io.BytesIO()
+    Image.new("RGB", size, "teal").save(buf, "JPEG")
+    return SimpleUploadedFile(name, buf.getvalue(), content_type="image/jpeg")
+
+
+@override_settings(IMAGE_RENDITION_WIDTHS=(320, 640, 1280))
+class RenditionTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=self.media_root))
+
+    def _post(self, slug="post", image=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return NewsPost.objects.create(
+                title="Новость", slug=slug, body="текст", cover_image=image or _jpeg(f"{slug}.jpg"),
+            )
+
+    def _files(self, name):
+        return sorted(
+            f for f in os.listdir(os.path.join(self.media_root, os.path.dirname(name)))
+            if f.startswith(os.path.splitext(os.path.basename(name))[0] + "__")
+        )
+
+    def test_widths_are_stored_at_upload(self):
+        post = self._post()
+        post.refresh_from_db()
+        self.assertEqual(post.cover_image_renditions, [320, 640])
+        self.assertEqual((post.cover_image_width, post.cover_image_height), (800, 600))
+        self.assertEqual(len(self._files(post.cover_image.name)), 4)
+
+    def test_srcset_without_storage_calls(self):
+        post = self._post()
+        post.refresh_from_db()
+        with mock.patch.object(FileSystemStorage, "exists", side_effect=AssertionError("exists()")), \
+                mock.patch.object(FileSystemStorage, "size", side_effect=AssertionError("size()")):
+            html = responsive_image(post.cover_image, alt="Фото")
+        self.assertIn("__320w.webp 320w", html)
+        self.assertIn("__640w.jpg 640w", html)
+        # 1280 не создаётся — самым широким кандидатом идёт оригинал
+        self.assertIn(f"{post.cover_image.url} 800w", html)
+        self.assertIn('width="800" height="600"', html)
+
+    def test_without_widths_plain_img(self):
+        post = self._post()
+        NewsPost.objects.filter(pk=post.pk).update(cover_image_renditions=[])
+        post.refresh_from_db()
+        html = responsive_image(post.cover_image)
+        self.assertNotIn("srcset", html)
+        self.assertIn(post.cover_image.url, html)
+
+    def test_replaced_image_renditions_are_deleted(self):
+        post = self._post()
+        old = post.cover_image.name
+        with self.captureOnCommitCallbacks(execute=True):
+            post.cover_image = _jpeg("new.jpg", size=(1600, 900))
+            post.save()
+        self.assertEqual(self._files(old), [])
+        self.assertEqual(len(self._files(post.cover_image.name)), 6)
+        post.refresh_from_db()
+        self.assertEqual(post.cover_image_renditions, [320, 640, 1280])
+
+    def test_cleared_and_deleted_image_renditions_are_deleted(self):
+        first, second = self._post("first"), self._post("second")
+        first_name, second_name = first.cover_image.name, second.cover_image.name
+        with self.captureOnCommitCallbacks(execute=True):
+            first.cover_image = None
+            first.save()
+        self.assertEqual(self._files(first_name), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertEqual(self._files(second_name), [])
+
+    def test_shared_file_keeps_renditions(self):
+        post = self._post()
+        name = post.cover_image.name
+        NewsPost.objects.create(
+            title="Копия", slug="copy", body="текст", cover_image=name,
+            cover_image_renditions=post.cover_image_renditions,
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            post.delete()
+        self.assertEqual(len(self._files(name)), 4)
+
+    def test_save_without_new_image_does_not_decode(self):
+        post = self._post()
+        post.title = "Другой заголовок"
+        with mock.patch.object(Image, "open", side_effect=AssertionError("Image.open()")), \
+                self.captureOnCommitCallbacks(execute=True):
+            post.save()
+
+    def test_failed_generation_stores_no_widths(self):
+        with mock.patch("core.signals.generate_renditions", side_effect=OSError("disk full")), \
+                self.assertLogs("core.signals", "ERROR"):
+            post = self._post()
+        post.refresh_from_db()
+        self.assertEqual(post.cover_image_renditions, [])
+        self.assertEqual(post.cover_image_width, 800)
+        self.assertNotIn("srcset", responsive_image(post.cover_image))
+
+    def test_command_fills_widths_of_old_rows(self):
+        post = self._post()
+        NewsPost.objects.filter(pk=post.pk).update(cover_image_renditions=[])
+        call_command("generate_renditions", "--workers", "1", stdout=io.StringIO())
+        post.refresh_from_db()
+        self.assertEqual(post.cover_image_renditions, [320, 640])
+
+
+def _body(response) -> bytes:
+    if not response.streaming:
+        return response.content
+    with warnings.catch_warnings():
+        # async-поток под синхронным клиентом собирается целиком — ожидаемо
+        warnings.simplefilter("ignore")
+        return b"".join(response)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, SITEMAP_PAGE_SIZE=2)
+class SitemapFeedTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        for i in range(3):
+            NewsPost.objects.create(title=f"Новость {i}", slug=f"post-{i}", body="текст", is_published=True)
+        NewsPost.objects.create(title="Черновик", slug="draft", body="текст", is_published=False)
+
+    def _section(self, name, **params):
+        return self.client.get(reverse("core:sitemap_section", args=[name]), params)
+
+    def test_index_lists_section_pages(self):
+        body = _body(self.client.get(reverse("core:sitemap"))).decode()
+        self.assertIn("/sitemap-news.xml?p=2</loc>", body)
+        self.assertNotIn("/sitemap-news.xml?p=3", body)
+
+    def test_section_pages(self):
+        first = _body(self._section("news")).decode()
+        second = _body(self._section("news", p=2)).decode()
+        self.assertEqual(first.count("<url>") + second.count("<url>"), 3)
+        self.assertIn("/news/post-2/", second)
+        self.assertNotIn("draft", first + second)
+
+    def test_bad_pages_are_404(self):
+        self.assertEqual(self._section("news", p=3).status_code, 404)
+        self.assertEqual(self._section("news", p=0).status_code, 404)
+        self.assertEqual(self._section("news", p="x").status_code, 404)
+        self.assertEqual(self._section("nope").status_code, 404)
+        # пустой раздел — одна пустая страница, а не 404
+        self.assertEqual(self._section("cases").status_code, 200)
+
+    def test_not_modified_and_cache(self):
+        response = self._section("news")
+        _body(response)
+        etag = response["ETag"]
+        cached = self._section("news")
+        self.assertEqual(cached["X-Page-Cache"], "hit")
+        not_modified = self.client.get(
+            reverse("core:sitemap_section", args=["news"]), headers={"if-none-match": etag},
+        )
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified["ETag"], etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            NewsPost.objects.create(title="Ещё", slug="post-new", body="текст", is_published=True)
+        response = self.client.get(reverse("core:sitemap_section", args=["news"]), headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_feeds(self):
+        rss = _body(self.client.get(reverse("news:rss"))).decode()
+        atom = _body(self.client.get(reverse("news:atom"))).decode()
+        for body in (rss, atom):
+            self.assertIn("Новость 0", body)
+            self.assertNotIn("Черновик", body)
+        self.assertIn("<rss", rss)
+        self.assertIn("<feed", atom)
+
+
+@unittest.skipUnless(os.environ.get("BENCHMARK"), "бенчмарк: BENCHMARK=1 python manage.py test core.tests.PublicViewsBenchmark")
+@override_settings(
+    SECURE_SSL_REDIRECT=False,
+    RATE_LIMIT_ENABLED=False,
+    MEDIA_ROOT=MEDIA_ROOT,
+    CONTACTS_SPOOL_DIR=os.path.join(MEDIA_ROOT, "spool"),
+)
+class PublicViewsBenchmark(TestCase):
+    """
+    p50/p95, число запросов и размер ответа всех публичных страниц на больших объёмах.
+    См. core.benchmark.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.volumes = benchmark.scaled_volumes()
+        cls.data = benchmark.seed(MEDIA_ROOT, cls.volumes)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def _client(self, role):
+        client = Client()
+        if role != "anon":
+            client.force_login(self.data[role])
+        return client
+
+    def test_against_baseline(self):
+        results = {}
+        for role in benchmark.ROLES:
+            client = self._client(role)
+            for name, args, query in benchmark.ROUTES:
+                url = benchmark.route_url(name, args, query, self.data)
+                for phase in benchmark.PHASES:
+                    results[benchmark.result_key(role, name, query, phase)] = benchmark.measure(
+                        client, url, warm=phase == "warm",
+                    )
+        cache.clear()
+
+        print(f"\n{benchmark.format_report(results)}")
+        if os.environ.get("BENCHMARK_UPDATE"):
+            # baseline с превышенным потолком размера не записываем
+            problems = benchmark.compare(results, {})
+            self.assertFalse(problems, "baseline не записан:\n" + "\n".join(problems))
+            benchmark.save_baseline(results, self.volumes)
+            return
+
+        baseline = benchmark.load_baseline()
+        if baseline.get("volumes") != self.volumes:
+            self.skipTest("baseline снят на других объёмах (BENCHMARK_SCALE) — сравнивать не с чем")
+
+        problems = benchmark.compare(
+            results,
+            baseline["results"],
+            check_latency=os.environ.get("BENCHMARK_LATENCY") == "1",
+        )
+        self.assertFalse(problems, "Регрессии относительно baseline:\n" + "\n".join(problems))
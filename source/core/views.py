@@ -1,35 +1,19 @@
+from asgiref.sync import sync_to_async
+from django.http import Http404
 from django.shortcuts import render
 
-from news.models import NewsPost
-from documents.models import Document
+from . import sitemaps
 from .models import Recommendation
+from .pagecache import anonymous_page_cache
+from .snapshot import HOME_SNAPSHOT_MODELS, aget_home_snapshot
+from .xmlstream import cached_xml_response
 
 
-def home(request):
-    news_posts = (
-        NewsPost.objects
-        .filter(is_published=True)
-        .order_by("-published_at", "-created_at")[:3]
-    )
-
-    documents = (
-        Document.objects
-        .filter(is_published=True, is_open=True)
-        .select_related("category")
-        .order_by("-created_at")[:3]
-    )
-
-    recommendations = (
-        Recommendation.objects
-        .all()
-        .order_by("order", "-created_at")[:4]
-    )
-
-    return render(request, "core/home.html", {
-        "news_posts": news_posts,
-        "documents": documents,
-        "recommendations": recommendations,
-    })
+@anonymous_page_cache(*HOME_SNAPSHOT_MODELS)
+async def home(request):
+    snapshot = await aget_home_snapshot()
+    # рендер в потоке: шаблон шапки лениво читает request.user
+    return await sync_to_async(render)(request, "core/home.html", snapshot)
 
 
 def recommendations_list(request):
@@ -38,3 +22,38 @@ def recommendations_list(request):
     return render(request, "core/recommendations_list.html", {
         "recommendations": recommendations
     })
+
+
+async def sitemap_index(request):
+    async def generate():
+        # агрегаты по разделам считаются только при промахе кэша
+        stats = await sitemaps.section_stats()
+        async for chunk in sitemaps.sitemap_index(request, stats):
+            yield chunk
+
+    return await cached_xml_response(request, "sitemap", sitemaps.SITEMAP_MODELS, generate)
+
+
+async def sitemap_section(request, section: str):
+    if section not in sitemaps.SECTIONS:
+        raise Http404
+    try:
+        page = int(request.GET.get("p", 1))
+    except ValueError:
+        raise Http404
+    if page < 1:
+        raise Http404
+
+    async def validate():
+        # номер страницы за пределами раздела — 404, а не пустой urlset
+        if not await sitemaps.page_exists(section, page):
+            raise Http404
+
+    labels = sitemaps.SECTIONS[section][0]
+    return await cached_xml_response(
+        request,
+        f"sitemap-{section}-{page}",
+        labels,
+        lambda: sitemaps.sitemap_section(request, section, page),
+        validate=validate,
+    )
@@ -0,0 +1,93 @@
+"""
+Потоковые XML-ответы (sitemap, RSS/Atom), закэшированные до изменения контента.
+
+    return await cached_xml_response(
+        request, "sitemap-news", ("news.NewsPost",), lambda: news_urls(request, page),
+    )
+
+generate() — async-генератор байтовых кусков. Первый запрос после
+изменения любой из моделей отдаётся потоком (строки читаются через
+aiterator(), весь набор в памяти не собирается) и попутно складывается
+в кэш; дальше — готовые байты из кэша. Ключ содержит версии моделей из
+core.pagecache, так что кэш живёт ровно до сохранения/удаления записи.
+ETag тот же, что и ключ: краулер с If-None-Match получает 304.
+"""
+from datetime import timezone as dt_timezone
+from xml.sax.saxutils import escape
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+
+from core.conditional import make_etag
+from core.pagecache import model_versions
+
+_KEY = "xmlstream:{digest}"
+
+
+def _timeout() -> int:
+    # версии моделей сами отсекают устаревшее, таймаут — только чтобы не копить мусор
+    return getattr(settings, "XML_FEEDS_CACHE_TIMEOUT", 86400)
+
+
+def xml_text(value) -> str:
+    # годится и для текста, и для значений атрибутов в двойных кавычках
+    return escape("" if value is None else str(value), {'"': "&quot;"})
+
+
+def w3c_datetime(value) -> str:
+    """
+    2026-01-19T16:14:00Z — формат и для <lastmod>, и для Atom.
+    """
+    return value.astimezone(dt_timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def rfc822_datetime(value) -> str:
+    # для RSS: Mon, 19 Jan 2026 16:14:00 +0000 (без локали — названия английские)
+    value = value.astimezone(dt_timezone.utc)
+    day = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")[value.weekday()]
+    month = ("Jan", "Feb", "Mar", "Apr", "May", "Jun",
+             "Jul", "Aug", "Sep", "Oct", "Nov", "Dec")[value.month - 1]
+    return f"{day}, {value.day:02d} {month} {value.year} {value:%H:%M:%S} +0000"
+
+
+async def _tee(chunks, key):
+    parts = []
+    async for chunk in chunks:
+        parts.append(chunk)
+        yield chunk
+    await cache.aset(key, b"".join(parts), timeout=_timeout())
+
+
+async def cached_xml_response(request, name: str, labels, generate, content_type="application/xml", validate=None):
+    """
+    name — что это за документ (плюс номер страницы и т.п.), labels — модели, от которых он зависит.
+    validate — корутина-функция, которая при промахе кэша проверяет, что
+    документ вообще есть (например, номер страницы sitemap), и бросает Http404:
+    после начала потока поменять статус уже нельзя.
+    """
+    # версии читаются из кэша синхронно — не в event loop
+    versions = await sync_to_async(model_versions)(sorted(label.lower() for label in labels))
+    digest = make_etag(name, request.scheme, request.get_host(), *versions)
+    etag = f'"{digest}"'
+    content_type = f"{content_type}; charset=utf-8"
+
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        # 304 тоже несёт ETag (RFC 9110, 15.4.5)
+        not_modified["ETag"] = etag
+        return not_modified
+
+    key = _KEY.format(digest=digest)
+    body = await cache.aget(key)
+    if body is None and validate is not None:
+        await validate()
+    if body is not None:
+        response = HttpResponse(body, content_type=content_type)
+        response["X-Page-Cache"] = "hit"
+    else:
+        response = StreamingHttpResponse(_tee(generate(), key), content_type=content_type)
+    response["ETag"] = etag
+    return response
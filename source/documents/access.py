@@ -0,0 +1,108 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import Document, DocumentPurchase
+
+# Кэш "id оплаченных документов пользователя".
+# Ключ данных содержит версию пользователя; инвалидация = смена версии,
+# старые записи просто перестают читаться и вытесняются по таймауту.
+_VERSION_KEY = "documents:paid-ids:version:{user_id}"
+_DATA_KEY = "documents:paid-ids:{user_id}:{version}"
+
+
+def _cache_timeout() -> int:
+    return getattr(settings, "DOCUMENTS_ACCESS_CACHE_TIMEOUT", 600)
+
+
+def _user_version(user_id) -> int:
+    key = _VERSION_KEY.format(user_id=user_id)
+    version = cache.get(key)
+    if version is None:
+        # начальная версия не 1, чтобы после вытеснения ключа версии
+        # не прочитать старую запись данных с тем же номером
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_paid_documents(*user_ids):
+    """
+    Сбрасывает кэш оплаченных документов для указанных пользователей.
+    Нужно вызывать после любых изменений DocumentPurchase в обход save()
+    (queryset.update(), bulk_create и т.п.).
+    """
+    for user_id in set(user_ids):
+        key = _VERSION_KEY.format(user_id=user_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+
+
+def paid_document_ids(user) -> frozenset:
+    """
+    Множество id документов, оплаченных пользователем (status=PAID).
+    В обычном случае читается из кэша, запрос к БД только после инвалидации.
+    """
+    if not (user and getattr(user, "is_authenticated", False)):
+        return frozenset()
+
+    data_key = _DATA_KEY.format(user_id=user.pk, version=_user_version(user.pk))
+    ids = cache.get(data_key)
+    if ids is None:
+        ids = frozenset(
+            DocumentPurchase.objects.filter(
+                user_id=user.pk,
+                status=DocumentPurchase.Status.PAID,
+            ).values_list("document_id", flat=True)
+        )
+        cache.set(data_key, ids, timeout=_cache_timeout())
+    return ids
+
+
+def _is_privileged(user) -> bool:
+    return bool(getattr(user, "is_staff", False) or getattr(user, "is_superuser", False))
+
+
+def accessible_document_ids(user, docs) -> set:
+    """
+    Пакетная версия Document.can_user_access:
+    возвращает множество id документов из docs, доступных пользователю.
+    Для любого количества платных документов делает не больше одного
+    запроса к DocumentPurchase (а при тёплом кэше — ни одного).
+    """
+    accessible = set()
+    paid_ids = set()
+
+    for d in docs:
+        if not d.is_published or not d.is_open:
+            continue
+        if d.access_type == Document.AccessType.FREE:
+            accessible.add(d.pk)
+        else:
+            paid_ids.add(d.pk)
+
+    if not paid_ids or not (user and getattr(user, "is_authenticated", False)):
+        return accessible
+
+    if _is_privileged(user):
+        return accessible | paid_ids
+
+    return accessible | (paid_ids & paid_document_ids(user))
+
+
+def decorate_user_access(docs, user):
+    """
+    Проставляет документам user_can_access / user_needs_login одним запросом.
+    """
+    docs = list(docs)
+    accessible = accessible_document_ids(user, docs)
+    user_is_auth = bool(user and getattr(user, "is_authenticated", False))
+
+    for d in docs:
+        d.user_can_access = d.pk in accessible
+        d.user_needs_login = (d.is_paid and not user_is_auth)
+
+    return docs
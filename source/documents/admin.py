@@ -1,6 +1,13 @@
 from django.contrib import admin
+from django.db.models import Q, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
+from core.admin_actions import apply_bulk_action
+from core.admin_perf import ScalableChangelistMixin
+from core.pagecache import bump_models
+from search.mixins import FullTextSearchAdminMixin
+from .access import invalidate_paid_documents
 from .models import Document, DocumentCategory, DocumentPurchase
 
 
@@ -14,7 +21,7 @@ class DocumentCategoryAdmin(admin.ModelAdmin):
 
 
 @admin.register(Document)
-class DocumentAdmin(admin.ModelAdmin):
+class DocumentAdmin(ScalableChangelistMixin, FullTextSearchAdminMixin, admin.ModelAdmin):
     list_display = (
         "title",
         "category",
@@ -48,25 +55,34 @@ class DocumentAdmin(admin.ModelAdmin):
     ordering = ("-created_at",)
     actions = ["make_published", "make_unpublished", "make_open", "make_closed"]
 
+    def _set_flag(self, request, queryset, field, value, message):
+        apply_bulk_action(
+            self, request, queryset,
+            only=~Q(**{field: value}),
+            values={field: value, "updated_at": timezone.now()},
+            message=message,
+            after=lambda _: bump_models(Document),
+        )
+
     @admin.action(description="Опубликовать")
     def make_published(self, request, queryset):
-        queryset.update(is_published=True)
+        self._set_flag(request, queryset, "is_published", True, "Опубликовано документов")
 
     @admin.action(description="Снять с публикации")
     def make_unpublished(self, request, queryset):
-        queryset.update(is_published=False)
+        self._set_flag(request, queryset, "is_published", False, "Снято с публикации")
 
     @admin.action(description="Открыть доступ")
     def make_open(self, request, queryset):
-        queryset.update(is_open=True)
+        self._set_flag(request, queryset, "is_open", True, "Доступ открыт")
 
     @admin.action(description="Закрыть доступ")
     def make_closed(self, request, queryset):
-        queryset.update(is_open=False)
+        self._set_flag(request, queryset, "is_open", False, "Доступ закрыт")
 
 
 @admin.register(DocumentPurchase)
-class DocumentPurchaseAdmin(admin.ModelAdmin):
+class DocumentPurchaseAdmin(ScalableChangelistMixin, admin.ModelAdmin):
     list_display = ("user", "document", "status", "created_at", "paid_at")
     list_filter = ("status", "created_at")
     search_fields = ("user__username", "user__email", "document__title", "document__slug")
@@ -75,15 +91,41 @@ class DocumentPurchaseAdmin(admin.ModelAdmin):
 
     actions = ["mark_as_paid", "mark_as_canceled", "mark_as_pending"]
 
+    def _update_purchases(self, request, queryset, *, only, values, message):
+        # update() не шлёт сигналы — кэш доступа сбрасываем сами, одним вызовом
+        apply_bulk_action(
+            self, request, queryset,
+            only=only,
+            values=values,
+            message=message,
+            collect=lambda qs: set(qs.values_list("user_id", flat=True).distinct()),
+            after=lambda user_ids: invalidate_paid_documents(*user_ids),
+        )
+
     @admin.action(description="Пометить как оплачено")
     def mark_as_paid(self, request, queryset):
-        now = timezone.now()
-        queryset.update(status=DocumentPurchase.Status.PAID, paid_at=now)
+        # paid_at уже оплаченных покупок не перезаписываем
+        self._update_purchases(
+            request, queryset,
+            only=~Q(status=DocumentPurchase.Status.PAID) | Q(paid_at__isnull=True),
+            values={"status": DocumentPurchase.Status.PAID, "paid_at": Coalesce("paid_at", Value(timezone.now()))},
+            message="Оплачено покупок",
+        )
 
     @admin.action(description="Пометить как отменено")
     def mark_as_canceled(self, request, queryset):
-        queryset.update(status=DocumentPurchase.Status.CANCELED)
+        self._update_purchases(
+            request, queryset,
+            only=~Q(status=DocumentPurchase.Status.CANCELED),
+            values={"status": DocumentPurchase.Status.CANCELED},
+            message="Отменено покупок",
+        )
 
     @admin.action(description="Пометить как ожидание оплаты")
     def mark_as_pending(self, request, queryset):
-        queryset.update(status=DocumentPurchase.Status.PENDING)
+        self._update_purchases(
+            request, queryset,
+            only=~Q(status=DocumentPurchase.Status.PENDING),
+            values={"status": DocumentPurchase.Status.PENDING},
+            message="Переведено в ожидание",
+        )
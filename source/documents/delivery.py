@@ -0,0 +1,309 @@
+"""
+Отдача файлов документов после проверок доступа в Django.
+
+Режим выбирается настройкой DOCUMENTS_DOWNLOAD_BACKEND:
+- "stream"     — файл читает и отдаёт сам воркер (FileResponse), по умолчанию;
+- "x-accel"    — nginx: заголовок X-Accel-Redirect на internal location;
+- "x-sendfile" — Apache mod_xsendfile / lighttpd: заголовок X-Sendfile с путём.
+
+В любом режиме Django сам отвечает 304 на If-None-Match / If-Modified-Since.
+В режиме "stream" дополнительно поддерживаются Range / If-Range (206,
+в том числе multipart/byteranges). В режимах offload диапазоны обрабатывает
+фронтовой сервер.
+
+Под ASGI тело в режиме "stream" — асинхронный итератор: чтение кусков идёт
+в пуле потоков, а медленный клиент не занимает поток воркера на всю загрузку.
+Под WSGI — обычный синхронный итератор.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.crypto import get_random_string
+from django.utils.encoding import iri_to_uri
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+BACKEND_STREAM = "stream"
+BACKEND_X_ACCEL = "x-accel"
+BACKEND_X_SENDFILE = "x-sendfile"
+
+CHUNK_SIZE = 64 * 1024
+# больше диапазонов в одном запросе не обслуживаем — отдаём файл целиком
+MAX_RANGES = 16
+
+_RANGE_SPEC_RE = re.compile(r"^(\d*)-(\d*)$")
+
+
+def get_backend() -> str:
+    backend = getattr(settings, "DOCUMENTS_DOWNLOAD_BACKEND", BACKEND_STREAM)
+    if backend not in (BACKEND_STREAM, BACKEND_X_ACCEL, BACKEND_X_SENDFILE):
+        raise ImproperlyConfigured(f"Неизвестный DOCUMENTS_DOWNLOAD_BACKEND: {backend!r}")
+    return backend
+
+
+def _guess_content_type(file_path: str) -> str:
+    content_type, _ = mimetypes.guess_type(file_path)
+    return content_type or "application/octet-stream"
+
+
+def file_etag(stat, updated_at=None) -> str:
+    """
+    Сильный ETag: размер файла + mtime (нс) + updated_at записи документа.
+    """
+    parts = [f"{stat.st_size:x}", f"{stat.st_mtime_ns:x}"]
+    if updated_at is not None:
+        parts.append(f"{int(updated_at.timestamp() * 1_000_000):x}")
+    return '"' + "-".join(parts) + '"'
+
+
+def _last_modified(stat, updated_at=None) -> int:
+    ts = int(stat.st_mtime)
+    if updated_at is not None:
+        ts = max(ts, int(updated_at.timestamp()))
+    return ts
+
+
+def parse_range_header(header: str, size: int):
+    """
+    Разбирает "Range: bytes=..." в список (start, end) включительно.
+
+    Возвращает:
+    - None — заголовок некорректный или диапазонов слишком много (отдаём 200);
+    - []   — ни один диапазон не попадает в файл (416).
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or not spec:
+        return None
+
+    specs = [s.strip() for s in spec.split(",") if s.strip()]
+    if not specs or len(specs) > MAX_RANGES:
+        return None
+
+    ranges = []
+    for s in specs:
+        m = _RANGE_SPEC_RE.match(s)
+        if not m:
+            return None
+        first, last = m.groups()
+        if not first and not last:
+            return None
+
+        if not first:
+            # суффикс: последние N байт
+            length = int(last)
+            if length == 0:
+                continue
+            start, end = max(size - length, 0), size - 1
+        else:
+            start = int(first)
+            end = int(last) if last else size - 1
+            if last and end < start:
+                return None
+            end = min(end, size - 1)
+
+        if start < size:
+            ranges.append((start, end))
+
+    # склеиваем пересекающиеся/соседние диапазоны
+    ranges.sort()
+    merged = []
+    for start, end in ranges:
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _if_range_passes(request, etag: str, last_modified: int) -> bool:
+    if_range = request.META.get("HTTP_IF_RANGE", "").strip()
+    if not if_range:
+        return True
+    if if_range.startswith('"'):
+        # If-Range требует сильного сравнения
+        return if_range == etag
+    parsed = parse_http_date_safe(if_range)
+    return parsed is not None and parsed == last_modified
+
+
+def _read_range(file_path: str, start: int, end: int):
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+async def _aread_range(file_path: str, start: int, end: int):
+    # open/read — блокирующие вызовы, каждый уходит в пул потоков
+    f = await sync_to_async(open, thread_sensitive=False)(file_path, "rb")
+    read = sync_to_async(f.read, thread_sensitive=False)
+    try:
+        await sync_to_async(f.seek, thread_sensitive=False)(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        f.close()
+
+
+def _multipart_ranges(file_path: str, ranges, size: int, content_type: str, boundary: str, asynchronous=False):
+    """
+    Возвращает (итератор тела, длина тела) для multipart/byteranges.
+    """
+    heads = [
+        (
+            f"--{boundary}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n"
+        ).encode("ascii")
+        for start, end in ranges
+    ]
+    tail = f"\r\n--{boundary}--\r\n".encode("ascii")
+    length = sum(len(h) for h in heads) + sum(e - s + 1 for s, e in ranges)
+    length += 2 * (len(ranges) - 1) + len(tail)
+
+    def body():
+        for i, ((start, end), head) in enumerate(zip(ranges, heads)):
+            if i:
+                yield b"\r\n"
+            yield head
+            yield from _read_range(file_path, start, end)
+        yield tail
+
+    async def abody():
+        for i, ((start, end), head) in enumerate(zip(ranges, heads)):
+            if i:
+                yield b"\r\n"
+            yield head
+            async for chunk in _aread_range(file_path, start, end):
+                yield chunk
+        yield tail
+
+    return (abody() if asynchronous else body()), length
+
+
+def _offload_response(file_path: str, filename: str) -> HttpResponse:
+    # тело пустое: файл отдаст фронтовой сервер, Content-Type он возьмёт отсюда
+    response = HttpResponse(content_type=_guess_content_type(file_path))
+    response["Content-Disposition"] = content_disposition_header(True, filename)
+    return response
+
+
+def x_accel_response(field_file, filename: str) -> HttpResponse:
+    """
+    nginx отдаёт файл из internal location, например:
+
+        location /protected-media/ {
+            internal;
+            alias /path/to/media/;
+        }
+    """
+    prefix = getattr(settings, "DOCUMENTS_X_ACCEL_PREFIX", "/protected-media/")
+    response = _offload_response(field_file.path, filename)
+    response["X-Accel-Redirect"] = iri_to_uri(prefix.rstrip("/") + "/" + quote(field_file.name))
+    return response
+
+
+def x_sendfile_response(field_file, filename: str) -> HttpResponse:
+    response = _offload_response(field_file.path, filename)
+    response["X-Sendfile"] = iri_to_uri(field_file.path)
+    return response
+
+
+def stream_response(request, field_file, filename: str, size: int, etag: str, last_modified: int):
+    file_path = field_file.path
+    content_type = _guess_content_type(file_path)
+    asynchronous = isinstance(request, ASGIRequest)
+    read_range = _aread_range if asynchronous else _read_range
+
+    range_header = request.META.get("HTTP_RANGE", "")
+    ranges = None
+    if range_header and request.method in ("GET", "HEAD") and _if_range_passes(request, etag, last_modified):
+        ranges = parse_range_header(range_header, size)
+
+    if ranges is None and asynchronous:
+        # FileResponse под ASGI читал бы файл синхронно — отдаём весь файл как диапазон
+        response = StreamingHttpResponse(read_range(file_path, 0, size - 1), content_type=content_type)
+        response["Content-Length"] = str(size)
+        response["Content-Disposition"] = content_disposition_header(True, filename)
+    elif ranges is None:
+        response = FileResponse(
+            open(file_path, "rb"),
+            content_type=content_type,
+            as_attachment=True,
+            filename=filename,
+        )
+    elif not ranges:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+    elif len(ranges) == 1:
+        start, end = ranges[0]
+        response = StreamingHttpResponse(read_range(file_path, start, end), status=206, content_type=content_type)
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+        response["Content-Length"] = str(end - start + 1)
+    else:
+        boundary = get_random_string(24)
+        body, length = _multipart_ranges(file_path, ranges, size, content_type, boundary, asynchronous)
+        response = StreamingHttpResponse(
+            body,
+            status=206,
+            content_type=f"multipart/byteranges; boundary={boundary}",
+        )
+        response["Content-Length"] = str(length)
+
+    if response.status_code == 206:
+        response["Content-Disposition"] = content_disposition_header(True, filename)
+    return response
+
+
+def serve_file(request, field_file, updated_at=None):
+    """
+    Отдаёт файл выбранным бэкендом. Вызывать только после всех проверок доступа.
+    updated_at (Document.updated_at) входит в ETag и Last-Modified.
+    """
+    filename = os.path.basename(field_file.name)
+    backend = get_backend()
+
+    stat = os.stat(field_file.path)
+    etag = file_etag(stat, updated_at)
+    last_modified = _last_modified(stat, updated_at)
+
+    # служебный ответ с валидаторами: из него get_conditional_response соберёт 304
+    validators = HttpResponse()
+    validators["ETag"] = etag
+    validators["Last-Modified"] = http_date(last_modified)
+    # документы бывают платными — общие кэши их хранить не должны
+    patch_cache_control(validators, private=True, no_cache=True)
+
+    conditional = get_conditional_response(request, etag=etag, last_modified=last_modified, response=validators)
+    if conditional is not validators:
+        return conditional
+
+    if backend == BACKEND_X_ACCEL:
+        response = x_accel_response(field_file, filename)
+    elif backend == BACKEND_X_SENDFILE:
+        response = x_sendfile_response(field_file, filename)
+    else:
+        response = stream_response(request, field_file, filename, stat.st_size, etag, last_modified)
+        response["Accept-Ranges"] = "bytes"
+
+    for header in ("ETag", "Last-Modified", "Cache-Control"):
+        response[header] = validators[header]
+    return response
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.6 on 2026-10-18 11:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0002_document_documents_d_slug_3df491_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='preview_image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Высота (превью)'),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='preview_image_placeholder',
+            field=models.TextField(blank=True, editable=False, verbose_name='Заглушка (превью)'),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='preview_image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Ширина (превью)'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0003_image_placeholders'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['category', 'created_at', 'id'], name='documents_d_categor_8e56f7_idx'),
+        ),
+    ]
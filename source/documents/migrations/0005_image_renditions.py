@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0004_document_documents_d_categor_8e56f7_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='preview_image_renditions',
+            field=models.JSONField(blank=True, default=list, editable=False, verbose_name='Ширины вариантов (превью)'),
+        ),
+    ]
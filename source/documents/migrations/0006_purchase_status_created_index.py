@@ -0,0 +1,23 @@
+# Generated by Django 5.1.6 on 2026-10-18 13:12
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0005_image_renditions'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='documentpurchase',
+            name='documents_d_status_c02c7d_idx',
+        ),
+        migrations.AddIndex(
+            model_name='documentpurchase',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='documents_d_status_f892b1_idx'),
+        ),
+    ]
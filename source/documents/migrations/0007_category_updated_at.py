@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-18 13:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0006_purchase_status_created_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documentcategory',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Обновлено'),
+        ),
+    ]
@@ -9,6 +9,8 @@ class DocumentCategory(models.Model):
     slug = models.SlugField("Slug", unique=True)
     order = models.PositiveIntegerField("Порядок", default=0)
     is_active = models.BooleanField("Активна", default=True)
+    # название категории видно на странице документа — входит в её ETag/Last-Modified
+    updated_at = models.DateTimeField("Обновлено", auto_now=True)
 
     class Meta:
         ordering = ["order", "title"]
@@ -49,6 +51,11 @@ class Document(models.Model):
         blank=True,
         null=True,
     )
+    # заполняются при загрузке, см. core.renditions.image_meta
+    preview_image_width = models.PositiveIntegerField("Ширина (превью)", null=True, blank=True, editable=False)
+    preview_image_height = models.PositiveIntegerField("Высота (превью)", null=True, blank=True, editable=False)
+    preview_image_placeholder = models.TextField("Заглушка (превью)", blank=True, editable=False)
+    preview_image_renditions = models.JSONField("Ширины вариантов (превью)", default=list, blank=True, editable=False)
 
     is_published = models.BooleanField("Опубликован", default=True)
     is_open = models.BooleanField("Открыт (доступ разрешён)", default=True)
@@ -74,6 +81,8 @@ class Document(models.Model):
             models.Index(fields=["is_published", "is_open"]),
             models.Index(fields=["access_type"]),
             models.Index(fields=["created_at"]),
+            # документы категории по курсору (-created_at, -id): список категории, страница портфолио
+            models.Index(fields=["category", "created_at", "id"]),
         ]
     
     @property
@@ -114,11 +123,8 @@ class Document(models.Model):
             if getattr(user, "is_staff", False) or getattr(user, "is_superuser", False):
                 return True
 
-            return DocumentPurchase.objects.filter(
-                user=user,
-                document=self,
-                status=DocumentPurchase.Status.PAID,
-            ).exists()
+            from .access import paid_document_ids
+            return self.pk in paid_document_ids(user)
 
         return False
 
@@ -152,7 +158,8 @@ class DocumentPurchase(models.Model):
         verbose_name = "Покупка документа"
         verbose_name_plural = "Покупки документов"
         indexes = [
-            models.Index(fields=["status"]),
+            # фильтр по статусу в админке + сортировка по дате без временного B-дерева
+            models.Index(fields=["status", "created_at", "id"]),
             models.Index(fields=["created_at"]),
             models.Index(fields=["paid_at"]),
         ]
@@ -0,0 +1,16 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .access import invalidate_paid_documents
+from .models import DocumentPurchase
+
+
+@receiver(post_save, sender=DocumentPurchase)
+@receiver(post_delete, sender=DocumentPurchase)
+def purchase_changed(sender, instance, **kwargs):
+    # mark_paid(), смена статуса в document_pay_stub, правка/удаление в админке.
+    # Сбрасываем после коммита: иначе параллельный запрос перечитает ещё
+    # старые покупки и положит их в кэш под новой версией.
+    user_id = instance.user_id
+    transaction.on_commit(lambda: invalidate_paid_documents(user_id))
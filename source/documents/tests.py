@@ -1,3 +1,311 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import timedelta
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.admin.models import LogEntry
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import AsyncClient, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from .access import paid_document_ids
+from .delivery import parse_range_header
+from .models import Document, DocumentCategory, DocumentPurchase
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def tearDownModule():
+    shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, MEDIA_ROOT=MEDIA_ROOT)
+class DocumentDetailConditionalTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.doc = Document.objects.create(
+            title="Отчёт", slug="report",
+            file=SimpleUploadedFile("report.pdf", b"%PDF-1.4"),
+            access_type=Document.AccessType.PAID, price=100,
+            category=DocumentCategory.objects.create(title="Энергоаудит", slug="audit"),
+        )
+        self.url = reverse("documents:detail", args=[self.doc.slug])
+
+    def _etag(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response["ETag"]
+
+    def test_not_modified_until_csrf_cookie_changes(self):
+        self._etag()
+        etag = self._etag()
+        self.assertEqual(self.client.get(self.url, headers={"if-none-match": etag}).status_code, 304)
+        self.client.cookies[settings.CSRF_COOKIE_NAME] = "x" * 32
+        self.assertEqual(self.client.get(self.url, headers={"if-none-match": etag}).status_code, 200)
+
+    def test_users_do_not_share_etag(self):
+        # одинаковая CSRF-cookie, разные пользователи
+        self.client.cookies[settings.CSRF_COOKIE_NAME] = "x" * 32
+        self.client.force_login(User.objects.create_user("first", email="first@example.com", password="pass"))
+        etag = self._etag()
+        self.client.force_login(User.objects.create_user("second", email="second@example.com", password="pass"))
+        self.client.cookies[settings.CSRF_COOKIE_NAME] = "x" * 32
+        self.assertNotEqual(self._etag(), etag)
+
+    def test_category_rename_changes_etag(self):
+        self._etag()
+        etag = self._etag()
+        category = self.doc.category
+        category.title = "Обследование"
+        category.save()
+        response = self.client.get(self.url, headers={"if-none-match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Обследование")
+
+    def test_category_rename_moves_last_modified(self):
+        last_modified = self.client.get(self.url)["Last-Modified"]
+        self.assertEqual(self.client.get(self.url, headers={"if-modified-since": last_modified}).status_code, 304)
+        # переименование позже, чем правили документ
+        DocumentCategory.objects.filter(pk=self.doc.category_id).update(
+            title="Обследование", updated_at=timezone.now() + timedelta(minutes=1),
+        )
+        self.assertEqual(self.client.get(self.url, headers={"if-modified-since": last_modified}).status_code, 200)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, MEDIA_ROOT=MEDIA_ROOT, ADMIN_FILTERED_COUNT_LIMIT=3)
+class PurchaseChangelistTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        staff = User.objects.create_superuser("staff", email="staff@example.com", password="pass")
+        self.client.force_login(staff)
+        for i in range(5):
+            doc = Document.objects.create(
+                title=f"Документ {i}", slug=f"doc-{i}",
+                file=SimpleUploadedFile(f"doc-{i}.pdf", b"%PDF-1.4"),
+                access_type=Document.AccessType.PAID, price=100,
+            )
+            DocumentPurchase.objects.create(user=staff, document=doc, status=DocumentPurchase.Status.PAID)
+        self.url = reverse("admin:documents_documentpurchase_changelist")
+
+    def test_capped_count_is_marked(self):
+        response = self.client.get(self.url, {"status__exact": "paid"})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "3+ ")
+        self.assertContains(response, "Найдено: 3+")
+
+    def test_exact_count_without_filters(self):
+        response = self.client.get(self.url)
+        self.assertContains(response, "5 ")
+        self.assertNotContains(response, "5+")
+        self.assertNotContains(response, "date-hierarchy")
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, MEDIA_ROOT=MEDIA_ROOT)
+class PurchaseAccessTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("buyer", email="buyer@example.com", password="pass")
+        self.doc = Document.objects.create(
+            title="Отчёт", slug="report",
+            file=SimpleUploadedFile("report.pdf", b"%PDF-1.4 report"),
+            access_type=Document.AccessType.PAID, price=100,
+        )
+        self.url = reverse("documents:download", args=[self.doc.slug])
+        self.client.force_login(self.user)
+
+    def test_payment_opens_download(self):
+        self.assertRedirects(
+            self.client.get(self.url), reverse("documents:pay", args=[self.doc.slug]),
+            fetch_redirect_response=False,
+        )
+        purchase = DocumentPurchase.objects.create(user=self.user, document=self.doc)
+        with self.captureOnCommitCallbacks(execute=True):
+            purchase.mark_paid()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"%PDF-1.4 report")
+
+    def test_cache_is_reset_after_commit(self):
+        self.assertEqual(paid_document_ids(self.user), frozenset())
+        with self.captureOnCommitCallbacks() as callbacks:
+            DocumentPurchase.objects.create(
+                user=self.user, document=self.doc, status=DocumentPurchase.Status.PAID,
+            )
+            # до коммита кэш не сброшен: перечитать можно было бы только старые покупки
+            self.assertEqual(paid_document_ids(self.user), frozenset())
+        for callback in callbacks:
+            callback()
+        self.assertEqual(paid_document_ids(self.user), {self.doc.pk})
+
+    def test_deleted_purchase_closes_access(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            purchase = DocumentPurchase.objects.create(
+                user=self.user, document=self.doc, status=DocumentPurchase.Status.PAID,
+            )
+        self.assertEqual(paid_document_ids(self.user), {self.doc.pk})
+        with self.captureOnCommitCallbacks(execute=True):
+            purchase.delete()
+        self.assertEqual(paid_document_ids(self.user), frozenset())
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, MEDIA_ROOT=MEDIA_ROOT, ADMIN_BULK_LOG_OBJECTS=3)
+class PurchaseBulkActionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.staff = User.objects.create_superuser("staff", email="staff@example.com", password="pass")
+        self.buyer = User.objects.create_user("buyer", email="buyer@example.com", password="pass")
+        self.client.force_login(self.staff)
+        self.url = reverse("admin:documents_documentpurchase_changelist")
+        self.docs = [
+            Document.objects.create(
+                title=f"Документ {i}", slug=f"doc-{i}",
+                file=SimpleUploadedFile(f"doc-{i}.pdf", b"%PDF-1.4"),
+                access_type=Document.AccessType.PAID, price=100,
+            )
+            for i in range(8)
+        ]
+
+    def _purchases(self, count):
+        return [DocumentPurchase.objects.create(user=self.buyer, document=doc) for doc in self.docs[:count]]
+
+    def _mark_paid(self, purchases):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(self.url, {
+                "action": "mark_as_paid",
+                "_selected_action": [p.pk for p in purchases],
+            })
+
+    def test_few_rows_are_logged_one_by_one(self):
+        purchases = self._purchases(2)
+        self.assertEqual(paid_document_ids(self.buyer), frozenset())
+        self.assertEqual(self._mark_paid(purchases).status_code, 302)
+        self.assertEqual(paid_document_ids(self.buyer), {p.document_id for p in purchases})
+        self.assertEqual(
+            set(LogEntry.objects.values_list("object_id", flat=True)),
+            {str(p.pk) for p in purchases},
+        )
+
+    def test_cache_is_reset_only_after_commit(self):
+        purchases = self._purchases(2)
+        self.assertEqual(paid_document_ids(self.buyer), frozenset())
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.client.post(self.url, {"action": "mark_as_paid", "_selected_action": [p.pk for p in purchases]})
+        # внешняя транзакция ещё не закоммичена — кэш доступа прежний
+        self.assertEqual(paid_document_ids(self.buyer), frozenset())
+        for callback in callbacks:
+            callback()
+        self.assertEqual(paid_document_ids(self.buyer), {p.document_id for p in purchases})
+
+    def test_many_rows_get_one_summary_entry(self):
+        self._mark_paid(self._purchases(5))
+        self.assertEqual(DocumentPurchase.objects.filter(status=DocumentPurchase.Status.PAID).count(), 5)
+        entry = LogEntry.objects.get()
+        self.assertIsNone(entry.object_id)
+        self.assertTrue(entry.object_repr.endswith(": 5"))
+
+    def test_unchanged_rows_are_skipped(self):
+        purchases = self._purchases(2)
+        self._mark_paid(purchases)
+        LogEntry.objects.all().delete()
+        self._mark_paid(purchases)
+        self.assertFalse(LogEntry.objects.exists())
+
+    def test_queries_do_not_grow_with_selection(self):
+        counts = []
+        for size in (4, 8):
+            DocumentPurchase.objects.all().delete()
+            purchases = self._purchases(size)
+            with CaptureQueriesContext(connection) as ctx:
+                self._mark_paid(purchases)
+            counts.append(len(ctx.captured_queries))
+        self.assertEqual(counts[0], counts[1])
+
+
+class ParseRangeHeaderTests(SimpleTestCase):
+    def test_ranges(self):
+        self.assertEqual(parse_range_header("bytes=0-9", 100), [(0, 9)])
+        self.assertEqual(parse_range_header("bytes=-5", 100), [(95, 99)])
+        self.assertEqual(parse_range_header("bytes=90-", 100), [(90, 99)])
+        self.assertEqual(parse_range_header("bytes=95-500", 100), [(95, 99)])
+        # пересекающиеся и соседние склеиваются
+        self.assertEqual(parse_range_header("bytes=0-4,3-9,10-12", 100), [(0, 12)])
+
+    def test_unsatisfiable_and_invalid(self):
+        self.assertEqual(parse_range_header("bytes=100-200", 100), [])
+        self.assertIsNone(parse_range_header("items=0-9", 100))
+        self.assertIsNone(parse_range_header("bytes=9-0", 100))
+        self.assertIsNone(parse_range_header("bytes=-", 100))
+        self.assertIsNone(parse_range_header("bytes=" + ",".join(f"{i}-{i}" for i in range(0, 40, 2)), 100))
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, MEDIA_ROOT=MEDIA_ROOT, DOCUMENTS_DOWNLOAD_BACKEND="stream")
+class DownloadRangeTests(TestCase):
+    content = bytes(range(100))
+
+    def setUp(self):
+        cache.clear()
+        self.doc = Document.objects.create(
+            title="Методичка", slug="manual",
+            file=SimpleUploadedFile("manual.pdf", self.content),
+            access_type=Document.AccessType.FREE,
+        )
+        self.url = reverse("documents:download", args=[self.doc.slug])
+
+    def _get(self, **headers):
+        response = self.client.get(self.url, headers=headers)
+        return response, b"".join(response.streaming_content)
+
+    def test_full_file(self):
+        response, body = self._get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(body, self.content)
+
+    def test_single_range(self):
+        response, body = self._get(range="bytes=10-19")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], "bytes 10-19/100")
+        self.assertEqual(response["Content-Length"], "10")
+        self.assertEqual(body, self.content[10:20])
+
+    def test_suffix_range(self):
+        response, body = self._get(range="bytes=-5")
+        self.assertEqual(response["Content-Range"], "bytes 95-99/100")
+        self.assertEqual(body, self.content[-5:])
+
+    def test_multiple_ranges(self):
+        response, body = self._get(range="bytes=0-1,50-52")
+        self.assertEqual(response.status_code, 206)
+        self.assertTrue(response["Content-Type"].startswith("multipart/byteranges; boundary="))
+        self.assertEqual(int(response["Content-Length"]), len(body))
+        self.assertIn(b"Content-Range: bytes 0-1/100\r\n\r\n" + self.content[0:2], body)
+        self.assertIn(b"Content-Range: bytes 50-52/100\r\n\r\n" + self.content[50:53], body)
+
+    def test_unsatisfiable_range(self):
+        response = self.client.get(self.url, headers={"range": "bytes=100-"})
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */100")
+
+    def test_invalid_range_returns_whole_file(self):
+        response, body = self._get(range="items=0-9")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, self.content)
+
+    def test_if_range(self):
+        etag = self._get()[0]["ETag"]
+        response, body = self._get(range="bytes=0-9", if_range=etag)
+        self.assertEqual(response.status_code, 206)
+        # файл поменялся — отдаём целиком
+        response, body = self._get(range="bytes=0-9", if_range='"stale"')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(body, self.content)
+
+    async def test_range_under_asgi(self):
+        response = await AsyncClient().get(self.url, headers={"range": "bytes=90-"})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b"".join([chunk async for chunk in response.streaming_content]), self.content[90:])
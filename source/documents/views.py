@@ -1,25 +1,31 @@
-import mimetypes
+import asyncio
 import os
 
-from django.http import FileResponse, Http404
-from django.shortcuts import get_object_or_404, render, redirect
+from asgiref.sync import sync_to_async
+from django.http import Http404
+from django.shortcuts import aget_object_or_404, get_object_or_404, render, redirect
 from django.urls import reverse
 from django.contrib.auth.decorators import login_required
 
+from core.async_orm import arequest_user
+from core.conditional import anonymous_last_modified, condition, make_etag, request_memo, viewer_key, viewer_state
+from core.pagination import apaginate_keyset
+from .access import decorate_user_access, paid_document_ids
+from .delivery import serve_file
 from .models import Document, DocumentCategory, DocumentPurchase
 
+DOCUMENTS_ORDERING = ("-created_at", "-id")
+DOCUMENTS_PER_PAGE = 24
+
 
 def _decorate_docs_for_user(docs, user, request_path: str = ""):
     """
     Добавляем "виртуальные" поля на объект документа, чтобы шаблон мог
     корректно рисовать: скачать / оплатить / войти / закрыто.
     """
-    user_is_auth = bool(user and getattr(user, "is_authenticated", False))
+    docs = decorate_user_access(docs, user)
 
     for d in docs:
-        d.user_can_access = d.can_user_access(user)
-        d.user_needs_login = (d.is_paid and not user_is_auth)
-
         # куда вести "Войти", чтобы вернуться назад
         if request_path:
             d.login_url_with_next = f"{reverse('login')}?next={request_path}"
@@ -38,52 +44,91 @@ def _decorate_docs_for_user(docs, user, request_path: str = ""):
     return docs
 
 
-def document_list(request):
+def _active_categories():
+    # ленивый queryset: выполняется в шаблоне только при промахе {% cache %} фильтра
+    return DocumentCategory.objects.filter(is_active=True).order_by("order", "title")
+
+
+async def _render_document_list(request, docs, category_lookup=None):
+    coros = [
+        apaginate_keyset(request, docs, DOCUMENTS_ORDERING, per_page=DOCUMENTS_PER_PAGE),
+        arequest_user(request),
+    ]
+    if category_lookup is not None:
+        coros.append(category_lookup)
+    page, user, *category = await asyncio.gather(*coros)
+
+    # доступ к платным — через кэш оплаченных документов (может сходить в БД)
+    docs = await sync_to_async(_decorate_docs_for_user)(page.items, user, request.path)
+    return await sync_to_async(render)(request, "documents/document_list.html", {
+        "docs": docs,
+        "page": page,
+        "categories": _active_categories(),
+        "current_category": category[0] if category else None,
+    })
+
+
+async def document_list(request):
     docs = (
         Document.objects
         .filter(is_published=True)
         .select_related("category")
-        .order_by("-created_at")
     )
-    docs = _decorate_docs_for_user(docs, request.user, request.path)
+    return await _render_document_list(request, docs)
 
-    categories = DocumentCategory.objects.filter(is_active=True).order_by("order", "title")
-    return render(request, "documents/document_list.html", {
-        "docs": docs,
-        "categories": categories,
-        "current_category": None,
-    })
-
-
-def document_list_by_category(request, category_slug: str):
-    category = get_object_or_404(DocumentCategory, slug=category_slug, is_active=True)
 
+async def document_list_by_category(request, category_slug: str):
     docs = (
-        category.documents
-        .filter(is_published=True)
+        Document.objects
+        .filter(is_published=True, category__slug=category_slug, category__is_active=True)
         .select_related("category")
-        .order_by("-created_at")
     )
-    docs = _decorate_docs_for_user(docs, request.user, request.path)
+    category = aget_object_or_404(DocumentCategory, slug=category_slug, is_active=True)
+    return await _render_document_list(request, docs, category)
 
-    categories = DocumentCategory.objects.filter(is_active=True).order_by("order", "title")
-    return render(request, "documents/document_list.html", {
-        "docs": docs,
-        "categories": categories,
-        "current_category": category,
-    })
 
+def _document_validators(request, slug):
+    return request_memo(request, ("document", slug), lambda: (
+        Document.objects
+        .filter(slug=slug, is_published=True)
+        .values("pk", "updated_at", "category_id", "category__title", "category__updated_at")
+        .first()
+    ))
+
+
+def _document_detail_etag(request, slug: str):
+    row = _document_validators(request, slug)
+    if row is None:
+        return None
+    state = viewer_state(request)
+    # оплачен ли документ — из кэша доступа, без запроса к покупкам
+    purchased = state == "user" and row["pk"] in paid_document_ids(request.user)
+    return make_etag(
+        "document", slug, row["updated_at"].isoformat(),
+        row["category_id"], row["category__title"], row["category__updated_at"],
+        purchased, *viewer_key(request),
+    )
 
-def document_detail(request, slug: str):
-    doc = get_object_or_404(Document, slug=slug, is_published=True)
 
-    can_access = doc.can_user_access(request.user)
+def _document_detail_last_modified(request, slug: str):
+    row = _document_validators(request, slug)
+    return anonymous_last_modified(request, row["updated_at"], row["category__updated_at"]) if row else None
+
+
+@condition(etag_func=_document_detail_etag, last_modified_func=_document_detail_last_modified)
+async def document_detail(request, slug: str):
+    doc, user = await asyncio.gather(
+        aget_object_or_404(Document.objects.select_related("category"), slug=slug, is_published=True),
+        arequest_user(request),
+    )
+
+    can_access = await sync_to_async(doc.can_user_access)(user)
 
     doc.user_can_access = can_access
-    doc.user_needs_login = (doc.is_paid and not request.user.is_authenticated)
+    doc.user_needs_login = (doc.is_paid and not user.is_authenticated)
     login_url_with_next = f"{reverse('login')}?next={request.path}"
 
-    return render(request, "documents/document_detail.html", {
+    return await sync_to_async(render)(request, "documents/document_detail.html", {
         "doc": doc,
         "can_access": can_access,
         "login_url_with_next": login_url_with_next,
@@ -111,7 +156,8 @@ def document_pay_stub(request, slug: str):
     )
 
     # оставляем pending, пока не прикрутили платежку
-    if purchase.status != DocumentPurchase.Status.PAID:
+    # (save() шлёт post_save — кэш доступа пользователя сбрасывается в signals)
+    if purchase.status not in (DocumentPurchase.Status.PAID, DocumentPurchase.Status.PENDING):
         purchase.status = DocumentPurchase.Status.PENDING
         purchase.save(update_fields=["status"])
 
@@ -122,19 +168,22 @@ def document_pay_stub(request, slug: str):
     })
 
 
-def document_download(request, slug: str):
-    doc = get_object_or_404(Document, slug=slug, is_published=True)
+async def document_download(request, slug: str):
+    doc, user = await asyncio.gather(
+        aget_object_or_404(Document, slug=slug, is_published=True),
+        arequest_user(request),
+    )
 
     # закрыт = не отдаём никому
     if not doc.is_open:
         raise Http404("Документ закрыт.")
 
     # если платный и не залогинен -> на login с next
-    if doc.is_paid and not request.user.is_authenticated:
+    if doc.is_paid and not user.is_authenticated:
         return redirect(f"{reverse('login')}?next={request.path}")
 
     # если нет доступа (не купил) -> на оплату
-    if not doc.can_user_access(request.user):
+    if not await sync_to_async(doc.can_user_access)(user):
         if doc.is_paid:
             return redirect("documents:pay", slug=doc.slug)
         raise Http404("Доступ запрещён.")
@@ -146,11 +195,5 @@ def document_download(request, slug: str):
     if not os.path.exists(file_path):
         raise Http404("Файл не найден на сервере.")
 
-    content_type, _ = mimetypes.guess_type(file_path)
-    response = FileResponse(
-        open(file_path, "rb"),
-        content_type=content_type or "application/octet-stream",
-        as_attachment=True,
-        filename=os.path.basename(file_path),
-    )
-    return response
+    # под ASGI файл читается асинхронным итератором и не держит поток воркера
+    return serve_file(request, doc.file, updated_at=doc.updated_at)
@@ -1,5 +1,12 @@
 from django.contrib import admin
+from django.db.models import Q, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
+
+from core.admin_actions import apply_bulk_action
+from core.admin_perf import ScalableChangelistMixin
+from core.pagecache import bump_models
+from search.mixins import FullTextSearchAdminMixin
 from .models import NewsPost, NewsCategory
 
 
@@ -15,7 +22,7 @@ class NewsCategoryAdmin(admin.ModelAdmin):
 
 
 @admin.register(NewsPost)
-class NewsPostAdmin(admin.ModelAdmin):
+class NewsPostAdmin(ScalableChangelistMixin, FullTextSearchAdminMixin, admin.ModelAdmin):
     list_display = ("title", "category", "is_published", "published_at", "created_at")
     list_editable = ("is_published",)
     list_filter = ("is_published", "category", "created_at", "published_at")
@@ -34,19 +41,41 @@ class NewsPostAdmin(admin.ModelAdmin):
 
     actions = ["make_published", "make_unpublished", "set_published_now"]
 
+    def _bump(self, _):
+        bump_models(NewsPost)
+
     @admin.action(description="Опубликовать (если даты нет, поставить сейчас)")
     def make_published(self, request, queryset):
-        for post in queryset:
-            post.publish()
-        self.message_user(request, "Выбранные публикации опубликованы.")
+        now = timezone.now()
+        apply_bulk_action(
+            self, request, queryset,
+            only=Q(is_published=False) | Q(published_at__isnull=True),
+            values={
+                "is_published": True,
+                "published_at": Coalesce("published_at", Value(now)),
+                "updated_at": now,
+            },
+            message="Опубликовано публикаций",
+            after=self._bump,
+        )
 
     @admin.action(description="Снять с публикации")
     def make_unpublished(self, request, queryset):
-        queryset.update(is_published=False)
-        self.message_user(request, "Выбранные публикации сняты с публикации.")
+        apply_bulk_action(
+            self, request, queryset,
+            only=Q(is_published=True),
+            values={"is_published": False, "updated_at": timezone.now()},
+            message="Снято с публикации",
+            after=self._bump,
+        )
 
-    @admin.action(description="Поставить дату публикации = сейчас")
+    @admin.action(description="Поставить дату публикации = сейчас (только где даты нет)")
     def set_published_now(self, request, queryset):
         now = timezone.now()
-        queryset.update(published_at=now)
-        self.message_user(request, "Дата публикации обновлена на текущее время.")
+        apply_bulk_action(
+            self, request, queryset,
+            only=Q(published_at__isnull=True),
+            values={"published_at": now, "updated_at": now},
+            message="Дата публикации проставлена",
+            after=self._bump,
+        )
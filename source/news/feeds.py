@@ -0,0 +1,91 @@
+"""
+RSS 2.0 и Atom для последних новостей. Отдаются потоком через core.xmlstream.
+"""
+from django.db.models import Max
+from django.urls import reverse
+
+from core.xmlstream import rfc822_datetime, w3c_datetime, xml_text
+from .models import NewsPost
+
+FEED_TITLE = "Новости | TOO АЭС"
+FEED_SIZE = 30
+FEED_ORDERING = ("-published_at", "-created_at", "-id")
+
+_SLUG = "__slug__"
+
+
+def _posts():
+    return NewsPost.objects.filter(is_published=True)
+
+
+def _entries():
+    return (
+        _posts()
+        .select_related("category")
+        .only("title", "slug", "preview_text", "published_at", "created_at", "updated_at", "category__title")
+        .order_by(*FEED_ORDERING)[:FEED_SIZE]
+    )
+
+
+async def _feed_updated():
+    row = await _posts().aaggregate(updated=Max("updated_at"))
+    return row["updated"]
+
+
+async def rss(request):
+    list_url = request.build_absolute_uri(reverse("news:list"))
+    detail_url = request.build_absolute_uri(reverse("news:detail", args=[_SLUG]))
+    updated = await _feed_updated()
+
+    head = (
+        '<?xml version="1.0" encoding="UTF-8"?>\n<rss version="2.0"><channel>'
+        f"<title>{xml_text(FEED_TITLE)}</title><link>{xml_text(list_url)}</link>"
+        f"<description>{xml_text(FEED_TITLE)}</description><language>ru</language>"
+    )
+    if updated:
+        head += f"<lastBuildDate>{rfc822_datetime(updated)}</lastBuildDate>"
+    yield head.encode()
+
+    async for post in _entries().aiterator():
+        link = detail_url.replace(_SLUG, post.slug)
+        item = f"<item><title>{xml_text(post.title)}</title><link>{xml_text(link)}</link>"
+        item += f'<guid isPermaLink="true">{xml_text(link)}</guid>'
+        item += f"<pubDate>{rfc822_datetime(post.published_at or post.created_at)}</pubDate>"
+        if post.category:
+            item += f"<category>{xml_text(post.category.title)}</category>"
+        if post.preview_text:
+            item += f"<description>{xml_text(post.preview_text)}</description>"
+        yield f"{item}</item>\n".encode()
+
+    yield b"</channel></rss>\n"
+
+
+async def atom(request):
+    self_url = request.build_absolute_uri(reverse("news:atom"))
+    list_url = request.build_absolute_uri(reverse("news:list"))
+    detail_url = request.build_absolute_uri(reverse("news:detail", args=[_SLUG]))
+    updated = await _feed_updated()
+
+    # <updated> обязателен и в пустой ленте
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n<feed xmlns="http://www.w3.org/2005/Atom" xml:lang="ru">'
+        f"<title>{xml_text(FEED_TITLE)}</title><id>{xml_text(list_url)}</id>"
+        f'<link rel="alternate" href="{xml_text(list_url)}"/>'
+        f'<link rel="self" href="{xml_text(self_url)}"/>'
+        f"<updated>{w3c_datetime(updated) if updated else '1970-01-01T00:00:00Z'}</updated>\n"
+    ).encode()
+
+    async for post in _entries().aiterator():
+        link = detail_url.replace(_SLUG, post.slug)
+        entry = f"<entry><title>{xml_text(post.title)}</title><id>{xml_text(link)}</id>"
+        entry += f'<link rel="alternate" href="{xml_text(link)}"/>'
+        entry += f"<published>{w3c_datetime(post.published_at or post.created_at)}</published>"
+        entry += f"<updated>{w3c_datetime(post.updated_at)}</updated>"
+        entry += f"<author><name>{xml_text('TOO АЭС')}</name></author>"
+        if post.category:
+            entry += f'<category term="{xml_text(post.category.title)}"/>'
+        if post.preview_text:
+            entry += f"<summary>{xml_text(post.preview_text)}</summary>"
+        yield f"{entry}</entry>\n".encode()
+
+    yield b"</feed>\n"
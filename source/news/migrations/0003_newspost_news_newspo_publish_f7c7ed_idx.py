@@ -0,0 +1,17 @@
+# Generated by Django 5.1.6 on 2026-10-18 10:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0002_newscategory_news_newsca_order_8ae00b_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='newspost',
+            index=models.Index(fields=['published_at', 'created_at', 'id'], name='news_newspo_publish_f7c7ed_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1.6 on 2026-10-18 11:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0003_newspost_news_newspo_publish_f7c7ed_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newspost',
+            name='cover_image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Высота (обложка)'),
+        ),
+        migrations.AddField(
+            model_name='newspost',
+            name='cover_image_placeholder',
+            field=models.TextField(blank=True, editable=False, verbose_name='Заглушка (обложка)'),
+        ),
+        migrations.AddField(
+            model_name='newspost',
+            name='cover_image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Ширина (обложка)'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-18 12:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0004_image_placeholders'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newspost',
+            name='cover_image_renditions',
+            field=models.JSONField(blank=True, default=list, editable=False, verbose_name='Ширины вариантов (обложка)'),
+        ),
+    ]
@@ -44,6 +44,11 @@ class NewsPost(models.Model):
         blank=True,
         null=True,
     )
+    # заполняются при загрузке, см. core.renditions.image_meta
+    cover_image_width = models.PositiveIntegerField("Ширина (обложка)", null=True, blank=True, editable=False)
+    cover_image_height = models.PositiveIntegerField("Высота (обложка)", null=True, blank=True, editable=False)
+    cover_image_placeholder = models.TextField("Заглушка (обложка)", blank=True, editable=False)
+    cover_image_renditions = models.JSONField("Ширины вариантов (обложка)", default=list, blank=True, editable=False)
 
     is_published = models.BooleanField("Опубликовано", default=False)
     published_at = models.DateTimeField("Дата публикации", blank=True, null=True)
@@ -60,6 +65,8 @@ class NewsPost(models.Model):
             models.Index(fields=["is_published"]),
             models.Index(fields=["published_at"]),
             models.Index(fields=["created_at"]),
+            # курсорная пагинация ленты: (-published_at, -created_at, -id)
+            models.Index(fields=["published_at", "created_at", "id"]),
         ]
 
     def __str__(self) -> str:
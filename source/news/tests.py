@@ -1,3 +1,103 @@
-from django.test import TestCase
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-# Create your tests here.
+from accounts.models import User
+from .models import NewsCategory, NewsPost
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class NewsDetailConditionalTests(TestCase):
+    """
+    ETag страницы новости: 304 только пока страница в браузере актуальна.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.category = NewsCategory.objects.create(title="Энергетика", slug="energy")
+        self.post = NewsPost.objects.create(
+            title="Новость", slug="post", body="текст", category=self.category, is_published=True,
+        )
+        self.url = reverse("news:detail", args=[self.post.slug])
+
+    def _etag(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response["ETag"]
+
+    def _revalidate(self, etag):
+        return self.client.get(self.url, headers={"if-none-match": etag})
+
+    def test_not_modified_carries_etag(self):
+        self._etag()  # первый ответ ставит CSRF-cookie
+        etag = self._etag()
+        response = self._revalidate(etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_new_csrf_cookie_changes_etag(self):
+        self._etag()
+        etag = self._etag()
+        self.client.cookies[settings.CSRF_COOKIE_NAME] = "x" * 32
+        self.assertEqual(self._revalidate(etag).status_code, 200)
+
+    def test_login_changes_etag(self):
+        self._etag()
+        etag = self._etag()
+        user = User.objects.create_user("reader", email="reader@example.com", password="pass")
+        self.client.force_login(user)
+        self.assertEqual(self._revalidate(etag).status_code, 200)
+
+    def test_users_do_not_share_etag(self):
+        first = User.objects.create_user("first", email="first@example.com", password="pass")
+        second = User.objects.create_user("second", email="second@example.com", password="pass")
+        self.client.force_login(first)
+        self._etag()
+        etag = self._etag()
+        self.client.force_login(second)
+        self.assertEqual(self._revalidate(etag).status_code, 200)
+
+    def test_category_title_changes_etag(self):
+        self._etag()
+        etag = self._etag()
+        self.category.title = "Экология"
+        self.category.save()
+        self.assertEqual(self._revalidate(etag).status_code, 200)
+
+    def test_unpublished_is_404(self):
+        NewsPost.objects.filter(pk=self.post.pk).update(is_published=False)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class NewsListTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = NewsCategory.objects.create(title="Энергетика", slug="energy")
+        for i in range(3):
+            NewsPost.objects.create(
+                title=f"Новость {i}", slug=f"post-{i}", body="текст", category=self.category, is_published=True,
+            )
+        # вошедшему страница целиком не кэшируется — остаётся кэш фрагментов
+        user = User.objects.create_user("reader", email="reader@example.com", password="pass")
+        self.client.force_login(user)
+
+    def _category_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [q["sql"] for q in ctx.captured_queries if 'FROM "news_newscategory"' in q["sql"]]
+
+    def test_categories_are_read_only_on_fragment_cache_miss(self):
+        url = reverse("news:list")
+        self.assertTrue(self._category_queries(url))
+        self.assertFalse(self._category_queries(url))
+
+    def test_category_page_reads_only_its_category(self):
+        url = reverse("news:category", args=[self.category.slug])
+        self._category_queries(url)
+        # остаётся только поиск самой категории по slug
+        self.assertEqual(len(self._category_queries(url)), 1)
@@ -6,5 +6,7 @@ app_name = "news"
 urlpatterns = [
     path("", views.news_list, name="list"),
     path("category/<slug:category_slug>/", views.news_by_category, name="category"),
+    path("rss.xml", views.news_rss, name="rss"),
+    path("atom.xml", views.news_atom, name="atom"),
     path("<slug:slug>/", views.news_detail, name="detail"),
 ]
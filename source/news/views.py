@@ -1,45 +1,104 @@
-from django.shortcuts import get_object_or_404, render
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.shortcuts import aget_object_or_404, render
+
+from core.conditional import anonymous_last_modified, condition, make_etag, request_memo, viewer_key
+from core.pagecache import anonymous_page_cache
+from core.pagination import apaginate_keyset
+from core.xmlstream import cached_xml_response
+from . import feeds
 from .models import NewsPost, NewsCategory
 
+NEWS_ORDERING = ("-published_at", "-created_at", "-id")
+NEWS_PER_PAGE = 12
+
 
-def news_list(request):
+def _active_categories():
+    # ленивый queryset: фильтр в шаблоне закэширован ({% cache %}), и запрос
+    # выполняется только при промахе этого кэша
+    return NewsCategory.objects.filter(is_active=True).order_by("order", "title")
+
+
+@anonymous_page_cache("news.NewsPost", "news.NewsCategory")
+async def news_list(request):
     posts = (
         NewsPost.objects
         .filter(is_published=True)
         .select_related("category")
-        .order_by("-published_at", "-created_at")
     )
-    categories = NewsCategory.objects.filter(is_active=True).order_by("order", "title")
+    page = await apaginate_keyset(request, posts, NEWS_ORDERING, per_page=NEWS_PER_PAGE)
 
-    return render(request, "news/news_list.html", {
-        "posts": posts,
-        "categories": categories,
+    return await sync_to_async(render)(request, "news/news_list.html", {
+        "posts": page.items,
+        "page": page,
+        "categories": _active_categories(),
     })
 
 
-def news_by_category(request, category_slug: str):
-    category = get_object_or_404(NewsCategory, slug=category_slug, is_active=True)
-
+@anonymous_page_cache("news.NewsPost", "news.NewsCategory")
+async def news_by_category(request, category_slug: str):
     posts = (
-        category.posts
-        .filter(is_published=True)
+        NewsPost.objects
+        .filter(is_published=True, category__slug=category_slug, category__is_active=True)
         .select_related("category")
-        .order_by("-published_at", "-created_at")
+    )
+    # категория и её страница новостей друг от друга не зависят
+    category, page = await asyncio.gather(
+        aget_object_or_404(NewsCategory, slug=category_slug, is_active=True),
+        apaginate_keyset(request, posts, NEWS_ORDERING, per_page=NEWS_PER_PAGE),
     )
 
-    categories = NewsCategory.objects.filter(is_active=True).order_by("order", "title")
-
-    return render(request, "news/news_list.html", {
-        "posts": posts,
-        "categories": categories,
+    return await sync_to_async(render)(request, "news/news_list.html", {
+        "posts": page.items,
+        "page": page,
+        "categories": _active_categories(),
         "current_category": category,
     })
 
 
-def news_detail(request, slug: str):
-    post = get_object_or_404(
+def _post_validators(request, slug):
+    return request_memo(request, ("news", slug), lambda: (
+        NewsPost.objects
+        .filter(slug=slug, is_published=True)
+        .values_list("updated_at", "category_id", "category__title")
+        .first()
+    ))
+
+
+def _news_detail_etag(request, slug: str):
+    row = _post_validators(request, slug)
+    if row is None:
+        return None
+    updated_at, category_id, category_title = row
+    return make_etag("news", slug, updated_at.isoformat(), category_id, category_title, *viewer_key(request))
+
+
+def _news_detail_last_modified(request, slug: str):
+    row = _post_validators(request, slug)
+    return anonymous_last_modified(request, row[0]) if row else None
+
+
+@condition(etag_func=_news_detail_etag, last_modified_func=_news_detail_last_modified)
+@anonymous_page_cache("news.NewsPost", "news.NewsCategory")
+async def news_detail(request, slug: str):
+    post = await aget_object_or_404(
         NewsPost.objects.select_related("category"),
         slug=slug,
         is_published=True,
     )
-    return render(request, "news/news_detail.html", {"post": post})
+    return await sync_to_async(render)(request, "news/news_detail.html", {"post": post})
+
+
+async def news_rss(request):
+    return await cached_xml_response(
+        request, "news-rss", ("news.NewsPost", "news.NewsCategory"),
+        lambda: feeds.rss(request), content_type="application/rss+xml",
+    )
+
+
+async def news_atom(request):
+    return await cached_xml_response(
+        request, "news-atom", ("news.NewsPost", "news.NewsCategory"),
+        lambda: feeds.atom(request), content_type="application/atom+xml",
+    )
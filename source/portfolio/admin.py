@@ -1,6 +1,8 @@
 from django.contrib import admin
 from django.utils.html import format_html
 
+from core.admin_perf import ScalableChangelistMixin
+from search.mixins import FullTextSearchAdminMixin
 from .models import (
     PortfolioPage,
     Case,
@@ -39,7 +41,8 @@ class CaseDocumentInline(admin.TabularInline):
 
 @admin.register(PortfolioPage)
 class PortfolioPageAdmin(admin.ModelAdmin):
-    list_display = ("title", "slug", "order", "is_published")
+    list_display = ("title", "slug", "document_category", "order", "is_published")
+    list_select_related = ("document_category",)
     list_editable = ("order", "is_published")
     list_filter = ("is_published",)
     search_fields = ("title", "slug", "description")
@@ -49,7 +52,7 @@ class PortfolioPageAdmin(admin.ModelAdmin):
 
 
 @admin.register(Case)
-class CaseAdmin(admin.ModelAdmin):
+class CaseAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
     list_display = ("title", "slug", "is_published", "created_at", "cover_thumb")
     list_editable = ("is_published",)
     list_filter = ("is_published", "created_at")
@@ -99,7 +102,7 @@ class CaseAdmin(admin.ModelAdmin):
 
 
 @admin.register(CaseDocument)
-class CaseDocumentAdmin(admin.ModelAdmin):
+class CaseDocumentAdmin(ScalableChangelistMixin, admin.ModelAdmin):
     list_display = ("case", "document", "order", "is_active")
     list_filter = ("is_active",)
     search_fields = ("case__title", "case__slug", "document__title", "document__slug")
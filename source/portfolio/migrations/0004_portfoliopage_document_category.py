@@ -0,0 +1,31 @@
+# Generated by Django 5.1.6 on 2026-10-18 11:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def link_by_slug(apps, schema_editor):
+    PortfolioPage = apps.get_model("portfolio", "PortfolioPage")
+    DocumentCategory = apps.get_model("documents", "DocumentCategory")
+    categories = dict(DocumentCategory.objects.values_list("slug", "pk"))
+    pages = list(PortfolioPage.objects.filter(slug__in=categories))
+    for page in pages:
+        page.document_category_id = categories[page.slug]
+    PortfolioPage.objects.bulk_update(pages, ["document_category"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0002_document_documents_d_slug_3df491_idx_and_more'),
+        ('portfolio', '0003_casedocument_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='portfoliopage',
+            name='document_category',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='portfolio_pages', to='documents.documentcategory', verbose_name='Категория документов'),
+        ),
+        migrations.RunPython(link_by_slug, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.1.6 on 2026-10-18 11:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0004_portfoliopage_document_category'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='case',
+            name='cover_image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Высота (обложка)'),
+        ),
+        migrations.AddField(
+            model_name='case',
+            name='cover_image_placeholder',
+            field=models.TextField(blank=True, editable=False, verbose_name='Заглушка (обложка)'),
+        ),
+        migrations.AddField(
+            model_name='case',
+            name='cover_image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Ширина (обложка)'),
+        ),
+        migrations.AddField(
+            model_name='caseimage',
+            name='image_height',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Высота (фото)'),
+        ),
+        migrations.AddField(
+            model_name='caseimage',
+            name='image_placeholder',
+            field=models.TextField(blank=True, editable=False, verbose_name='Заглушка (фото)'),
+        ),
+        migrations.AddField(
+            model_name='caseimage',
+            name='image_width',
+            field=models.PositiveIntegerField(blank=True, editable=False, null=True, verbose_name='Ширина (фото)'),
+        ),
+    ]
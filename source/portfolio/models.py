@@ -12,6 +12,17 @@ class PortfolioPage(models.Model):
     slug = models.SlugField("Slug", unique=True)
     description = models.TextField("Описание", blank=True)
 
+    # документы страницы — из этой категории; если не выбрана — из категории
+    # с тем же slug (старое соглашение, см. portfolio.views._page_documents)
+    document_category = models.ForeignKey(
+        "documents.DocumentCategory",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="portfolio_pages",
+        verbose_name="Категория документов",
+    )
+
     order = models.PositiveIntegerField("Порядок", default=0)
     is_published = models.BooleanField("Опубликована", default=True)
 
@@ -46,6 +57,11 @@ class Case(models.Model):
         blank=True,
         null=True,
     )
+    # заполняются при загрузке, см. core.renditions.image_meta
+    cover_image_width = models.PositiveIntegerField("Ширина (обложка)", null=True, blank=True, editable=False)
+    cover_image_height = models.PositiveIntegerField("Высота (обложка)", null=True, blank=True, editable=False)
+    cover_image_placeholder = models.TextField("Заглушка (обложка)", blank=True, editable=False)
+    cover_image_renditions = models.JSONField("Ширины вариантов (обложка)", default=list, blank=True, editable=False)
 
     short_text = models.TextField("Короткое описание", blank=True)
     body = models.TextField("Текст кейса", blank=True)
@@ -121,6 +137,11 @@ class CaseImage(models.Model):
     )
 
     image = models.ImageField("Фото", upload_to="portfolio/cases/images/")
+    # заполняются при загрузке, см. core.renditions.image_meta
+    image_width = models.PositiveIntegerField("Ширина (фото)", null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField("Высота (фото)", null=True, blank=True, editable=False)
+    image_placeholder = models.TextField("Заглушка (фото)", blank=True, editable=False)
+    image_renditions = models.JSONField("Ширины вариантов (фото)", default=list, blank=True, editable=False)
     caption = models.CharField("Подпись", max_length=200, blank=True)
 
     order = models.PositiveIntegerField("Порядок", default=0)
@@ -1,3 +1,168 @@
-from django.test import TestCase
+import io
+import tempfile
 
-# Create your tests here.
+from PIL import Image
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import User
+from documents.models import Document, DocumentCategory, DocumentPurchase
+from .models import Case, CaseDocument, CaseImage, PortfolioPage
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def _jpeg(name: str) -> SimpleUploadedFile:
+    # настоящая картинка: сигналы читают её размер и строят заглушку
+    buf = io.BytesIO()
+    Image.new("RGB", (8, 6), "orange").save(buf, "JPEG")
+    return SimpleUploadedFile(name, buf.getvalue(), content_type="image/jpeg")
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, MEDIA_ROOT=MEDIA_ROOT)
+class PortfolioQueryCountTests(TestCase):
+    """
+    Число запросов страниц портфолио не зависит от числа кейсов и документов.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.category = DocumentCategory.objects.create(title="Энергоаудит", slug="audit")
+        # категория не выбрана — документы берутся из категории с тем же slug
+        self.page = PortfolioPage.objects.create(title="Энергоаудит", slug="audit")
+        self.user = User.objects.create_user("buyer", email="buyer@example.com", password="pass")
+
+    def _fill(self, count: int):
+        start = Case.objects.count()
+        for i in range(start, start + count):
+            case = Case.objects.create(title=f"Кейс {i}", slug=f"case-{i}")
+            case.pages.add(self.page)
+            doc = Document.objects.create(
+                title=f"Документ {i}",
+                slug=f"doc-{i}",
+                category=self.category,
+                file=SimpleUploadedFile(f"doc-{i}.pdf", b"%PDF-1.4"),
+                access_type=Document.AccessType.PAID if i % 2 else Document.AccessType.FREE,
+                price=100 if i % 2 else None,
+            )
+            CaseDocument.objects.create(case=case, document=doc)
+            CaseImage.objects.create(case=case, image=_jpeg(f"img-{i}.jpg"))
+            DocumentPurchase.objects.create(
+                user=self.user, document=doc, status=DocumentPurchase.Status.PAID,
+            )
+
+    def _get(self, url, queries):
+        cache.clear()  # мимо кэша страниц и кэша оплаченных документов
+        with self.assertNumQueries(queries):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_category_created_after_page_is_found_by_slug(self):
+        page = PortfolioPage.objects.create(title="Обследование", slug="survey")
+        category = DocumentCategory.objects.create(title="Обследование", slug="survey")
+        Document.objects.create(
+            title="Отчёт", slug="report", category=category,
+            file=SimpleUploadedFile("report.pdf", b"%PDF-1.4"),
+        )
+        response = self._get(reverse("portfolio:page", args=[page.slug]), 3)
+        self.assertEqual([d.slug for d in response.context["documents"]], ["report"])
+
+    def test_explicit_category_wins_over_slug(self):
+        other = DocumentCategory.objects.create(title="Другое", slug="other")
+        Document.objects.create(
+            title="Чужой", slug="foreign", category=other,
+            file=SimpleUploadedFile("foreign.pdf", b"%PDF-1.4"),
+        )
+        self._fill(2)
+        self.page.document_category = other
+        self.page.save()
+        response = self._get(reverse("portfolio:page", args=[self.page.slug]), 3)
+        self.assertEqual([d.slug for d in response.context["documents"]], ["foreign"])
+
+    def test_page_documents_are_paginated(self):
+        self._fill(30)
+        url = reverse("portfolio:page", args=[self.page.slug])
+        first = self._get(url, 3)
+        self.assertEqual(len(first.context["documents"]), 24)
+        self.assertEqual(len(first.context["cases"]), 30)
+        second = self._get(first.context["documents_page"].next_url, 3)
+        self.assertEqual(len(second.context["documents"]), 6)
+        seen = {d.pk for d in first.context["documents"]} | {d.pk for d in second.context["documents"]}
+        self.assertEqual(len(seen), 30)
+
+    def test_page_detail_anonymous(self):
+        url = reverse("portfolio:page", args=[self.page.slug])
+        # страница, кейсы, документы
+        for count in (2, 20):
+            self._fill(count)
+            response = self._get(url, 3)
+        self.assertEqual(len(response.context["cases"]), 22)
+        self.assertEqual(len(response.context["documents"]), 22)
+
+    def test_page_detail_user(self):
+        self.client.force_login(self.user)
+        url = reverse("portfolio:page", args=[self.page.slug])
+        # + сессия, пользователь и id оплаченных документов
+        for count in (2, 20):
+            self._fill(count)
+            response = self._get(url, 6)
+        self.assertTrue(all(d.user_can_access for d in response.context["documents"]))
+
+    def test_case_detail(self):
+        self._fill(1)
+        case = Case.objects.get()
+        for i in range(10):
+            doc = Document.objects.create(
+                title=f"Ещё {i}", slug=f"extra-{i}", category=self.category,
+                file=SimpleUploadedFile(f"extra-{i}.pdf", b"%PDF-1.4"),
+            )
+            CaseDocument.objects.create(case=case, document=doc, order=i + 1)
+            CaseImage.objects.create(case=case, image=_jpeg(f"extra-{i}.jpg"))
+        # валидаторы ETag, кейс и три prefetch
+        response = self._get(reverse("portfolio:case_detail", args=[case.slug]), 5)
+        self.assertEqual(len(response.context["case_docs"]), 11)
+        self.assertEqual(len(response.context["images"]), 11)
+
+
+@override_settings(SECURE_SSL_REDIRECT=False, MEDIA_ROOT=MEDIA_ROOT)
+class CaseDetailConditionalTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.case = Case.objects.create(title="Кейс", slug="case")
+        self.old_doc = Document.objects.create(
+            title="Старый", slug="old", file=SimpleUploadedFile("old.pdf", b"%PDF-1.4"),
+        )
+        self.doc = Document.objects.create(
+            title="Отчёт", slug="report", file=SimpleUploadedFile("report.pdf", b"%PDF-1.4"),
+        )
+        self.link = CaseDocument.objects.create(case=self.case, document=self.doc)
+        self.url = reverse("portfolio:case_detail", args=[self.case.slug])
+
+    def _revalidate(self):
+        self.client.get(self.url)  # первый ответ ставит CSRF-cookie
+        etag = self.client.get(self.url)["ETag"]
+        self.assertEqual(self.client.get(self.url, headers={"if-none-match": etag}).status_code, 304)
+        return etag
+
+    def _assert_changed(self, etag):
+        self.assertEqual(self.client.get(self.url, headers={"if-none-match": etag}).status_code, 200)
+
+    def test_link_edit_changes_etag(self):
+        etag = self._revalidate()
+        self.link.title_override = "Отчёт по котельной"
+        self.link.save()
+        self._assert_changed(etag)
+
+        etag = self._revalidate()
+        self.link.is_active = False
+        self.link.save()
+        self._assert_changed(etag)
+
+    def test_link_to_older_document_changes_etag(self):
+        etag = self._revalidate()
+        # updated_at документа старше текущего максимума — по датам не видно
+        CaseDocument.objects.create(case=self.case, document=self.old_doc, order=1)
+        self._assert_changed(etag)
@@ -1,74 +1,173 @@
-from django.shortcuts import get_object_or_404, render
+import asyncio
 
-from .models import PortfolioPage, Case
+from asgiref.sync import sync_to_async
+from django.db.models import Prefetch, Subquery
+from django.db.models.functions import Coalesce
+from django.shortcuts import aget_object_or_404, render
+
+from core.async_orm import alist, arequest_user
+from core.conditional import anonymous_last_modified, condition, make_etag, request_memo, viewer_key, viewer_state
+from core.pagecache import anonymous_page_cache
+from core.pagination import apaginate_keyset
+from documents.access import decorate_user_access, paid_document_ids
 from documents.models import Document, DocumentCategory
+from .models import PortfolioPage, Case, CaseAttachment, CaseDocument, CaseImage
 
+PAGE_DOCUMENTS_ORDERING = ("-created_at", "-id")
+PAGE_DOCUMENTS_PER_PAGE = 24
 
-def portfolio_index(request):
-    pages = PortfolioPage.objects.filter(is_published=True).order_by("order", "title")
-    return render(request, "portfolio/portfolio_index.html", {"pages": pages})
 
+@anonymous_page_cache("portfolio.PortfolioPage")
+async def portfolio_index(request):
+    pages = await alist(PortfolioPage.objects.filter(is_published=True).order_by("order", "title"))
+    return await sync_to_async(render)(request, "portfolio/portfolio_index.html", {"pages": pages})
 
-def portfolio_page_detail(request, page_slug: str):
-    page = get_object_or_404(PortfolioPage, slug=page_slug, is_published=True)
 
-    cases = (
-        page.cases.filter(is_published=True)
-        .select_related()  # безопасно, даже если не нужно
-        .order_by("-created_at")
+@anonymous_page_cache(
+    "portfolio.PortfolioPage",
+    "portfolio.Case",
+    "documents.Document",
+    "documents.DocumentCategory",
+)
+async def portfolio_page_detail(request, page_slug: str):
+    # Число запросов не зависит от числа кейсов и документов: страница, кейсы,
+    # страница документов её категории (+ сессия/пользователь и оплаченные id для вошедших).
+    # Все выборки идут по slug из URL, поэтому выполняются параллельно.
+    # Документов в категории могут быть тысячи — показываем их страницами по курсору.
+    page, cases, documents_page, user = await asyncio.gather(
+        aget_object_or_404(PortfolioPage, slug=page_slug, is_published=True),
+        alist(_page_cases(page_slug)),
+        apaginate_keyset(
+            request, _page_documents(page_slug), PAGE_DOCUMENTS_ORDERING, per_page=PAGE_DOCUMENTS_PER_PAGE,
+        ),
+        arequest_user(request),
     )
 
-    # Документы для страницы направления (логика: категория документов совпадает со slug страницы)
-    documents = Document.objects.none()
-    category = DocumentCategory.objects.filter(slug=page.slug, is_active=True).first()
-    if category:
-        documents = (
-            Document.objects.filter(category=category, is_published=True)
-            .order_by("-created_at")
-        )
-
-    user = request.user
-    for d in documents:
-        d.user_can_access = d.can_user_access(user)
-        d.user_needs_login = (d.is_paid and not user.is_authenticated)
+    documents = await sync_to_async(decorate_user_access)(documents_page.items, user)
 
-    return render(
+    return await sync_to_async(render)(
         request,
         "portfolio/portfolio.html",
         {
             "page": page,
             "cases": cases,
             "documents": documents,
+            "documents_page": documents_page,
         },
     )
 
 
-def case_detail(request, slug: str):
-    case = get_object_or_404(Case, slug=slug, is_published=True)
+def _page_cases(page_slug: str):
+    # в карточке кейса только его собственные поля (обложка, тексты) — связи не нужны
+    return Case.objects.filter(pages__slug=page_slug, is_published=True).order_by("-created_at")
+
+
+def _page_documents(page_slug: str):
+    # категория — из связи страница -> категория (PortfolioPage.document_category),
+    # а если она не выбрана, по старому соглашению — категория с тем же slug.
+    # Оба варианта — подзапросы в том же SQL, так что категорию, заведённую
+    # позже страницы, видно сразу.
+    category_id = Coalesce(
+        Subquery(PortfolioPage.objects.filter(slug=page_slug).values("document_category_id")[:1]),
+        Subquery(DocumentCategory.objects.filter(slug=page_slug).values("pk")[:1]),
+    )
+    return Document.objects.filter(
+        category_id=category_id,
+        category__is_active=True,
+        is_published=True,
+    )
+
+
+def _case_detail_plan():
+    return Case.objects.filter(is_published=True).prefetch_related(
+        Prefetch(
+            "images",
+            queryset=CaseImage.objects.filter(is_active=True).order_by("order", "id"),
+            to_attr="active_images",
+        ),
+        Prefetch(
+            "attachments",
+            queryset=CaseAttachment.objects.filter(is_active=True).order_by("order", "id"),
+            to_attr="active_attachments",
+        ),
+        Prefetch(
+            "case_documents",
+            queryset=(
+                CaseDocument.objects.filter(is_active=True)
+                .select_related("document", "document__category")
+                .order_by("order", "id")
+            ),
+            to_attr="active_documents",
+        ),
+    )
+
+
+def _case_validators(request, slug):
+    def compute():
+        # кейс и его привязки документов одним LEFT JOIN: строка на привязку
+        rows = list(
+            Case.objects
+            .filter(slug=slug, is_published=True)
+            .order_by("case_documents__id")
+            .values_list(
+                "updated_at",
+                "case_documents__id",
+                "case_documents__order",
+                "case_documents__title_override",
+                "case_documents__is_active",
+                "case_documents__document_id",
+                "case_documents__document__updated_at",
+            )
+        )
+        if not rows:
+            return None
+        # сами привязки (порядок, название, видимость) своих дат не имеют —
+        # в ETag идёт отпечаток их строк
+        links = [row[1:] for row in rows if row[1] is not None]
+        return {
+            "updated_at": rows[0][0],
+            "documents_updated_at": max((link[-1] for link in links if link[3]), default=None),
+            "links": make_etag(*links),
+        }
+
+    return request_memo(request, ("case", slug), compute)
 
-    images = case.images.filter(is_active=True).order_by("order", "id")
-    attachments = case.attachments.filter(is_active=True).order_by("order", "id")
 
-    # Документы привязанные к кейсу через промежуточную модель CaseDocument (у тебя должно быть related_name="case_documents")
-    case_docs = (
-        case.case_documents.filter(is_active=True)
-        .select_related("document", "document__category")
-        .order_by("order", "id")
+def _case_detail_etag(request, slug: str):
+    row = _case_validators(request, slug)
+    if row is None:
+        return None
+    state = viewer_state(request)
+    purchased = sorted(paid_document_ids(request.user)) if state == "user" else None
+    return make_etag(
+        "case", slug, row["updated_at"], row["documents_updated_at"], row["links"], purchased, *viewer_key(request),
     )
 
-    user = request.user
-    for cd in case_docs:
-        d = cd.document
-        d.user_can_access = d.can_user_access(user)
-        d.user_needs_login = (d.is_paid and not user.is_authenticated)
 
-    return render(
+def _case_detail_last_modified(request, slug: str):
+    row = _case_validators(request, slug)
+    if row is None:
+        return None
+    return anonymous_last_modified(request, row["updated_at"], row["documents_updated_at"])
+
+
+@condition(etag_func=_case_detail_etag, last_modified_func=_case_detail_last_modified)
+async def case_detail(request, slug: str):
+    # кейс + три prefetch (галерея, файлы, документы с категориями) — 4 запроса при любом их числе
+    case, user = await asyncio.gather(
+        aget_object_or_404(_case_detail_plan(), slug=slug),
+        arequest_user(request),
+    )
+    case_docs = case.active_documents
+    await sync_to_async(decorate_user_access)([cd.document for cd in case_docs], user)
+
+    return await sync_to_async(render)(
         request,
         "portfolio/portfolio.html",
         {
             "case": case,
-            "images": images,
-            "attachments": attachments,
+            "images": case.active_images,
+            "attachments": case.active_attachments,
             "case_docs": case_docs,
         },
     )
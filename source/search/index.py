@@ -0,0 +1,244 @@
+"""
+Полнотекстовый индекс по новостям, документам и кейсам (SQLite FTS5).
+
+Одна виртуальная таблица search_index:
+    kind      — "news" / "documents" / "cases" (не индексируется)
+    object_id — pk записи (не индексируется)
+    title     — заголовок
+    body      — описание / текст
+    extra     — slug (для поиска в админке)
+
+Индекс обновляется сигналами post_save / post_delete (см. search.signals),
+полная перестройка — команда rebuild_search_index. На других СУБД
+FTS недоступен, и поиск откатывается на icontains.
+"""
+import re
+from typing import NamedTuple
+
+from django.apps import apps
+from django.db import connection
+from django.db.models import Q
+from django.urls import reverse
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+TABLE = "search_index"
+
+# маркеры подсветки: в тексте не встречаются, после escape() меняем на <mark>
+_HL_START, _HL_END = "\x02", "\x03"
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class Source(NamedTuple):
+    model_label: str
+    label: str
+    body_fields: tuple
+    url_name: str
+
+
+SOURCES = {
+    "news": Source("news.NewsPost", "Новости", ("preview_text", "body"), "news:detail"),
+    "documents": Source("documents.Document", "Документы", ("description",), "documents:detail"),
+    "cases": Source("portfolio.Case", "Кейсы", ("short_text", "body"), "portfolio:case_detail"),
+}
+
+_INSERT_SQL = f"INSERT INTO {TABLE} (kind, object_id, title, body, extra) VALUES (%s, %s, %s, %s, %s)"
+
+
+def fts_available() -> bool:
+    return connection.vendor == "sqlite"
+
+
+def kind_for_model(model):
+    for kind, source in SOURCES.items():
+        if apps.get_model(source.model_label) is model:
+            return kind
+    return None
+
+
+def _row(kind, values):
+    # values: pk, title, slug, *body_fields
+    pk, title, slug, *body = values
+    return [kind, pk, title or "", " ".join(str(v or "") for v in body), slug or ""]
+
+
+def _row_fields(source):
+    return ("pk", "title", "slug") + source.body_fields
+
+
+def build_match(query: str) -> str:
+    """
+    Пользовательский ввод -> безопасное выражение MATCH:
+    все слова обязательны, последнее — как префикс (поиск по мере набора).
+    """
+    tokens = _TOKEN_RE.findall(query or "")[:12]
+    if not tokens:
+        return ""
+    terms = [f'"{t}"' for t in tokens]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def index_object(kind: str, obj):
+    if not fts_available():
+        return
+    source = SOURCES[kind]
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE} WHERE kind = %s AND object_id = %s", [kind, obj.pk])
+        values = [obj.pk if f == "pk" else getattr(obj, f) for f in _row_fields(source)]
+        cursor.execute(_INSERT_SQL, _row(kind, values))
+
+
+def remove_object(kind: str, pk):
+    if not fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE} WHERE kind = %s AND object_id = %s", [kind, pk])
+
+
+def rebuild(batch_size: int = 1000) -> int:
+    if not fts_available():
+        return 0
+    total = 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE}")
+        for kind, source in SOURCES.items():
+            model = apps.get_model(source.model_label)
+            rows = []
+            qs = model._default_manager.values_list(*_row_fields(source))
+            for values in qs.iterator(chunk_size=batch_size):
+                rows.append(_row(kind, values))
+                if len(rows) >= batch_size:
+                    cursor.executemany(_INSERT_SQL, rows)
+                    total += len(rows)
+                    rows = []
+            if rows:
+                cursor.executemany(_INSERT_SQL, rows)
+                total += len(rows)
+    return total
+
+
+def matching_ids_sql(kind: str, query: str):
+    """
+    (sql, params) подзапроса с object_id подходящих записей — для pk__in=RawSQL(...).
+    """
+    return (
+        f"SELECT object_id FROM {TABLE} WHERE {TABLE} MATCH %s AND kind = %s",
+        [build_match(query), kind],
+    )
+
+
+def _highlight(text: str) -> str:
+    return mark_safe(
+        escape(text).replace(_HL_START, "<mark>").replace(_HL_END, "</mark>")
+    )
+
+
+def _fts_hits(match: str, kinds, limit: int, offset: int = 0):
+    # ORDER BY rank сортирует внутри FTS5, и highlight()/snippet() считаются
+    # только для строк после LIMIT; с ORDER BY bm25(...) — для всех совпадений
+    placeholders = ", ".join(["%s"] * len(kinds))
+    sql = f"""
+        SELECT kind, object_id,
+               highlight({TABLE}, 2, %s, %s),
+               snippet({TABLE}, 3, %s, %s, '…', 24),
+               rank
+        FROM {TABLE}
+        WHERE {TABLE} MATCH %s AND kind IN ({placeholders})
+          AND rank MATCH 'bm25(0.0, 0.0, 10.0, 1.0, 2.0)'
+        ORDER BY rank
+        LIMIT %s OFFSET %s
+    """
+    params = [_HL_START, _HL_END, _HL_START, _HL_END, match, *kinds, limit, offset]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.fetchall()
+
+
+def _fts_batches(match: str, kinds, limit: int):
+    """
+    Попадания пачками по релевантности: первая — с запасом на неопубликованные,
+    каждая следующая вдвое больше. Кончается, когда индекс исчерпан.
+    """
+    offset, size = 0, limit * 2
+    while True:
+        hits = _fts_hits(match, kinds, size, offset)
+        yield hits
+        if len(hits) < size:
+            return
+        offset += size
+        size *= 2
+
+
+def _fallback_hits(query: str, kinds, limit: int):
+    tokens = _TOKEN_RE.findall(query or "")[:12]
+    hits = []
+    for kind in kinds:
+        source = SOURCES[kind]
+        model = apps.get_model(source.model_label)
+        q = Q()
+        for token in tokens:
+            token_q = Q()
+            for field in ("title", "slug") + source.body_fields:
+                token_q |= Q(**{f"{field}__icontains": token})
+            q &= token_q
+        published = model._default_manager.filter(q, is_published=True)
+        for pk in published.values_list("pk", flat=True)[:limit]:
+            hits.append((kind, pk, None, None, 0))
+    return hits[:limit]
+
+
+def _published_objects(hits) -> dict:
+    """
+    {(kind, pk): объект} для опубликованных записей из попаданий.
+    Публикация проверяется по БД, а не по индексу: массовые действия
+    в админке меняют is_published через update() без сигналов.
+    """
+    ids_by_kind = {}
+    for kind, pk, *_ in hits:
+        ids_by_kind.setdefault(kind, []).append(pk)
+    objects = {}
+    for kind, ids in ids_by_kind.items():
+        model = apps.get_model(SOURCES[kind].model_label)
+        for obj in model._default_manager.filter(pk__in=ids, is_published=True):
+            objects[(kind, obj.pk)] = obj
+    return objects
+
+
+def search(query: str, kinds=None, limit: int = 50):
+    """
+    Публичный поиск: только опубликованные записи, по релевантности.
+    Если среди лучших попаданий много неопубликованных, индекс читается
+    дальше, пока не наберётся limit опубликованных или попадания не кончатся.
+    Возвращает список dict(kind, label, obj, url, title_html, snippet_html).
+    """
+    kinds = [k for k in (kinds or SOURCES) if k in SOURCES]
+    match = build_match(query)
+    if not match or not kinds:
+        return []
+
+    if fts_available():
+        batches = _fts_batches(match, kinds, limit)
+    else:
+        batches = [_fallback_hits(query, kinds, limit)]
+
+    results = []
+    for hits in batches:
+        objects = _published_objects(hits)
+        for kind, pk, title_hl, snippet, _ in hits:
+            obj = objects.get((kind, pk))
+            if obj is None:
+                continue
+            source = SOURCES[kind]
+            results.append({
+                "kind": kind,
+                "label": source.label,
+                "obj": obj,
+                "url": reverse(source.url_name, args=[obj.slug]),
+                "title_html": _highlight(title_hl) if title_hl else escape(obj.title),
+                "snippet_html": _highlight(snippet) if snippet else "",
+            })
+            if len(results) >= limit:
+                return results
+    return results
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from search.index import fts_available, rebuild
+
+
+class Command(BaseCommand):
+    help = "Полностью перестраивает полнотекстовый индекс (новости, документы, кейсы)."
+
+    def handle(self, *args, **options):
+        if not fts_available():
+            self.stdout.write("FTS5 доступен только на SQLite — пропускаю.")
+            return
+        with transaction.atomic():
+            total = rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Проиндексировано записей: {total}"))
@@ -0,0 +1,46 @@
+from django.db import migrations
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5("
+        "kind UNINDEXED, object_id UNINDEXED, title, body, extra, "
+        "tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    # первичное наполнение из уже существующих записей
+    schema_editor.execute(
+        "INSERT INTO search_index (kind, object_id, title, body, extra) "
+        "SELECT 'news', id, title, coalesce(preview_text, '') || ' ' || coalesce(body, ''), slug "
+        "FROM news_newspost"
+    )
+    schema_editor.execute(
+        "INSERT INTO search_index (kind, object_id, title, body, extra) "
+        "SELECT 'documents', id, title, coalesce(description, ''), slug "
+        "FROM documents_document"
+    )
+    schema_editor.execute(
+        "INSERT INTO search_index (kind, object_id, title, body, extra) "
+        "SELECT 'cases', id, title, coalesce(short_text, '') || ' ' || coalesce(body, ''), slug "
+        "FROM portfolio_case"
+    )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS search_index")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0003_newspost_news_newspo_publish_f7c7ed_idx'),
+        ('documents', '0002_document_documents_d_slug_3df491_idx_and_more'),
+        ('portfolio', '0003_casedocument_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,18 @@
+from django.db.models.expressions import RawSQL
+
+from .index import build_match, fts_available, kind_for_model, matching_ids_sql
+
+
+class FullTextSearchAdminMixin:
+    """
+    Поиск в списке админки через FTS-индекс вместо icontains по search_fields.
+    search_fields оставляем — иначе Django не покажет строку поиска.
+    """
+
+    def get_search_results(self, request, queryset, search_term):
+        kind = kind_for_model(self.model)
+        if not (kind and fts_available() and build_match(search_term)):
+            return super().get_search_results(request, queryset, search_term)
+
+        sql, params = matching_ids_sql(kind, search_term)
+        return queryset.filter(pk__in=RawSQL(sql, params)), False
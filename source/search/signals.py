@@ -0,0 +1,23 @@
+from django.apps import apps
+from django.db.models.signals import post_delete, post_save
+
+from .index import SOURCES, index_object, remove_object
+
+
+def _make_handlers(kind):
+    def on_save(sender, instance, raw=False, **kwargs):
+        if not raw:
+            index_object(kind, instance)
+
+    def on_delete(sender, instance, **kwargs):
+        remove_object(kind, instance.pk)
+
+    return on_save, on_delete
+
+
+def connect_index_signals():
+    for kind, source in SOURCES.items():
+        model = apps.get_model(source.model_label)
+        on_save, on_delete = _make_handlers(kind)
+        post_save.connect(on_save, sender=model, weak=False, dispatch_uid=f"search:save:{kind}")
+        post_delete.connect(on_delete, sender=model, weak=False, dispatch_uid=f"search:delete:{kind}")
@@ -0,0 +1,156 @@
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.contrib.admin import site
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from documents.models import Document
+from news.admin import NewsPostAdmin
+from news.models import NewsPost
+from portfolio.models import Case
+from . import index
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def tearDownModule():
+    shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+
+def _post(slug, title, body="текст", published=True):
+    return NewsPost.objects.create(title=title, slug=slug, body=body, is_published=published)
+
+
+def _slugs(results):
+    return [r["obj"].slug for r in results]
+
+
+class SearchIndexTests(TestCase):
+    def _indexed(self, kind):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT object_id FROM {index.TABLE} WHERE kind = %s ORDER BY object_id", [kind])
+            return [row[0] for row in cursor.fetchall()]
+
+    def test_build_match(self):
+        self.assertEqual(index.build_match('энергоаудит "котел" OR'), '"энергоаудит" "котел" "OR"*')
+        self.assertEqual(index.build_match("  !!! "), "")
+
+    def test_save_and_delete_update_index(self):
+        post = _post("boiler", "Котельная на газе")
+        self.assertEqual(_slugs(index.search("котельная")), ["boiler"])
+
+        post.title = "Тепловой пункт"
+        post.save()
+        self.assertEqual(index.search("котельная"), [])
+        self.assertEqual(_slugs(index.search("тепловой")), ["boiler"])
+
+        post.delete()
+        self.assertEqual(self._indexed("news"), [])
+
+    def test_prefix_and_all_words(self):
+        _post("boiler", "Котельная на газе")
+        self.assertEqual(_slugs(index.search("котел")), ["boiler"])
+        self.assertEqual(_slugs(index.search("газе котельн")), ["boiler"])
+        self.assertEqual(index.search("котельная уголь"), [])
+
+    def test_title_ranks_above_body(self):
+        _post("in-body", "Отчёт", body="котельная на объекте заменена")
+        _post("in-title", "Котельная", body="отчёт")
+        self.assertEqual(_slugs(index.search("котельная")), ["in-title", "in-body"])
+
+    def test_unpublished_do_not_push_out_published(self):
+        # неопубликованные лучше по релевантности и занимают первые пачки попаданий
+        for i in range(7):
+            _post(f"draft-{i}", "Котельная котельная", published=False)
+        _post("public", "Отчёт", body="котельная")
+        self.assertEqual(_slugs(index.search("котельная", limit=2)), ["public"])
+
+    def test_unpublished_by_update_is_hidden(self):
+        post = _post("boiler", "Котельная")
+        # update() не шлёт сигналов — индекс прежний, проверка идёт по БД
+        NewsPost.objects.filter(pk=post.pk).update(is_published=False)
+        self.assertEqual(index.search("котельная"), [])
+
+    def test_limit_and_kinds(self):
+        for i in range(5):
+            _post(f"post-{i}", f"Котельная {i}")
+        Case.objects.create(title="Котельная завода", slug="case", is_published=True)
+        self.assertEqual(len(index.search("котельная", limit=3)), 3)
+        self.assertEqual(_slugs(index.search("котельная", kinds=["cases"])), ["case"])
+
+    @override_settings(MEDIA_ROOT=MEDIA_ROOT)
+    def test_rebuild(self):
+        _post("boiler", "Котельная")
+        Document.objects.create(
+            title="Паспорт котельной", slug="passport",
+            file=SimpleUploadedFile("passport.pdf", b"%PDF-1.4"),
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {index.TABLE}")
+        self.assertEqual(index.search("котельная"), [])
+        self.assertEqual(index.rebuild(), 2)
+        self.assertEqual(sorted(_slugs(index.search("котельн"))), ["boiler", "passport"])
+
+
+
+class AdminSearchTests(TestCase):
+    """
+    Поиск в списке админки: FullTextSearchAdminMixin.get_search_results.
+    """
+
+    def setUp(self):
+        self.admin = NewsPostAdmin(NewsPost, site)
+        self.request = RequestFactory().get("/admin/news/newspost/")
+        self.boiler = _post("boiler", "Котельная")
+        self.report = _post("report", "Отчёт", body="про котельную")
+        _post("other", "Тепловой пункт")
+
+    def _search(self, term):
+        qs, use_distinct = self.admin.get_search_results(self.request, NewsPost.objects.all(), term)
+        return sorted(qs.values_list("slug", flat=True)), use_distinct
+
+    def test_fts(self):
+        # по индексу: слова целиком или префикс, без дублей от JOIN
+        self.assertEqual(self._search("котельн"), (["boiler", "report"], False))
+        self.assertEqual(self._search("котельная"), (["boiler"], False))
+
+    def test_fallback_without_fts(self):
+        with mock.patch("search.mixins.fts_available", return_value=False):
+            # SQLite сравнивает без учёта регистра только латиницу
+            slugs, _ = self._search("отельн")
+        # стандартный icontains по search_fields
+        self.assertEqual(slugs, ["boiler", "report"])
+
+    def test_query_without_words_uses_default_search(self):
+        slugs, _ = self._search("!!!")
+        self.assertEqual(slugs, [])
+
+
+@override_settings(SECURE_SSL_REDIRECT=False)
+class SearchViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_results_are_highlighted(self):
+        _post("boiler", "Котельная <b>на газе</b>")
+        response = self.client.get(reverse("search:search"), {"q": "котельная"})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "<mark>Котельная</mark> &lt;b&gt;на газе&lt;/b&gt;", html=False)
+
+    def test_empty_query(self):
+        response = self.client.get(reverse("search:search"), {"q": "   "})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["results"], [])
+
+    def test_rebuild_command(self):
+        _post("boiler", "Котельная")
+        call_command("rebuild_search_index", stdout=io.StringIO())
+        response = self.client.get(reverse("search:search"), {"q": "котельная", "kind": "news"})
+        self.assertEqual(len(response.context["results"]), 1)
@@ -0,0 +1,21 @@
+from django.shortcuts import render
+
+from .index import SOURCES, search as run_search
+
+MAX_QUERY_LENGTH = 200
+
+
+def search(request):
+    query = (request.GET.get("q") or "").strip()[:MAX_QUERY_LENGTH]
+    kind = request.GET.get("kind") or ""
+    if kind not in SOURCES:
+        kind = ""
+
+    results = run_search(query, kinds=[kind] if kind else None) if query else []
+
+    return render(request, "search/search_results.html", {
+        "query": query,
+        "kind": kind,
+        "kinds": [(k, s.label) for k, s in SOURCES.items()],
+        "results": results,
+    })